@@ -0,0 +1,139 @@
+"""
+Headless mode benchmark: idle RSS, idle wakeups and time to first cursor move.
+
+Starts `server.main --headless` in a subprocess and measures it waiting for a client,
+idle with a client connected, and again after input has been released. Linux only
+(reads /proc). Run from the server directory:
+    uv run python benchmarks/bench_headless.py
+"""
+
+import argparse
+import os
+import socket
+import struct
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from websockets.sync.client import connect
+
+from server.core.protocol import MOVE, OP_MOVE
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def rss_mib(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def context_switches(pid: int) -> int:
+    """Voluntary and involuntary context switches of every thread, i.e. wakeups."""
+    total = 0
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        try:
+            for line in (task / "status").read_text().splitlines():
+                if "ctxt_switches:" in line:
+                    total += int(line.split()[1])
+        except FileNotFoundError:
+            pass  # Thread exited while we were reading
+    return total
+
+
+def measure_idle(pid: int, seconds: float) -> tuple[float, float, int]:
+    """(RSS in MiB, wakeups per second, thread count) over an idle window."""
+    before = context_switches(pid)
+    time.sleep(seconds)
+    wakeups = (context_switches(pid) - before) / seconds
+    return rss_mib(pid), wakeups, len(os.listdir(f"/proc/{pid}/task"))
+
+
+def moves_processed(port: int) -> int:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=2) as response:
+        for line in response.read().decode().splitlines():
+            if line.startswith(f'remote_mouse_frames_total{{opcode="0x{OP_MOVE:02x}"}}'):
+                return int(line.split()[-1])
+    return 0
+
+
+def wait_ready(port: int, timeout: float = 30.0) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            moves_processed(port)
+            return time.perf_counter() - start
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError("Server did not come up")
+
+
+def first_move(port: int, websocket, since: float, done: int) -> float:
+    """
+    Send one relative move on a fresh socket and wait until the server has applied it.
+    Returns the seconds from `since`, when connecting started, to the move landing.
+    """
+    websocket.recv()  # Session hello
+    websocket.send(struct.pack(">B", OP_MOVE) + MOVE.pack(1, 0))
+    while moves_processed(port) <= done:
+        time.sleep(0.001)
+    return time.perf_counter() - since
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--window", type=float, default=5.0, help="Seconds per idle sample")
+    parser.add_argument("--idle-timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "server.main",
+            "--headless",
+            "--no-pairing",
+            "--port",
+            str(port),
+            "--idle-timeout",
+            str(args.idle_timeout),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        print(f"ready after {wait_ready(port) * 1000:.0f} ms, sampling {args.window:.0f}s windows")
+        print(f"{'state':<22}{'RSS MiB':>10}{'wakeups/s':>12}{'threads':>10}")
+
+        def report(state: str):
+            rss, wakeups, threads = measure_idle(process.pid, args.window)
+            print(f"{state:<22}{rss:>10.1f}{wakeups:>12.1f}{threads:>10}")
+
+        report("waiting for client")
+        done, start = moves_processed(port), time.perf_counter()
+        with connect(f"ws://127.0.0.1:{port}/ws") as websocket:
+            cold = first_move(port, websocket, start, done)
+            report("client connected")
+        time.sleep(args.idle_timeout + 0.5)
+        report("input released")
+        done, start = moves_processed(port), time.perf_counter()
+        with connect(f"ws://127.0.0.1:{port}/ws") as websocket:
+            warm = first_move(port, websocket, start, done)
+
+        print(f"first move, cold start: {cold * 1000:.1f} ms")
+        print(f"first move, after release: {warm * 1000:.1f} ms")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Motion pacing benchmark: output-interval jitter of bursty pointer input, direct vs paced.
+
+Run from the server directory:
+    uv run python benchmarks/bench_motion_pacing.py
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from server.config import PACING_HZ, PACING_MAX_DELAY
+from server.core.pacing import MotionPacer
+
+
+class Recorder:
+    """Stands in for pyautogui and timestamps every move."""
+
+    def __init__(self):
+        self.moves: list[tuple[float, int]] = []
+        self._lock = threading.Lock()
+
+    def moveRel(self, dx, dy):
+        with self._lock:
+            self.moves.append((time.perf_counter(), dx))
+
+
+def bursty_trace(seconds: float, rng: random.Random, send_hz: float = 60.0):
+    """
+    Touch moves sent at `send_hz` with a constant speed, delivered the way a phone on
+    power-saving Wi-Fi delivers them: held back and flushed together every 20-60 ms.
+    Returns (arrival time, dx) pairs.
+    """
+    arrivals = []
+    flush_at = 0.0
+    for i in range(int(seconds * send_hz)):
+        sent = i / send_hz
+        while flush_at < sent:
+            flush_at += rng.uniform(0.02, 0.06)
+        arrivals.append((flush_at + rng.uniform(0, 0.001), 8))
+    return arrivals
+
+
+def replay(arrivals, apply):
+    start = time.perf_counter()
+    for at, dx in arrivals:
+        while (delay := start + at - time.perf_counter()) > 0:
+            time.sleep(min(delay, 0.001))
+        apply(dx)
+    return start
+
+
+def stats(recorder: Recorder, start: float, arrivals):
+    times = [t for t, dx in recorder.moves if dx]
+    intervals = sorted((b - a) * 1000 for a, b in zip(times, times[1:], strict=False))
+
+    # Added latency: how long after a delta arrived the cursor had travelled that far
+    latencies, travelled, moves = [], 0, iter(recorder.moves)
+    target = 0
+    for at, dx in arrivals:
+        target += dx
+        while travelled < target:
+            t, moved = next(moves)
+            travelled += moved
+        latencies.append(max(0.0, t - start - at) * 1000)
+
+    return (
+        len(times),
+        statistics.mean(intervals),
+        statistics.pstdev(intervals),
+        intervals[int(len(intervals) * 0.99) - 1],
+        statistics.mean(latencies),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--hz", type=float, default=PACING_HZ)
+    parser.add_argument("--max-delay", type=float, default=PACING_MAX_DELAY)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    arrivals = bursty_trace(args.seconds, random.Random(args.seed))
+    print(
+        f"{len(arrivals)} moves over {args.seconds:.0f}s, pacing at {args.hz:.0f} Hz, "
+        f"max delay {args.max_delay * 1000:.0f} ms"
+    )
+    print(
+        f"{'mode':<8}{'moves':>8}{'interval ms':>13}{'stdev ms':>10}{'p99 ms':>9}"
+        f"{'added latency ms':>18}"
+    )
+
+    direct = Recorder()
+    start = replay(arrivals, lambda dx: direct.moveRel(dx, 0))
+    moves, mean, stdev, p99, latency = stats(direct, start, arrivals)
+    print(f"{'direct':<8}{moves:>8}{mean:>13.2f}{stdev:>10.2f}{p99:>9.2f}{latency:>18.2f}")
+
+    paced = Recorder()
+    pacer = MotionPacer(hz=args.hz, max_delay=args.max_delay, backend=paced)
+    pacer.start()
+    start = replay(arrivals, lambda dx: pacer.push(dx, 0))
+    time.sleep(args.max_delay * 2)
+    pacer.stop()
+    moves, mean, stdev, p99, latency = stats(paced, start, arrivals)
+    print(f"{'paced':<8}{moves:>8}{mean:>13.2f}{stdev:>10.2f}{p99:>9.2f}{latency:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
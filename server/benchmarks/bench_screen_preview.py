@@ -0,0 +1,102 @@
+"""
+Screen preview benchmark: encode time and bytes per frame on synthetic frames.
+
+Run from the server directory:
+    uv run python benchmarks/bench_screen_preview.py
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from server.config import SCREEN_TILE_SIZE
+from server.core.screen import ScreenStreamer
+
+
+def desktop_frame(rng: np.random.Generator, width: int, height: int) -> np.ndarray:
+    """A desktop-like frame: flat background with a few noisy "windows"."""
+    frame = np.full((height, width, 3), 40, dtype=np.uint8)
+    for _ in range(4):
+        x, y = rng.integers(0, width // 2), rng.integers(0, height // 2)
+        w, h = rng.integers(80, width // 2), rng.integers(60, height // 2)
+        frame[y : y + h, x : x + w] = rng.integers(0, 255, (1, 1, 3), dtype=np.uint8)
+        # Text-like high frequency detail
+        frame[y : y + h : 3, x : x + w] = rng.integers(0, 255, (1, 1, 3), dtype=np.uint8)
+    return frame
+
+
+def scenarios(rng: np.random.Generator, width: int, height: int, frames: int):
+    base = desktop_frame(rng, width, height)
+
+    def cursor_blink():
+        frame = base.copy()
+        for i in range(frames):
+            frame[100:118, 200:202] = 255 if i % 2 else 40
+            yield frame.copy()
+
+    def scrolling_window():
+        frame = base.copy()
+        for _ in range(frames):
+            frame[50 : height - 50, 100 : width - 100] = np.roll(
+                frame[50 : height - 50, 100 : width - 100], -8, axis=0
+            )
+            yield frame.copy()
+
+    def full_change():
+        for _ in range(frames):
+            yield desktop_frame(rng, width, height)
+
+    return {
+        "cursor blink": cursor_blink,
+        "scrolling window": scrolling_window,
+        "full change": full_change,
+    }
+
+
+async def run_scenario(frames: list[np.ndarray], image_format: str):
+    remaining = iter(frames)
+
+    async def send(message):
+        pass
+
+    streamer = ScreenStreamer(send, capture=lambda: next(remaining), image_format=image_format)
+    timings, sizes = [], []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Keyframe is excluded from the statistics
+        await streamer.next_frame(executor)
+        for _ in range(len(frames) - 1):
+            start = time.perf_counter()
+            message = await streamer.next_frame(executor)
+            timings.append(time.perf_counter() - start)
+            sizes.append(len(message) if message else 0)
+    return timings, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=960)
+    parser.add_argument("--height", type=int, default=540)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--format", choices=["JPEG", "WEBP"], default="JPEG")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(
+        f"{args.width}x{args.height}, tile {SCREEN_TILE_SIZE}px, {args.format}, "
+        f"{args.frames} frames per scenario"
+    )
+    print(f"{'scenario':<18}{'ms/frame p50':>14}{'ms/frame p95':>14}{'KiB/frame':>12}")
+    for name, make in scenarios(rng, args.width, args.height, args.frames + 1).items():
+        timings, sizes = asyncio.run(run_scenario(list(make()), args.format))
+        timings.sort()
+        p50 = statistics.median(timings) * 1000
+        p95 = timings[int(len(timings) * 0.95) - 1] * 1000
+        print(f"{name:<18}{p50:>14.2f}{p95:>14.2f}{statistics.mean(sizes) / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,84 @@ APP_DIR_NAME = ".remote-mouse"
 # Network Defaults
 DEFAULT_PORT = 9997
 MDNS_HOSTNAME = "remote-mouse.local."
+MDNS_APP_ID = "remote-mouse"  # TXT "app" value that marks our _http._tcp services
+MDNS_INFO_TIMEOUT = 3000  # Milliseconds to wait for a discovered peer's address records
+MDNS_ADDRESS_CHECK_INTERVAL = 10.0  # Seconds between checks for a new LAN address (DHCP, Wi-Fi)
+
+# Sessions
+SESSION_GRACE_PERIOD = 10.0  # Seconds a dropped session may be resumed before input is released
+WS_PING_INTERVAL = 1.0  # Seconds between server-side WebSocket pings
+WS_PING_TIMEOUT = 1.0  # Seconds to wait for a pong before dropping the peer
+INPUT_IDLE_TIMEOUT = 300.0  # Headless: seconds without a client before input is released
+
+# Pairing
+PAIRED_DEVICES_FILE_NAME = "devices.json"
+PAIRING_CODE_DIGITS = 6
+PAIRING_CODE_TTL = 120.0  # Seconds a pairing code shown in the tray stays valid
+PAIRING_MAX_ATTEMPTS = 5  # Wrong guesses before the current code is revoked
+PAIRING_AUTH_TIMEOUT = 5.0  # Seconds a new WebSocket has to answer the challenge
+
+# Screen Preview
+SCREEN_TILE_SIZE = 64  # Pixels per tile edge for dirty-tile diffing
+SCREEN_MAX_WIDTH = 960  # Captured frames are downscaled to this width
+SCREEN_MAX_FPS = 10.0  # Upper bound for the preview frame rate
+SCREEN_IDLE_FPS = 1.0  # Frame rate the preview backs off to while the screen is static
+SCREEN_MAX_KBPS = 4000  # Upper bound for the preview bandwidth (kilobits per second)
+SCREEN_IMAGE_QUALITY = 60  # JPEG/WebP quality for encoded tiles
+SCREEN_ENCODER_THREADS = 2
+
+# Clipboard Sync
+CLIPBOARD_MAX_BYTES = 8 * 1024 * 1024  # Larger clipboard contents are not synced
+CLIPBOARD_CHUNK_SIZE = 32 * 1024  # Bytes per OP_CLIPBOARD chunk frame
+CLIPBOARD_WINDOW = 4  # Unacknowledged chunks allowed in flight
+CLIPBOARD_ACK_TIMEOUT = 5.0  # Seconds to wait for an ack before aborting a transfer
+CLIPBOARD_POLL_INTERVAL = 0.5  # Seconds between desktop clipboard change checks
+
+# File Drop
+INBOX_DIR_NAME = "inbox"
+INBOX_MAX_BYTES = 64 * 1024 * 1024 * 1024  # Largest single upload accepted
+INBOX_PARTIAL_TTL = 24 * 3600.0  # Seconds an unfinished upload is kept since its last write
+
+# Gestures
+GESTURES_FILE_NAME = "gestures.json"  # Optional gesture-to-action overrides in the app dir
+GESTURE_ZOOM_STEP = 1.1  # Pinch scale change per zoom wheel step
+GESTURE_SCROLL_STEP = 20  # Swipe distance (CSS pixels) per scroll wheel click
+
+# Timing
+TIMER_SPIN = 0.001  # Seconds before a timed deadline spent spinning instead of sleeping
+
+# Motion Pacing
+PACING_HZ = 60.0  # Output rate of the optional motion pacer; match the display refresh rate
+PACING_MIN_DELAY = 0.008  # Lower bound of the jitter buffer delay (seconds)
+PACING_MAX_DELAY = 0.05  # Upper bound; no motion is held back longer than this
+PACING_JITTER_WINDOW = 32  # Recent arrival gaps the buffer delay is sized from
+
+# Macros
+MACROS_FILE_NAME = "macros.json"  # Stored macros in the app dir
+MACRO_MAX_STEPS = 256  # Steps per macro, counting delays
+MACRO_MAX_DELAY = 60.0  # Longest single delay step (seconds)
+MACRO_NAME_MAX_LENGTH = 64
+
+# Pointer
+MONITOR_CHECK_INTERVAL = 2.0  # Seconds the cached monitor layout is trusted before a re-check
+CURSOR_RESYNC_IDLE = 0.25  # Idle seconds after which the OS cursor position is read again
+
+# Observability
+LOOP_LAG_INTERVAL = 0.5  # Seconds between event loop lag samples
+DEBUG_PROFILE_INTERVAL = 0.005  # Seconds between profiler stack samples
+DEBUG_PROFILE_MAX_SECONDS = 300.0  # A profiler left running stops itself after this long
+DEBUG_TRACEMALLOC_FRAMES = 10  # Stack depth recorded per allocation while tracing
+HOTLOG_RATE = 1.0  # Messages per second per key from the input path, once the burst is spent
+HOTLOG_BURST = 5  # Messages per key logged back to back before rate limiting starts
+TRACE_SAMPLE_EVERY = 100  # One in this many commands is written to the trace log
+TRACE_FILE_NAME = "trace.jsonl"  # Command trace log, next to server.log
 
 # UI Defaults
 TRAY_ICON_SIZE = (64, 64)
 TRAY_ICON_BG_COLOR = "blue"
 TRAY_ICON_FG_COLOR = "white"
+TRAY_RENDER_DEBOUNCE = 0.2  # Seconds changes are collected before the tray icon is redrawn
+TRAY_RATE_RECHECK = 1.0  # Seconds between rate re-checks while traffic dies down; none when idle
 
 
 def is_dev() -> bool:
@@ -28,6 +101,25 @@ def get_share_dir() -> Path:
     return share_dir
 
 
+def get_inbox_dir() -> Path:
+    """Directory where files dropped from the phone are saved."""
+    return get_share_dir() / INBOX_DIR_NAME
+
+
+def get_paired_devices_file() -> Path:
+    return get_share_dir() / PAIRED_DEVICES_FILE_NAME
+
+
+def get_gestures_file() -> Path:
+    """User overrides for the gesture-to-action map."""
+    return get_share_dir() / GESTURES_FILE_NAME
+
+
+def get_macros_file() -> Path:
+    """Macros stored from the web client's settings."""
+    return get_share_dir() / MACROS_FILE_NAME
+
+
 def get_static_dir() -> Path:
     # 1. PyInstaller environment
     if not is_dev():
@@ -67,14 +159,27 @@ def get_asset_path(filename: str) -> Path:
     return asset_path
 
 
-def configure_logging(debug: bool = False):
+def configure_logging(debug: bool = False, trace: bool = False):
     """
     Configures loguru logger.
     If debug=True: Logs to file (DEBUG level) and stderr.
     If debug=False: Logs to stderr only (INFO level).
+    If trace=True: Sampled command traces (TRACE level, see server.core.hotlog) also go to
+    their own file as JSON lines; the other handlers never see them.
     """
     logger.remove()  # Clear all existing handlers
 
+    if trace:
+        logger.add(
+            get_share_dir() / "logs" / TRACE_FILE_NAME,
+            level="TRACE",
+            format="{message}",
+            filter=lambda record: record["extra"].get("trace", False),
+            rotation="50 MB",
+            retention=3,
+            enqueue=True,
+        )
+
     if debug:
         # File Handler
         log_file = get_share_dir() / "logs" / "server.log"
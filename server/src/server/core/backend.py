@@ -0,0 +1,68 @@
+import threading
+from contextlib import contextmanager
+
+# Input is injected from the event loop, the motion pacer and the macro player. On X11
+# pyautogui sends everything through one shared Xlib Display, which is not thread-safe,
+# so every call into the backend holds this lock
+injection_lock = threading.RLock()
+
+
+class LazyBackend:
+    """
+    The pyautogui module, imported the first time one of its attributes is used.
+
+    Importing pyautogui connects to the display server and loads its screenshot and
+    dialog helpers, which a server with no phone connected has no use for. Modules use
+    this in place of the module itself, so `pyautogui.click(...)` works unchanged. Its
+    functions are called under `injection_lock`.
+    """
+
+    def __init__(self):
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    import pyautogui
+
+                    # 禁用 PyAutoGUI 的故障保险
+                    pyautogui.FAILSAFE = False
+                    # 移除每个指令后的默认暂停
+                    pyautogui.PAUSE = 0
+                    self._module = pyautogui
+        return self._module
+
+    @contextmanager
+    def hold(self, keys):
+        """pyautogui.hold, with the lock kept until the keys are released again."""
+        keys = [keys] if isinstance(keys, str) else list(keys)
+        module = self.load()
+        with injection_lock:
+            for key in keys:
+                module.keyDown(key)
+            try:
+                yield
+            finally:
+                for key in keys:
+                    module.keyUp(key)
+
+    def __getattr__(self, name):
+        value = getattr(self.load(), name)
+        if not callable(value) or isinstance(value, type):
+            return value
+
+        def locked(*args, **kwargs):
+            with injection_lock:
+                return getattr(self._module, name)(*args, **kwargs)
+
+        return locked
+
+
+# Shared by every module that injects input
+pyautogui = LazyBackend()
@@ -0,0 +1,303 @@
+import asyncio
+import functools
+import struct
+import sys
+import zlib
+from collections.abc import Awaitable, Callable
+
+import pyperclip
+from loguru import logger
+
+from server.config import (
+    CLIPBOARD_ACK_TIMEOUT,
+    CLIPBOARD_CHUNK_SIZE,
+    CLIPBOARD_MAX_BYTES,
+    CLIPBOARD_POLL_INTERVAL,
+    CLIPBOARD_WINDOW,
+)
+
+# Bidirectional clipboard channel on /ws
+OP_CLIPBOARD = 0x09
+
+# [OpCode] [Kind] ...
+KIND_SUBSCRIBE = 0x00  # [Enabled u8]
+KIND_BEGIN = 0x01  # [Transfer u32] [Size u32] [CRC32 u32]
+KIND_CHUNK = 0x02  # [Transfer u32] [Seq u32] [Payload]
+KIND_ACK = 0x03  # [Transfer u32] [Seq u32]
+KIND_ABORT = 0x04  # [Transfer u32]
+
+BEGIN = struct.Struct(">BBIII")
+CHUNK_HEADER = struct.Struct(">BBII")
+ACK = struct.Struct(">BBII")
+ABORT = struct.Struct(">BBI")
+
+# Content is identified by (size, crc32) of its UTF-8 encoding
+Digest = tuple[int, int]
+
+
+def digest_of(data: bytes) -> Digest:
+    return len(data), zlib.crc32(data)
+
+
+class SelectionOwnerCounter:
+    """
+    Counts CLIPBOARD ownership changes on X11 through XFixes. Applications take
+    ownership again on every copy, even from the same window, so the count moves with
+    each copy; reading it only drains events already waiting on the socket.
+    """
+
+    def __init__(self):
+        from Xlib import display as xdisplay
+        from Xlib.ext import xfixes
+
+        self._display = xdisplay.Display()
+        if not self._display.has_extension("XFIXES"):
+            self._display.close()
+            raise RuntimeError("XFIXES extension not available")
+        self._display.xfixes_query_version()
+        self._display.xfixes_select_selection_input(
+            self._display.screen().root,
+            self._display.intern_atom("CLIPBOARD"),
+            xfixes.XFixesSetSelectionOwnerNotifyMask,
+        )
+        self._display.flush()
+        self.count = 0
+
+    def __call__(self) -> int:
+        while self._display.pending_events():
+            self._display.next_event()
+            self.count += 1
+        return self.count
+
+
+@functools.cache
+def _sequence_number_reader() -> Callable[[], int] | None:
+    """A cheap clipboard change counter, if the platform has one. Shared by all connections."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+
+            return ctypes.windll.user32.GetClipboardSequenceNumber
+        if sys.platform == "darwin":
+            from AppKit import NSPasteboard
+
+            pasteboard = NSPasteboard.generalPasteboard()
+            return pasteboard.changeCount
+        return SelectionOwnerCounter()
+    except Exception as e:
+        logger.info(f"Clipboard change counter unavailable: {e}")
+    return None
+
+
+class SystemClipboard:
+    """
+    The desktop clipboard via pyperclip, with a change counter where available: the
+    sequence number on Windows and macOS, XFixes selection events on X11.
+    """
+
+    def __init__(self):
+        self._sequence_number = _sequence_number_reader()
+
+    def change_token(self) -> int | None:
+        """Return a value that changes whenever the clipboard does, or None if unknown."""
+        return self._sequence_number() if self._sequence_number else None
+
+    def read(self) -> str:
+        return pyperclip.paste()
+
+    def write(self, text: str):
+        pyperclip.copy(text)
+
+
+class IncomingTransfer:
+    def __init__(self, transfer_id: int, size: int, crc: int):
+        self.transfer_id = transfer_id
+        self.size = size
+        self.crc = crc
+        self.buffer = bytearray(size)
+        self.received = 0
+        self.next_seq = 0
+        self.running_crc = 0
+
+    def add(self, seq: int, payload: bytes) -> bool:
+        """Append a chunk. Returns False if it is out of order or overflows the announced size."""
+        end = self.received + len(payload)
+        if seq != self.next_seq or end > self.size:
+            return False
+        self.buffer[self.received : end] = payload
+        self.running_crc = zlib.crc32(payload, self.running_crc)
+        self.received = end
+        self.next_seq += 1
+        return True
+
+    @property
+    def complete(self) -> bool:
+        return self.received == self.size
+
+
+class ClipboardSync:
+    """
+    Clipboard sync for one WebSocket connection.
+    Content moves in sequence-numbered chunks announced with a size and CRC32. The sender
+    keeps at most `window` chunks unacknowledged, and content whose digest matches the
+    last synced one is never sent again in either direction.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        clipboard: SystemClipboard | None = None,
+        max_bytes: int = CLIPBOARD_MAX_BYTES,
+        chunk_size: int = CLIPBOARD_CHUNK_SIZE,
+        window: int = CLIPBOARD_WINDOW,
+        poll_interval: float = CLIPBOARD_POLL_INTERVAL,
+    ):
+        self.send = send
+        self.clipboard = clipboard or SystemClipboard()
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.window = window
+        self.poll_interval = poll_interval
+
+        self.last_digest: Digest | None = None
+        self.incoming: IncomingTransfer | None = None
+        self.watch_task: asyncio.Task | None = None
+        self.apply_task: asyncio.Task | None = None
+
+        self._next_transfer_id = 1
+        self._outgoing_id: int | None = None
+        self._acked = -1
+        self._ack_event = asyncio.Event()
+
+    async def handle(self, data: bytes):
+        """Handle one OP_CLIPBOARD frame from the client."""
+        if len(data) < 2:
+            return
+        kind = data[1]
+
+        if kind == KIND_SUBSCRIBE:
+            self.set_watching(len(data) > 2 and data[2] == 0x01)
+
+        elif kind == KIND_BEGIN and len(data) >= BEGIN.size:
+            _, _, transfer_id, size, crc = BEGIN.unpack_from(data)
+            if size > self.max_bytes or (size, crc) == self.last_digest:
+                self.incoming = None
+                await self.send(ABORT.pack(OP_CLIPBOARD, KIND_ABORT, transfer_id))
+                return
+            self.incoming = IncomingTransfer(transfer_id, size, crc)
+            if size == 0:
+                await self._finish_incoming()
+
+        elif kind == KIND_CHUNK and len(data) >= CHUNK_HEADER.size:
+            _, _, transfer_id, seq = CHUNK_HEADER.unpack_from(data)
+            transfer = self.incoming
+            if transfer is None or transfer.transfer_id != transfer_id:
+                return
+            if not transfer.add(seq, data[CHUNK_HEADER.size :]):
+                self.incoming = None
+                await self.send(ABORT.pack(OP_CLIPBOARD, KIND_ABORT, transfer_id))
+                return
+            await self.send(ACK.pack(OP_CLIPBOARD, KIND_ACK, transfer_id, seq))
+            if transfer.complete:
+                await self._finish_incoming()
+
+        elif kind == KIND_ACK and len(data) >= ACK.size:
+            _, _, transfer_id, seq = ACK.unpack_from(data)
+            if transfer_id == self._outgoing_id:
+                self._acked = max(self._acked, seq)
+                self._ack_event.set()
+
+        elif kind == KIND_ABORT and len(data) >= ABORT.size:
+            _, _, transfer_id = ABORT.unpack_from(data)
+            if transfer_id == self._outgoing_id:
+                self._outgoing_id = None
+                self._ack_event.set()
+            if self.incoming and self.incoming.transfer_id == transfer_id:
+                self.incoming = None
+
+    async def _finish_incoming(self):
+        transfer = self.incoming
+        self.incoming = None
+        if transfer is None or transfer.running_crc != transfer.crc:
+            logger.warning("Clipboard transfer failed CRC check, dropped")
+            return
+
+        text = transfer.buffer.decode("utf-8", errors="replace")
+        self.last_digest = (transfer.size, transfer.crc)
+        # Write off the event loop without holding up the frames behind this one
+        loop = asyncio.get_running_loop()
+        self.apply_task = asyncio.ensure_future(
+            loop.run_in_executor(None, self.clipboard.write, text)
+        )
+
+    async def push(self, text: str) -> bool:
+        """Send `text` to the client. Returns True if the client accepted all of it."""
+        data = text.encode("utf-8")
+        digest = digest_of(data)
+        if digest == self.last_digest:
+            return True
+        if len(data) > self.max_bytes:
+            logger.warning(f"Clipboard content too large to sync ({len(data)} bytes)")
+            return False
+
+        transfer_id = self._next_transfer_id
+        self._next_transfer_id = (self._next_transfer_id + 1) & 0xFFFFFFFF or 1
+        self._outgoing_id = transfer_id
+        self._acked = -1
+        self.last_digest = digest
+
+        await self.send(BEGIN.pack(OP_CLIPBOARD, KIND_BEGIN, transfer_id, *digest))
+        view = memoryview(data)
+        for seq, offset in enumerate(range(0, len(data), self.chunk_size)):
+            # Backpressure: never more than `window` chunks in flight
+            while self._outgoing_id == transfer_id and seq - self._acked > self.window:
+                self._ack_event.clear()
+                try:
+                    await asyncio.wait_for(self._ack_event.wait(), CLIPBOARD_ACK_TIMEOUT)
+                except TimeoutError:
+                    logger.warning("Clipboard transfer timed out waiting for ack")
+                    self._outgoing_id = None
+            if self._outgoing_id != transfer_id:
+                self.last_digest = None
+                return False
+            header = CHUNK_HEADER.pack(OP_CLIPBOARD, KIND_CHUNK, transfer_id, seq)
+            await self.send(header + view[offset : offset + self.chunk_size])
+        return True
+
+    def set_watching(self, enabled: bool):
+        if enabled and self.watch_task is None:
+            self.watch_task = asyncio.create_task(self.watch())
+        elif not enabled and self.watch_task is not None:
+            self.watch_task.cancel()
+            self.watch_task = None
+
+    async def watch(self):
+        """
+        Poll the desktop clipboard's change counter and push changes to the client.
+        Without a counter (e.g. on Wayland) the desktop is not watched: reading the
+        whole clipboard on every poll is too costly. Phone-to-desktop still works.
+        """
+        loop = asyncio.get_running_loop()
+        if self.clipboard.change_token() is None:
+            logger.info("No clipboard change counter, not watching the desktop clipboard")
+            return
+        last_token: int | None = None
+        while True:
+            try:
+                # Only read the full content when the change counter moved
+                token = self.clipboard.change_token()
+                if token != last_token:
+                    last_token = token
+                    text = await loop.run_in_executor(None, self.clipboard.read)
+                    if text:
+                        await self.push(text)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Clipboard watch failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def close(self):
+        self.set_watching(False)
+        self._outgoing_id = None
+        self._ack_event.set()
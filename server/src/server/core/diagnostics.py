@@ -0,0 +1,150 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from loguru import logger
+
+from server.config import (
+    DEBUG_PROFILE_INTERVAL,
+    DEBUG_PROFILE_MAX_SECONDS,
+    DEBUG_TRACEMALLOC_FRAMES,
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _thread_names() -> dict[int, str]:
+    return {thread.ident: thread.name for thread in threading.enumerate() if thread.ident}
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of every thread at a fixed interval from a background thread.
+    Nothing is hooked into the profiled code, so the cost is one walk over the current
+    frames per sample. Results are folded stacks ("thread;outer;inner count"), the input
+    format of flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEBUG_PROFILE_INTERVAL,
+        max_seconds: float = DEBUG_PROFILE_MAX_SECONDS,
+    ):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.samples: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self.samples.clear()
+        self.sample_count = 0
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"Sampling profiler started ({self.interval * 1000:.1f}ms interval)")
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        logger.info(f"Sampling profiler stopped after {self.sample_count} samples")
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def sample(self):
+        own = threading.get_ident()
+        names = _thread_names()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.samples[";".join(reversed(stack))] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        # A forgotten profiler stops itself instead of sampling for days
+        while not self._stop_event.wait(self.interval) and time.monotonic() < deadline:
+            self.sample()
+
+
+class MemoryTracker:
+    """Takes a tracemalloc baseline and reports what grew since then, by allocation site."""
+
+    def __init__(self, frames: int = DEBUG_TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self.baseline: tracemalloc.Snapshot | None = None
+
+    def snapshot(self) -> dict:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            logger.info("tracemalloc started")
+        self.baseline = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        return {"traced_bytes": current, "peak_bytes": peak}
+
+    def diff(self, limit: int = 25) -> list[dict] | None:
+        """Top allocation sites by growth since the baseline, or None without a baseline."""
+        if self.baseline is None or not tracemalloc.is_tracing():
+            return None
+
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.baseline, "traceback")
+        return [
+            {
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+                "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+            }
+            for stat in stats[:limit]
+        ]
+
+    def stop(self):
+        self.baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+
+
+def thread_states() -> list[dict]:
+    """Every live thread with the frame it is currently executing."""
+    frames = sys._current_frames()
+    states = []
+    for thread in threading.enumerate():
+        frame = frames.get(thread.ident)
+        states.append(
+            {
+                "name": thread.name,
+                "ident": thread.ident,
+                "daemon": thread.daemon,
+                "alive": thread.is_alive(),
+                "current": f"{frame.f_code.co_filename}:{frame.f_lineno} {frame.f_code.co_name}"
+                if frame
+                else None,
+            }
+        )
+    return states
@@ -0,0 +1,59 @@
+import threading
+from collections.abc import Callable, Hashable
+
+from loguru import logger
+
+# Topics and the values published on them
+TOPIC_RATE = "metrics.rate"  # (packets per second, bytes per second)
+TOPIC_SESSIONS = "sessions.connected"  # Number of connected input sockets
+TOPIC_ADDRESS = "network.address"  # LAN address the server is announced at
+TOPIC_SHOW_RATE = "tray.show_rate"  # Rate display in the tray, as requested by a client
+
+
+class EventBus:
+    """
+    Minimal publish/subscribe for state the UI shows. Each topic keeps its latest value,
+    and subscribers are only called when a published value differs from it, so
+    publishers can report as often as they like without causing redraws.
+
+    Callbacks run on the publishing thread, which may be the event loop or the input
+    path: they should only record that something changed and hand off the real work.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[Hashable, object] = {}
+        self._subscribers: dict[Hashable, list[Callable[[object], None]]] = {}
+
+    def publish(self, topic: Hashable, value):
+        with self._lock:
+            if topic in self._values and self._values[topic] == value:
+                return
+            self._values[topic] = value
+            subscribers = list(self._subscribers.get(topic, ()))
+        for callback in subscribers:
+            try:
+                callback(value)
+            except Exception as e:
+                logger.error(f"Subscriber to {topic} failed: {e}")
+
+    def latest(self, topic: Hashable, default=None):
+        with self._lock:
+            return self._values.get(topic, default)
+
+    def subscribe(self, topic: Hashable, callback: Callable[[object], None]) -> Callable[[], None]:
+        """Call `callback(value)` on every change of `topic`; returns the unsubscribe function."""
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(topic, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+
+        return unsubscribe
+
+
+# One bus per process, shared by the services and the tray
+bus = EventBus()
@@ -0,0 +1,227 @@
+import json
+import math
+import struct
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+from server.config import GESTURE_SCROLL_STEP, GESTURE_ZOOM_STEP
+from server.core.backend import pyautogui
+from server.core.hotlog import hotlog
+from server.core.metrics import metrics
+
+# Multi-finger gestures on /ws, one frame per gesture phase
+OP_GESTURE = 0x0A
+
+# [OpCode] [Kind] [Phase] [Fingers] [Magnitude i32]
+GESTURE = struct.Struct(">BBBBi")
+
+KIND_PINCH = 0x00  # Magnitude: scale since BEGIN, in thousandths
+KIND_SWIPE_LEFT = 0x01  # Swipes, magnitude: distance travelled since BEGIN, in CSS pixels
+KIND_SWIPE_RIGHT = 0x02
+KIND_SWIPE_UP = 0x03
+KIND_SWIPE_DOWN = 0x04
+
+PHASE_BEGIN = 0x00
+PHASE_UPDATE = 0x01
+PHASE_END = 0x02
+PHASE_CANCEL = 0x03
+
+PINCH_SCALE = 1000
+
+KIND_NAMES = {
+    "pinch": KIND_PINCH,
+    "swipe_left": KIND_SWIPE_LEFT,
+    "swipe_right": KIND_SWIPE_RIGHT,
+    "swipe_up": KIND_SWIPE_UP,
+    "swipe_down": KIND_SWIPE_DOWN,
+}
+
+
+class ActiveGesture:
+    """Per-gesture progress, so actions only emit the difference since the last phase."""
+
+    def __init__(self, action: "GestureAction"):
+        self.action = action
+        self.emitted = 0
+
+
+class GestureAction:
+    def update(self, backend, gesture: ActiveGesture, magnitude: int):
+        pass
+
+    def end(self, backend, gesture: ActiveGesture, magnitude: int):
+        self.update(backend, gesture, magnitude)
+
+
+class HotkeyAction(GestureAction):
+    """Press a key combination once, when the gesture ends."""
+
+    def __init__(self, *keys: str):
+        self.keys = keys
+
+    def end(self, backend, gesture: ActiveGesture, magnitude: int):
+        backend.hotkey(*self.keys)
+
+
+class ZoomAction(GestureAction):
+    """Follow a pinch with modifier+wheel steps, one step per `step` change in scale."""
+
+    def __init__(self, step: float = GESTURE_ZOOM_STEP, modifier: str = "ctrl"):
+        self.log_step = math.log(step)
+        self.modifier = modifier
+
+    def update(self, backend, gesture: ActiveGesture, magnitude: int):
+        if magnitude <= 0:
+            return
+        target = round(math.log(magnitude / PINCH_SCALE) / self.log_step)
+        steps = target - gesture.emitted
+        if steps:
+            with backend.hold(self.modifier):
+                backend.scroll(steps)
+            gesture.emitted = target
+
+
+class ScrollAction(GestureAction):
+    """Turn swipe distance into wheel clicks, `step` pixels per click."""
+
+    def __init__(self, clicks_per_step: int, horizontal: bool = False, step=GESTURE_SCROLL_STEP):
+        self.clicks_per_step = clicks_per_step
+        self.horizontal = horizontal
+        self.step = step
+
+    def update(self, backend, gesture: ActiveGesture, magnitude: int):
+        target = magnitude // self.step
+        steps = target - gesture.emitted
+        if steps:
+            clicks = steps * self.clicks_per_step
+            if self.horizontal:
+                backend.hscroll(clicks)
+            else:
+                backend.scroll(clicks)
+            gesture.emitted = target
+
+
+def default_gesture_map() -> dict[tuple[int, int], GestureAction]:
+    """Pinch zooms; four-finger swipes switch desktops the way the local OS does."""
+    if sys.platform == "darwin":
+        swipes = {
+            KIND_SWIPE_LEFT: HotkeyAction("ctrl", "right"),
+            KIND_SWIPE_RIGHT: HotkeyAction("ctrl", "left"),
+            KIND_SWIPE_UP: HotkeyAction("ctrl", "up"),
+            KIND_SWIPE_DOWN: HotkeyAction("ctrl", "down"),
+        }
+    elif sys.platform == "win32":
+        swipes = {
+            KIND_SWIPE_LEFT: HotkeyAction("ctrl", "win", "right"),
+            KIND_SWIPE_RIGHT: HotkeyAction("ctrl", "win", "left"),
+            KIND_SWIPE_UP: HotkeyAction("win", "tab"),
+            KIND_SWIPE_DOWN: HotkeyAction("win", "d"),
+        }
+    else:
+        swipes = {
+            KIND_SWIPE_LEFT: HotkeyAction("ctrl", "alt", "right"),
+            KIND_SWIPE_RIGHT: HotkeyAction("ctrl", "alt", "left"),
+            # Activities overview and show desktop, as on Windows
+            KIND_SWIPE_UP: HotkeyAction("win"),
+            KIND_SWIPE_DOWN: HotkeyAction("win", "d"),
+        }
+
+    gesture_map: dict[tuple[int, int], GestureAction] = {(KIND_PINCH, 2): ZoomAction()}
+    gesture_map.update({(kind, 4): action for kind, action in swipes.items()})
+    return gesture_map
+
+
+def parse_action(value) -> GestureAction:
+    """
+    A key list is a hotkey; "zoom", "scroll" and "hscroll" are streams; "none" disables.
+    Streams also accept an object, e.g. {"action": "zoom", "step": 1.2}.
+    """
+    if isinstance(value, list) and value and all(isinstance(key, str) for key in value):
+        return HotkeyAction(*value)
+
+    options = value if isinstance(value, dict) else {"action": value}
+    name = options.get("action")
+    if name == "zoom":
+        return ZoomAction(float(options.get("step", GESTURE_ZOOM_STEP)))
+    if name in ("scroll", "hscroll"):
+        direction = -1 if options.get("reverse") else 1
+        return ScrollAction(
+            direction,
+            horizontal=name == "hscroll",
+            step=int(options.get("step", GESTURE_SCROLL_STEP)),
+        )
+    if name == "none":
+        return GestureAction()
+    raise ValueError(f"Unknown gesture action: {value!r}")
+
+
+def load_gesture_map(path: Path | None) -> dict[tuple[int, int], GestureAction]:
+    """
+    The default map with overrides from a JSON file keyed by "<kind>:<fingers>",
+    e.g. {"swipe_up:3": ["ctrl", "up"], "swipe_down:2": "scroll"}.
+    """
+    gesture_map = default_gesture_map()
+    if path is None or not path.exists():
+        return gesture_map
+
+    try:
+        overrides = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to read gesture map {path}: {e}")
+        return gesture_map
+
+    for key, value in overrides.items():
+        try:
+            kind_name, fingers = key.split(":")
+            gesture_map[(KIND_NAMES[kind_name], int(fingers))] = parse_action(value)
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring gesture mapping {key!r}: {e}")
+    return gesture_map
+
+
+class GestureEngine:
+    """
+    Turns OP_GESTURE frames into input. Each gesture is one BEGIN, any number of UPDATEs
+    and an END (or CANCEL); the action mapped to (kind, fingers) decides what to inject.
+    """
+
+    def __init__(
+        self, gesture_map: dict[tuple[int, int], GestureAction] | None = None, backend=None
+    ):
+        self.gesture_map = gesture_map if gesture_map is not None else default_gesture_map()
+        self.backend = backend or pyautogui
+        self.active: dict[int, ActiveGesture] = {}
+
+    def handle(self, data: bytes) -> bool:
+        if len(data) < GESTURE.size:
+            metrics.record_malformed()
+            hotlog.warning("malformed_gesture", "Malformed gesture: {} bytes", len(data))
+            return False
+        _, kind, phase, fingers, magnitude = GESTURE.unpack_from(data)
+
+        try:
+            if phase == PHASE_BEGIN:
+                action = self.gesture_map.get((kind, fingers))
+                if action is None:
+                    self.active.pop(kind, None)
+                else:
+                    self.active[kind] = ActiveGesture(action)
+                return True
+
+            gesture = self.active.get(kind)
+            if gesture is None:
+                return True
+            if phase == PHASE_UPDATE:
+                gesture.action.update(self.backend, gesture, magnitude)
+            elif phase == PHASE_END:
+                del self.active[kind]
+                gesture.action.end(self.backend, gesture, magnitude)
+            else:
+                del self.active[kind]
+        except Exception as e:
+            metrics.record_dropped()
+            hotlog.error(("gesture", kind), "Error processing gesture {}: {}", kind, e)
+            return False
+        return True
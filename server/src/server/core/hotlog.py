@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from collections.abc import Hashable
+
+from loguru import logger
+
+from server.config import HOTLOG_BURST, HOTLOG_RATE, TRACE_SAMPLE_EVERY
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "suppressed")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+        self.suppressed = 0
+
+
+class HotLog:
+    """
+    Logging for code that runs once per input frame.
+
+    Messages take a loguru "{}" template and arguments instead of an f-string, so nothing
+    is formatted unless a record is actually written. Each message key gets a token
+    bucket: `burst` messages go through back to back, then `rate` per second; the rest
+    are counted, and the count is attached to the next message that gets through, so a
+    client spamming malformed frames costs one log line a second rather than one per
+    frame.
+
+    trace() writes one in `sample_every` commands as a compact JSON line, at TRACE level
+    and bound with trace=True so only the trace file handler picks it up. Tracing is
+    off until set_tracing() turns it on, and costs a single flag check while off.
+    """
+
+    def __init__(
+        self,
+        rate: float = HOTLOG_RATE,
+        burst: int = HOTLOG_BURST,
+        sample_every: int = TRACE_SAMPLE_EVERY,
+        clock=time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.sample_every = max(1, sample_every)
+        self.clock = clock
+        self.tracing = False
+        self._lock = threading.Lock()
+        self._buckets: dict[Hashable, _Bucket] = {}
+        self._commands = 0
+        self._trace_logger = logger.bind(trace=True)
+
+    def error(self, key: Hashable, message: str, *args):
+        self._log("ERROR", key, message, args)
+
+    def warning(self, key: Hashable, message: str, *args):
+        self._log("WARNING", key, message, args)
+
+    def debug(self, key: Hashable, message: str, *args):
+        self._log("DEBUG", key, message, args)
+
+    def _log(self, level: str, key: Hashable, message: str, args: tuple):
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(self.burst, now)
+            else:
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+                bucket.updated = now
+            if bucket.tokens < 1:
+                bucket.suppressed += 1
+                return
+            bucket.tokens -= 1
+            suppressed, bucket.suppressed = bucket.suppressed, 0
+
+        log = logger.opt(depth=2)
+        if suppressed:
+            log.log(level, message + " ({} similar messages suppressed)", *args, suppressed)
+        else:
+            log.log(level, message, *args)
+
+    def flush(self):
+        """Report counts still held back, e.g. when the client that caused them leaves."""
+        with self._lock:
+            pending = [(key, b.suppressed) for key, b in self._buckets.items() if b.suppressed]
+            for bucket in self._buckets.values():
+                bucket.suppressed = 0
+        for key, count in pending:
+            logger.warning("{} similar messages suppressed ({})", count, key)
+
+    def set_tracing(self, enabled: bool):
+        self.tracing = enabled
+        logger.info(f"Command tracing {'enabled' if enabled else 'disabled'}")
+
+    def trace(self, opcode: int, size: int, duration: float, **fields):
+        if not self.tracing:
+            return
+        self._commands += 1
+        if self._commands % self.sample_every:
+            return
+        record = {
+            "t": round(time.time(), 3),
+            "op": opcode,
+            "len": size,
+            "us": round(duration * 1e6),
+            "seq": self._commands,
+            **fields,
+        }
+        # Serialized only if a handler takes the record
+        self._trace_logger.opt(lazy=True).trace(
+            "{}", lambda: json.dumps(record, separators=(",", ":"))
+        )
+
+
+hotlog = HotLog()
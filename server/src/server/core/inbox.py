@@ -0,0 +1,203 @@
+import asyncio
+import json
+import os
+import secrets
+import time
+import zlib
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from loguru import logger
+
+from server.config import INBOX_MAX_BYTES, INBOX_PARTIAL_TTL
+
+# Partial uploads are kept next to the inbox so the final rename never crosses filesystems
+PARTIAL_DIR_NAME = ".partial"
+
+
+class UploadError(Exception):
+    """Base class for upload failures."""
+
+
+class UploadNotFound(UploadError):
+    pass
+
+
+class UploadConflict(UploadError):
+    """The request doesn't match the upload state (wrong offset, checksum or busy)."""
+
+
+class UploadTooLarge(UploadError):
+    pass
+
+
+def safe_filename(name: str) -> str:
+    """Strip any directory part a client may have sent."""
+    name = Path(name.replace("\\", "/")).name.strip()
+    return name if name not in ("", ".", "..") else "upload"
+
+
+class Upload:
+    def __init__(self, upload_id: str, name: str, size: int, partial_path: Path):
+        self.id = upload_id
+        self.name = name
+        self.size = size
+        self.partial_path = partial_path
+        self.offset = 0
+        self.crc = 0
+        self.lock = asyncio.Lock()
+
+    @property
+    def complete(self) -> bool:
+        return self.offset == self.size
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "size": self.size,
+            "offset": self.offset,
+            "crc32": self.crc,
+        }
+
+
+class Inbox:
+    """
+    Resumable uploads into the inbox directory.
+    Bodies are streamed straight to a partial file while a running CRC32 is kept, so
+    memory use doesn't depend on the file size. An interrupted upload resumes at the
+    offset the server already has; the client verifies the prefix against `crc32`.
+
+    Uploads nobody has written to for `partial_ttl` seconds are abandoned: they are
+    deleted at startup and whenever a new upload is created.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = INBOX_MAX_BYTES,
+        partial_ttl: float = INBOX_PARTIAL_TTL,
+    ):
+        self.directory = directory
+        self.partial_dir = directory / PARTIAL_DIR_NAME
+        self.max_bytes = max_bytes
+        self.partial_ttl = partial_ttl
+        self._uploads: dict[str, Upload] = {}
+        self.expire_partials()
+
+    def expire_partials(self):
+        if not self.partial_dir.is_dir():
+            return
+        last_write: dict[str, float] = {}
+        for path in self.partial_dir.iterdir():
+            # "<id>" holds the data and "<id>.json" the metadata
+            upload_id = path.name.split(".", 1)[0]
+            last_write[upload_id] = max(last_write.get(upload_id, 0.0), path.stat().st_mtime)
+
+        cutoff = time.time() - self.partial_ttl
+        for upload_id, mtime in last_write.items():
+            upload = self._uploads.get(upload_id)
+            if mtime >= cutoff or (upload and upload.lock.locked()):
+                continue
+            (self.partial_dir / upload_id).unlink(missing_ok=True)
+            self._metadata_path(upload_id).unlink(missing_ok=True)
+            self._uploads.pop(upload_id, None)
+            logger.info(f"Upload {upload_id} abandoned, partial file removed")
+
+    def create(self, name: str, size: int) -> Upload:
+        if size < 0 or size > self.max_bytes:
+            raise UploadTooLarge(f"Upload size {size} exceeds limit {self.max_bytes}")
+
+        self.expire_partials()
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        upload_id = secrets.token_hex(16)
+        upload = Upload(upload_id, safe_filename(name), size, self.partial_dir / upload_id)
+        upload.partial_path.touch()
+        self._metadata_path(upload_id).write_text(
+            json.dumps({"name": upload.name, "size": upload.size})
+        )
+        self._uploads[upload_id] = upload
+        logger.info(f"Upload {upload_id} created: {upload.name} ({size} bytes)")
+        return upload
+
+    def get(self, upload_id: str) -> Upload:
+        upload = self._uploads.get(upload_id)
+        if upload:
+            return upload
+
+        # Not cached (e.g. after a restart): rebuild the state from disk once
+        if not upload_id.isalnum():
+            raise UploadNotFound(upload_id)
+        metadata_path = self._metadata_path(upload_id)
+        partial_path = self.partial_dir / upload_id
+        if not metadata_path.exists() or not partial_path.exists():
+            raise UploadNotFound(upload_id)
+
+        metadata = json.loads(metadata_path.read_text())
+        upload = Upload(upload_id, metadata["name"], metadata["size"], partial_path)
+        with open(partial_path, "rb") as f:
+            while chunk := f.read(1024 * 1024):
+                upload.crc = zlib.crc32(chunk, upload.crc)
+                upload.offset += len(chunk)
+        self._uploads[upload_id] = upload
+        return upload
+
+    async def append(
+        self,
+        upload: Upload,
+        offset: int,
+        body: AsyncIterator[bytes],
+        expected_crc: int | None = None,
+    ) -> Path | None:
+        """
+        Append a streamed body at `offset`. `expected_crc` is the client's CRC32 of the
+        whole file up to the end of this body. Returns the final path once complete.
+        """
+        if upload.lock.locked():
+            raise UploadConflict("Upload is busy")
+
+        async with upload.lock:
+            if offset != upload.offset:
+                raise UploadConflict(f"Expected offset {upload.offset}, got {offset}")
+
+            loop = asyncio.get_running_loop()
+            start_offset, start_crc = upload.offset, upload.crc
+            with open(upload.partial_path, "r+b") as f:
+                f.seek(start_offset)
+                try:
+                    async for chunk in body:
+                        if upload.offset + len(chunk) > upload.size:
+                            raise UploadTooLarge("Body exceeds announced size")
+                        await loop.run_in_executor(None, f.write, chunk)
+                        upload.crc = zlib.crc32(chunk, upload.crc)
+                        upload.offset += len(chunk)
+
+                    if expected_crc is not None and upload.crc != expected_crc:
+                        raise UploadConflict("Checksum mismatch")
+                except UploadError:
+                    # Roll back this body; an interrupted connection keeps what arrived
+                    upload.offset, upload.crc = start_offset, start_crc
+                    raise
+                finally:
+                    f.truncate(upload.offset)
+
+        if upload.complete:
+            return self._finalize(upload)
+        return None
+
+    def _finalize(self, upload: Upload) -> Path:
+        target = self.directory / upload.name
+        stem, suffix = target.stem, target.suffix
+        counter = 1
+        while target.exists():
+            target = self.directory / f"{stem} ({counter}){suffix}"
+            counter += 1
+
+        os.replace(upload.partial_path, target)
+        self._metadata_path(upload.id).unlink(missing_ok=True)
+        self._uploads.pop(upload.id, None)
+        logger.info(f"Upload {upload.id} saved to {target}")
+        return target
+
+    def _metadata_path(self, upload_id: str) -> Path:
+        return self.partial_dir / f"{upload_id}.json"
@@ -0,0 +1,334 @@
+import json
+import struct
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+
+from loguru import logger
+
+from server.config import MACRO_MAX_DELAY, MACRO_MAX_STEPS, MACRO_NAME_MAX_LENGTH, TIMER_SPIN
+from server.core.backend import pyautogui
+from server.core.hotlog import hotlog
+from server.core.metrics import metrics
+from server.core.protocol import paste_text
+from server.core.storage import atomic_write_json
+from server.core.timing import spin_until
+
+# Stored macro playback on /ws
+OP_MACRO = 0x0D
+
+# [OpCode] [Command] [Name: UTF8]
+MACRO = struct.Struct(">BB")
+
+MACRO_PLAY = 0x00
+MACRO_CANCEL = 0x01  # Stops the running macro and drops queued ones; the name is ignored
+
+CLICK_BUTTONS = ("left", "right", "middle")
+# The fields each kind of step may carry besides its own
+STEP_OPTIONS = {"key": {"modifiers"}, "text": set(), "click": {"count"}, "delay": set()}
+SUPER_KEYS = {"cmd", "command", "meta", "win"}
+
+
+def platform_key(key: str) -> str:
+    key = key.lower()
+    if key in SUPER_KEYS:
+        # The same macro should work on every desktop it is stored on
+        return "command" if sys.platform == "darwin" else "win"
+    return key
+
+
+class MacroStep(ABC):
+    @abstractmethod
+    def run(self, backend):
+        pass
+
+
+class KeyStep(MacroStep):
+    """A key, or a key combination pressed and released together."""
+
+    def __init__(self, *keys: str):
+        self.keys = keys
+
+    def run(self, backend):
+        if len(self.keys) == 1:
+            backend.press(self.keys[0])
+        else:
+            backend.hotkey(*self.keys)
+
+
+class TextStep(MacroStep):
+    def __init__(self, text: str):
+        self.text = text
+        # Typed directly where the keyboard can; anything else goes through the clipboard
+        self.typed = text.isascii() and text.isprintable()
+
+    def run(self, backend):
+        if self.typed:
+            backend.write(self.text)
+        else:
+            paste_text(self.text)
+
+
+class ClickStep(MacroStep):
+    def __init__(self, button: str, clicks: int = 1):
+        self.button = button
+        self.clicks = clicks
+
+    def run(self, backend):
+        backend.click(button=self.button, clicks=self.clicks)
+
+
+class MacroPlan:
+    """
+    A macro compiled for playback: each step with the pause before it, consecutive delay
+    steps already merged. `source` keeps the steps as stored, for the API.
+    """
+
+    def __init__(self, name: str, steps: list[tuple[float, MacroStep]], source: list):
+        self.name = name
+        self.steps = steps
+        self.source = source
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "steps": self.source}
+
+
+def parse_step(value) -> MacroStep | float:
+    """
+    One stored step: {"key": "enter"}, {"key": "t", "modifiers": ["ctrl", "shift"]},
+    {"text": "..."}, {"click": "left", "count": 2} or {"delay": 0.25} (seconds).
+    Delays come back as a float.
+    """
+    if not isinstance(value, dict):
+        raise ValueError(f"Invalid macro step: {value!r}")
+    kinds = value.keys() & STEP_OPTIONS.keys()
+    if len(kinds) != 1 or value.keys() - kinds - STEP_OPTIONS[next(iter(kinds))]:
+        raise ValueError(f"Invalid macro step: {value!r}")
+
+    if "key" in value:
+        keys = [*value.get("modifiers", []), value["key"]]
+        if not all(isinstance(key, str) for key in keys):
+            raise ValueError(f"Invalid key step: {value!r}")
+        keys = [platform_key(key) for key in keys]
+        unknown = [key for key in keys if key not in pyautogui.KEYBOARD_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown keys: {', '.join(unknown)}")
+        return KeyStep(*keys)
+    if "text" in value:
+        if not isinstance(value["text"], str) or not value["text"]:
+            raise ValueError("Text steps need some text")
+        return TextStep(value["text"])
+    if "click" in value:
+        count = value.get("count", 1)
+        if value["click"] not in CLICK_BUTTONS or not isinstance(count, int) or count < 1:
+            raise ValueError(f"Invalid click: {value!r}")
+        return ClickStep(value["click"], count)
+    if "delay" in value:
+        delay = value["delay"]
+        if not isinstance(delay, (int, float)) or not 0 <= delay <= MACRO_MAX_DELAY:
+            raise ValueError(f"Delays must be between 0 and {MACRO_MAX_DELAY} seconds")
+        return float(delay)
+    raise ValueError(f"Invalid macro step: {value!r}")
+
+
+def compile_macro(name: str, source) -> MacroPlan:
+    """Validate stored steps and turn them into a MacroPlan. Raises ValueError."""
+    if not name or len(name) > MACRO_NAME_MAX_LENGTH:
+        raise ValueError(f"Macro names must be 1 to {MACRO_NAME_MAX_LENGTH} characters")
+    if not isinstance(source, list) or not source:
+        raise ValueError("A macro needs at least one step")
+    if len(source) > MACRO_MAX_STEPS:
+        raise ValueError(f"Macros are limited to {MACRO_MAX_STEPS} steps")
+
+    steps: list[tuple[float, MacroStep]] = []
+    pending_delay = 0.0
+    for value in source:
+        step = parse_step(value)
+        if isinstance(step, float):
+            pending_delay += step
+        else:
+            steps.append((pending_delay, step))
+            pending_delay = 0.0
+    # A trailing delay would only hold up the next macro in the queue
+    return MacroPlan(name, steps, source)
+
+
+class MacroStore:
+    """
+    Macros persisted as JSON ({name: [step, ...]}) and kept compiled in memory.
+    The file is read on first use, and only then; triggering a macro never touches the
+    disk or parses anything.
+    """
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._plans: dict[str, MacroPlan] = {}
+        self._loaded = False
+
+    def _load(self):
+        # Assumes lock is held. Key names are checked against the input backend, so
+        # compiling waits until a macro is actually needed
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read macros {self.path}: {e}")
+            return
+        for name, source in data.items():
+            try:
+                self._plans[name] = compile_macro(name, source)
+            except ValueError as e:
+                logger.warning(f"Ignoring macro {name!r}: {e}")
+
+    def _save(self):
+        # Assumes lock is held
+        if self.path is None:
+            return
+        atomic_write_json(self.path, {name: plan.source for name, plan in self._plans.items()})
+
+    def get(self, name: str) -> MacroPlan | None:
+        with self._lock:
+            self._load()
+            return self._plans.get(name)
+
+    def plans(self) -> list[MacroPlan]:
+        with self._lock:
+            self._load()
+            return list(self._plans.values())
+
+    def save(self, name: str, source) -> MacroPlan:
+        plan = compile_macro(name, source)
+        with self._lock:
+            self._load()
+            self._plans[name] = plan
+            self._save()
+        logger.info(f"Saved macro {name!r} ({len(plan.steps)} steps)")
+        return plan
+
+    def remove(self, name: str) -> bool:
+        with self._lock:
+            self._load()
+            if self._plans.pop(name, None) is None:
+                return False
+            self._save()
+        logger.info(f"Removed macro {name!r}")
+        return True
+
+
+class MacroPlayer:
+    """
+    Plays OP_MACRO frames from the store on a worker thread, one macro at a time, so
+    the socket loop only looks up a compiled plan and queues it. Delays are timed from
+    the end of the previous step: sleep most of the way, then spin. MACRO_CANCEL stops
+    playback between steps, including in the middle of a delay.
+
+    The thread is started with the first macro and blocks while the queue is empty. Its
+    steps go through the shared backend, so they never interleave with input injected
+    from the socket loop (see server.core.backend.injection_lock).
+    """
+
+    stop_timeout = 1.0  # Seconds stop() waits for a step in progress
+
+    def __init__(self, store: MacroStore, backend=None, clock=time.perf_counter):
+        self.store = store
+        self.backend = backend or pyautogui
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._queue: deque[tuple[int, MacroPlan]] = deque()
+        self._generation = 0
+        self._running = False
+        self._thread: threading.Thread | None = None
+
+    def handle(self, data: bytes) -> bool:
+        if len(data) < MACRO.size:
+            metrics.record_malformed()
+            hotlog.warning("malformed_macro", "Malformed macro frame: {} bytes", len(data))
+            return False
+        _, command = MACRO.unpack_from(data)
+        if command == MACRO_CANCEL:
+            self.cancel()
+            return True
+
+        name = data[MACRO.size :].decode("utf-8", errors="replace")
+        plan = self.store.get(name)
+        if plan is None:
+            metrics.record_dropped()
+            hotlog.warning("unknown_macro", "Unknown macro {!r}", name)
+            return False
+        self.play(plan)
+        return True
+
+    def play(self, plan: MacroPlan):
+        with self._cond:
+            # A worker that outlived stop() is still inside a step; it picks this up next
+            self._running = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="macro-player", daemon=True)
+                self._thread.start()
+            self._queue.append((self._generation, plan))
+            self._cond.notify_all()
+
+    def cancel(self):
+        with self._cond:
+            self._generation += 1
+            self._queue.clear()
+            self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._generation += 1
+            self._queue.clear()
+            self._cond.notify_all()
+            thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=self.stop_timeout)
+
+    def _next(self) -> tuple[int, MacroPlan] | None:
+        with self._cond:
+            while self._running and not self._queue:
+                self._cond.wait()
+            if self._running:
+                return self._queue.popleft()
+            # Only the worker clears itself, so there is never more than one
+            self._thread = None
+            return None
+
+    def _wait(self, generation: int, delay: float) -> bool:
+        """Wait `delay` seconds; False if playback was cancelled meanwhile."""
+        deadline = self.clock() + delay
+        with self._cond:
+            while generation == self._generation:
+                remaining = deadline - self.clock() - TIMER_SPIN
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            else:
+                return False
+        spin_until(deadline, self.clock)
+        return generation == self._generation
+
+    def _play(self, generation: int, plan: MacroPlan):
+        for delay, step in plan.steps:
+            if delay and not self._wait(generation, delay):
+                return
+            if generation != self._generation:
+                return
+            try:
+                step.run(self.backend)
+            except Exception as e:
+                metrics.record_dropped()
+                hotlog.error("macro_step", "Macro {!r} failed: {}", plan.name, e)
+                return
+
+    def _run(self):
+        while (item := self._next()) is not None:
+            self._play(*item)
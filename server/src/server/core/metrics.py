@@ -1,6 +1,65 @@
+import os
+import sys
 import time
+from bisect import bisect_left
 from threading import Lock
 
+from server.core.events import TOPIC_RATE, TOPIC_SESSIONS, bus
+
+# Injection latency buckets (seconds). Input injection is expected to take well under
+# a millisecond; anything beyond ~50ms is a user-visible stutter.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+# Event loop lag buckets (seconds).
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+    Buckets are preallocated so observe() only increments existing slots.
+    """
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # Last slot is the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def render(self, name: str, lines: list[str]):
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts, strict=False):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_count {cumulative}")
+        lines.append(f"{name}_sum {self.sum}")
+
+
+def _process_rss_bytes() -> int | None:
+    """Current resident set size, best effort without extra dependencies."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+
+    # Peak RSS is the best we can get from getrusage (KiB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
 
 class Metrics:
     def __init__(self):
@@ -11,12 +70,73 @@ class Metrics:
         self._current_pps = 0
         self._current_bps = 0
 
+        # Cumulative counters for the /metrics exporter (indexed by opcode)
+        self.frames_total = [0] * 256
+        self.frame_bytes_total = [0] * 256
+        self.malformed_frames_total = 0
+        self.dropped_frames_total = 0
+        self.sessions_connected = 0
+        self.sessions_total = 0
+        self.injection_latency = Histogram(LATENCY_BUCKETS)
+        self.loop_lag = Histogram(LOOP_LAG_BUCKETS)
+        self.loop_lag_last = 0.0
+        self.loop_lag_max = 0.0
+        self.start_time = time.time()
+
     def add(self, num_bytes: int):
         with self._lock:
             # Check and reset window BEFORE adding new data
-            self._update_if_needed()
+            rolled = self._update_if_needed()
             self.packets_count += 1
             self.bytes_count += num_bytes
+            rate = self._current_pps, self._current_bps
+        if rolled:
+            bus.publish(TOPIC_RATE, rate)
+
+    def record_frame(self, opcode: int, num_bytes: int, latency: float):
+        """Record a processed frame. Called on the hot path, so only touches preallocated slots."""
+        with self._lock:
+            self.frames_total[opcode] += 1
+            self.frame_bytes_total[opcode] += num_bytes
+            self.injection_latency.observe(latency)
+
+    def record_malformed(self):
+        with self._lock:
+            self.malformed_frames_total += 1
+
+    def record_dropped(self):
+        with self._lock:
+            self.dropped_frames_total += 1
+
+    def session_opened(self):
+        with self._lock:
+            self.sessions_connected += 1
+            self.sessions_total += 1
+            connected = self.sessions_connected
+        bus.publish(TOPIC_SESSIONS, connected)
+
+    def session_closed(self):
+        with self._lock:
+            self.sessions_connected -= 1
+            connected = self.sessions_connected
+        bus.publish(TOPIC_SESSIONS, connected)
+
+    def observe_loop_lag(self, lag: float):
+        lag = max(0.0, lag)
+        with self._lock:
+            self.loop_lag.observe(lag)
+            self.loop_lag_last = lag
+            self.loop_lag_max = max(self.loop_lag_max, lag)
+
+    def loop_lag_summary(self) -> dict:
+        with self._lock:
+            count = sum(self.loop_lag.counts)
+            return {
+                "last": self.loop_lag_last,
+                "max": self.loop_lag_max,
+                "mean": self.loop_lag.sum / count if count else 0.0,
+                "samples": count,
+            }
 
     def _update_if_needed(self):
         # Assumes lock is held
@@ -33,8 +153,79 @@ class Metrics:
 
     def get_current(self):
         with self._lock:
-            self._update_if_needed()
-            return self._current_pps, self._current_bps
+            rolled = self._update_if_needed()
+            rate = self._current_pps, self._current_bps
+        if rolled:
+            bus.publish(TOPIC_RATE, rate)
+        return rate
+
+    def render_openmetrics(self) -> str:
+        """Render all counters in OpenMetrics text format. Only called when scraped."""
+        lines: list[str] = []
+
+        with self._lock:
+            lines.append("# TYPE remote_mouse_frames counter")
+            lines.append("# HELP remote_mouse_frames Frames processed per opcode.")
+            for opcode, count in enumerate(self.frames_total):
+                if count:
+                    lines.append(f'remote_mouse_frames_total{{opcode="0x{opcode:02x}"}} {count}')
+
+            lines.append("# TYPE remote_mouse_frame_bytes counter")
+            lines.append("# UNIT remote_mouse_frame_bytes bytes")
+            lines.append("# HELP remote_mouse_frame_bytes Payload bytes received per opcode.")
+            for opcode, count in enumerate(self.frame_bytes_total):
+                if count:
+                    lines.append(
+                        f'remote_mouse_frame_bytes_total{{opcode="0x{opcode:02x}"}} {count}'
+                    )
+
+            lines.append("# TYPE remote_mouse_malformed_frames counter")
+            lines.append("# HELP remote_mouse_malformed_frames Frames rejected as malformed.")
+            lines.append(f"remote_mouse_malformed_frames_total {self.malformed_frames_total}")
+
+            lines.append("# TYPE remote_mouse_dropped_frames counter")
+            lines.append("# HELP remote_mouse_dropped_frames Frames dropped due to errors.")
+            lines.append(f"remote_mouse_dropped_frames_total {self.dropped_frames_total}")
+
+            lines.append("# TYPE remote_mouse_sessions gauge")
+            lines.append("# HELP remote_mouse_sessions Currently connected WebSocket sessions.")
+            lines.append(f"remote_mouse_sessions {self.sessions_connected}")
+
+            lines.append("# TYPE remote_mouse_sessions_opened counter")
+            lines.append("# HELP remote_mouse_sessions_opened WebSocket sessions accepted.")
+            lines.append(f"remote_mouse_sessions_opened_total {self.sessions_total}")
+
+            lines.append("# TYPE remote_mouse_injection_latency_seconds histogram")
+            lines.append("# UNIT remote_mouse_injection_latency_seconds seconds")
+            lines.append(
+                "# HELP remote_mouse_injection_latency_seconds Time spent injecting one frame."
+            )
+            self.injection_latency.render("remote_mouse_injection_latency_seconds", lines)
+
+            lines.append("# TYPE remote_mouse_event_loop_lag_seconds histogram")
+            lines.append("# UNIT remote_mouse_event_loop_lag_seconds seconds")
+            lines.append("# HELP remote_mouse_event_loop_lag_seconds Event loop scheduling delay.")
+            self.loop_lag.render("remote_mouse_event_loop_lag_seconds", lines)
+
+        lines.append("# TYPE process_cpu_seconds counter")
+        lines.append("# UNIT process_cpu_seconds seconds")
+        lines.append("# HELP process_cpu_seconds Total user and system CPU time.")
+        lines.append(f"process_cpu_seconds_total {time.process_time()}")
+
+        rss = _process_rss_bytes()
+        if rss is not None:
+            lines.append("# TYPE process_resident_memory_bytes gauge")
+            lines.append("# UNIT process_resident_memory_bytes bytes")
+            lines.append("# HELP process_resident_memory_bytes Resident memory size.")
+            lines.append(f"process_resident_memory_bytes {rss}")
+
+        lines.append("# TYPE process_start_time_seconds gauge")
+        lines.append("# UNIT process_start_time_seconds seconds")
+        lines.append("# HELP process_start_time_seconds Start time since unix epoch.")
+        lines.append(f"process_start_time_seconds {self.start_time}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
 
 
 metrics = Metrics()
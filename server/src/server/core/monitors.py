@@ -0,0 +1,255 @@
+import sys
+import threading
+import time
+from collections.abc import Callable
+
+from loguru import logger
+
+from server.config import MONITOR_CHECK_INTERVAL
+from server.core.backend import pyautogui
+
+
+class Monitor:
+    """A rectangle of the virtual desktop, in the coordinates pyautogui moves in."""
+
+    def __init__(self, x: int, y: int, width: int, height: int, primary: bool = False):
+        self.x = x
+        self.y = y
+        self.width = max(1, width)
+        self.height = max(1, height)
+        self.primary = primary
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width - 1
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height - 1
+
+    def contains(self, x: int, y: int) -> bool:
+        return self.x <= x <= self.right and self.y <= y <= self.bottom
+
+    def clamp(self, x: int, y: int) -> tuple[int, int]:
+        return min(max(x, self.x), self.right), min(max(y, self.y), self.bottom)
+
+    def to_dict(self) -> dict:
+        return {
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "primary": self.primary,
+        }
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Monitor) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Monitor({self.x}, {self.y}, {self.width}x{self.height})"
+
+
+class DisplayLayout:
+    """
+    The monitors of one display configuration. Monitors are numbered from 1, primary
+    first and then left to right; 0 stands for the bounding box of all of them.
+    """
+
+    def __init__(self, monitors: list[Monitor]):
+        self.monitors = sorted(monitors, key=lambda m: (not m.primary, m.x, m.y))
+        left = min(m.x for m in self.monitors)
+        top = min(m.y for m in self.monitors)
+        right = max(m.right for m in self.monitors)
+        bottom = max(m.bottom for m in self.monitors)
+        self.desktop = Monitor(left, top, right - left + 1, bottom - top + 1)
+
+    def target(self, index: int) -> Monitor:
+        """Monitor `index`, or the whole desktop for 0 and indices that no longer exist."""
+        if 1 <= index <= len(self.monitors):
+            return self.monitors[index - 1]
+        return self.desktop
+
+    def clamp(self, x: int, y: int) -> tuple[int, int]:
+        """The point on a monitor closest to (x, y), where the OS would stop the cursor."""
+        best = None
+        best_distance = 0
+        for monitor in self.monitors:
+            if monitor.contains(x, y):
+                return x, y
+            cx, cy = monitor.clamp(x, y)
+            distance = (cx - x) ** 2 + (cy - y) ** 2
+            if best is None or distance < best_distance:
+                best, best_distance = (cx, cy), distance
+        return best
+
+
+def _windows_monitors() -> list[Monitor]:
+    import ctypes
+    from ctypes import wintypes
+
+    class MONITORINFO(ctypes.Structure):
+        _fields_ = [
+            ("cbSize", wintypes.DWORD),
+            ("rcMonitor", wintypes.RECT),
+            ("rcWork", wintypes.RECT),
+            ("dwFlags", wintypes.DWORD),
+        ]
+
+    MONITORINFOF_PRIMARY = 1
+    monitor_enum_proc = ctypes.WINFUNCTYPE(
+        wintypes.BOOL,
+        wintypes.HMONITOR,
+        wintypes.HDC,
+        ctypes.POINTER(wintypes.RECT),
+        wintypes.LPARAM,
+    )
+    user32 = ctypes.windll.user32
+    monitors = []
+
+    def callback(hmonitor, hdc, rect, data):
+        info = MONITORINFO()
+        info.cbSize = ctypes.sizeof(MONITORINFO)
+        if user32.GetMonitorInfoW(hmonitor, ctypes.byref(info)):
+            r = info.rcMonitor
+            primary = bool(info.dwFlags & MONITORINFOF_PRIMARY)
+            monitors.append(Monitor(r.left, r.top, r.right - r.left, r.bottom - r.top, primary))
+        return True
+
+    user32.EnumDisplayMonitors(None, None, monitor_enum_proc(callback), 0)
+    return monitors
+
+
+def _macos_monitors() -> list[Monitor]:
+    import Quartz
+
+    error, display_ids, count = Quartz.CGGetActiveDisplayList(32, None, None)
+    if error:
+        return []
+    monitors = []
+    for display_id in display_ids[:count]:
+        bounds = Quartz.CGDisplayBounds(display_id)
+        monitors.append(
+            Monitor(
+                int(bounds.origin.x),
+                int(bounds.origin.y),
+                int(bounds.size.width),
+                int(bounds.size.height),
+                bool(Quartz.CGDisplayIsMain(display_id)),
+            )
+        )
+    return monitors
+
+
+# One connection for every re-check, opened on the first; separate from pyautogui's, which
+# belongs to the input path
+_x11_display = None
+_x11_lock = threading.Lock()
+
+
+def _x11_monitors() -> list[Monitor]:
+    global _x11_display
+    from Xlib import display as xdisplay
+
+    with _x11_lock:
+        if _x11_display is None:
+            _x11_display = xdisplay.Display()
+        display = _x11_display
+        try:
+            if not display.has_extension("RANDR"):
+                return []
+            root = display.screen().root
+            reply = display.xrandr_get_monitors(root, is_active=True)
+        except Exception:
+            # Reconnect next time, e.g. after the X server restarted
+            _x11_display = None
+            display.close()
+            raise
+        return [
+            Monitor(m.x, m.y, m.width_in_pixels, m.height_in_pixels, bool(m.primary))
+            for m in reply.monitors
+        ]
+
+
+def enumerate_monitors() -> list[Monitor]:
+    """Ask the OS for the current monitors, falling back to pyautogui's primary screen."""
+    try:
+        if sys.platform == "win32":
+            monitors = _windows_monitors()
+        elif sys.platform == "darwin":
+            monitors = _macos_monitors()
+        else:
+            monitors = _x11_monitors()
+        if monitors:
+            return monitors
+    except Exception as e:
+        logger.debug(f"Monitor enumeration failed, using the primary screen: {e}")
+    width, height = pyautogui.size()
+    return [Monitor(0, 0, width, height, primary=True)]
+
+
+def _start_thread(target: Callable[[], None]):
+    threading.Thread(target=target, name="monitor-check", daemon=True).start()
+
+
+class MonitorIndex:
+    """
+    Caches the display layout so mapping a coordinate costs no OS call. Once the layout
+    is older than `check_interval` seconds, the next lookup still answers from it and
+    starts a re-check in the background, so input never waits on the OS; the layout is
+    swapped only when the geometry actually changed. invalidate() makes the next lookup
+    re-check, refresh() re-checks right away.
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], list[Monitor]] = enumerate_monitors,
+        check_interval: float = MONITOR_CHECK_INTERVAL,
+        clock=time.monotonic,
+        spawn: Callable[[Callable[[], None]], None] = _start_thread,
+    ):
+        self.source = source
+        self.check_interval = check_interval
+        self.clock = clock
+        self.spawn = spawn
+        self._lock = threading.Lock()
+        self._layout: DisplayLayout | None = None
+        self._checked_at = float("-inf")
+        self._checking = False
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = float("-inf")
+
+    def layout(self) -> DisplayLayout:
+        layout = self._layout
+        if layout is None:
+            return self.refresh()
+        now = self.clock()
+        if now - self._checked_at >= self.check_interval:
+            with self._lock:
+                start = not self._checking
+                self._checking = True
+                self._checked_at = now
+            if start:
+                self.spawn(self._check)
+        return self._layout
+
+    def refresh(self) -> DisplayLayout:
+        """Enumerate the monitors now, on the calling thread."""
+        layout = DisplayLayout(self.source())
+        with self._lock:
+            self._checked_at = self.clock()
+            if self._layout is None or layout.monitors != self._layout.monitors:
+                if self._layout is not None:
+                    logger.info(f"Display layout changed: {layout.monitors}")
+                self._layout = layout
+            return self._layout
+
+    def _check(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.debug(f"Monitor re-check failed: {e}")
+        finally:
+            with self._lock:
+                self._checking = False
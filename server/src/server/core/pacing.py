@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import deque
+
+from loguru import logger
+
+from server.config import (
+    PACING_HZ,
+    PACING_JITTER_WINDOW,
+    PACING_MAX_DELAY,
+    PACING_MIN_DELAY,
+)
+from server.core.backend import pyautogui
+from server.core.hotlog import hotlog
+from server.core.metrics import metrics
+from server.core.timing import sleep_until
+
+# The delay grows at once when arrivals get burstier, but shrinks by this share of the
+# difference per arrival, so a single calm stretch doesn't empty the buffer
+DELAY_SMOOTHING = 0.1
+# Arrival gap quantile the buffer delay is sized for
+DELAY_QUANTILE = 0.9
+# Deltas arriving within this share of a frame of each other were sent as one burst
+BURST_WINDOW = 0.25
+
+
+class MotionPacer:
+    """
+    Re-times relative pointer motion before it is injected.
+    Wi-Fi batching delivers OP_MOVE frames in bursts, and applying each frame on arrival
+    makes the cursor stutter even when the average rate is fine. Deltas are timestamped
+    on arrival and kept as a path of cumulative positions; an output thread samples that
+    path `delay` seconds in the past, once per display frame, so a burst is spread over
+    the gap before it. The delay follows recent arrival gaps and never exceeds
+    `max_delay`, which bounds the latency added by pacing.
+    """
+
+    def __init__(
+        self,
+        hz: float = PACING_HZ,
+        min_delay: float = PACING_MIN_DELAY,
+        max_delay: float = PACING_MAX_DELAY,
+        backend=None,
+        clock=time.perf_counter,
+    ):
+        self.period = 1.0 / hz
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.delay = min_delay
+        self.backend = backend or pyautogui
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        # (arrival time, cumulative dx, cumulative dy), oldest first
+        self._samples: deque[tuple[float, int, int]] = deque()
+        self._gaps: deque[float] = deque(maxlen=PACING_JITTER_WINDOW)
+        self._playout = float("-inf")
+        self._x = self._y = 0
+        self._emitted_x = self._emitted_y = 0
+
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="motion-pacer", daemon=True)
+        self._thread.start()
+        logger.info(f"Motion pacing at {1 / self.period:.0f} Hz (max delay {self.max_delay}s)")
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def push(self, dx: int, dy: int, now: float | None = None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            samples = self._samples
+            self._x += dx
+            self._y += dy
+            if not samples or now - samples[-1][0] > self.max_delay:
+                # A new stroke: ease the first delta in over one frame instead of
+                # interpolating across the idle time before it
+                samples.append((now - self.period, self._x - dx, self._y - dy))
+                samples.append((now, self._x, self._y))
+            elif now - samples[-1][0] < self.period * BURST_WINDOW:
+                # Same burst as the previous delta: fold it into that point of the path
+                samples[-1] = (samples[-1][0], self._x, self._y)
+            else:
+                self._gaps.append(now - samples[-1][0])
+                ordered = sorted(self._gaps)
+                target = ordered[min(len(ordered) - 1, int(len(ordered) * DELAY_QUANTILE))]
+                target = min(max(target, self.min_delay), self.max_delay)
+                if target > self.delay:
+                    self.delay = target
+                else:
+                    self.delay += (target - self.delay) * DELAY_SMOOTHING
+                samples.append((now, self._x, self._y))
+        self._wake.set()
+
+    def tick(self, now: float) -> tuple[int, int, bool]:
+        """Motion due at `now` as (dx, dy, idle); idle means everything has been emitted."""
+        with self._lock:
+            samples = self._samples
+            if not samples:
+                return 0, 0, True
+
+            # Never step back in time: a growing delay holds the cursor instead
+            playout = max(now - self.delay, self._playout)
+            self._playout = playout
+            # Keep the last sample at or before the playout point to interpolate from
+            while len(samples) >= 2 and samples[1][0] <= playout:
+                samples.popleft()
+
+            t0, x0, y0 = samples[0]
+            if playout > t0 and len(samples) >= 2:
+                t1, x1, y1 = samples[1]
+                f = (playout - t0) / (t1 - t0)
+                x, y = x0 + (x1 - x0) * f, y0 + (y1 - y0) * f
+            else:
+                x, y = x0, y0
+
+            dx = round(x) - self._emitted_x
+            dy = round(y) - self._emitted_y
+            self._emitted_x += dx
+            self._emitted_y += dy
+            idle = len(samples) == 1 and playout >= t0
+            return dx, dy, idle
+
+    def flush(self):
+        """Emit all buffered motion now, e.g. before a click that must land where the cursor is."""
+        with self._lock:
+            dx = self._x - self._emitted_x
+            dy = self._y - self._emitted_y
+            self._emitted_x, self._emitted_y = self._x, self._y
+            self._samples.clear()
+        if dx or dy:
+            self._move(dx, dy)
+
+    def _move(self, dx: int, dy: int):
+        try:
+            self.backend.moveRel(dx, dy)
+        except Exception as e:
+            metrics.record_dropped()
+            hotlog.error("pacing", "Error applying paced motion: {}", e)
+
+    def _run(self):
+        next_tick = self.clock()
+        while not self._stop_event.is_set():
+            # Cleared before looking at the buffer so a push during the tick is never missed
+            self._wake.clear()
+            dx, dy, idle = self.tick(self.clock())
+            if dx or dy:
+                self._move(dx, dy)
+
+            if idle:
+                # Nothing buffered: block instead of ticking an idle timer
+                self._wake.wait()
+                next_tick = self.clock()
+                continue
+
+            next_tick += self.period
+            # Fell behind (e.g. the process was suspended): skip the missed ticks
+            next_tick = max(next_tick, self.clock())
+            sleep_until(next_tick, self.clock)
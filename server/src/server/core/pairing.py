@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from server.config import (
+    PAIRING_CODE_DIGITS,
+    PAIRING_CODE_TTL,
+    PAIRING_MAX_ATTEMPTS,
+)
+from server.core.storage import atomic_write_json
+
+# Close code sent when a WebSocket fails the handshake (4000-4999 are application codes)
+WS_CLOSE_UNAUTHORIZED = 4401
+
+
+def challenge_mac(key: bytes, nonce: str) -> str:
+    """The response a paired device gives to the handshake challenge `nonce`."""
+    return hmac.new(key, nonce.encode("ascii"), hashlib.sha256).hexdigest()
+
+
+class PairedDevice:
+    def __init__(self, device_id: str, name: str, key: bytes, paired_at: float):
+        self.id = device_id
+        self.name = name
+        self.key = key
+        self.paired_at = paired_at
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "key": self.key.hex(), "paired_at": self.paired_at}
+
+
+class PairingStore:
+    """
+    Paired devices, persisted as JSON and cached in memory.
+    The file is read once; lookups during the handshake never touch the disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._devices: dict[str, PairedDevice] = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for device_id, entry in data.items():
+                self._devices[device_id] = PairedDevice(
+                    device_id, entry["name"], bytes.fromhex(entry["key"]), entry["paired_at"]
+                )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error(f"Failed to load paired devices from {self.path}: {e}")
+
+    def _save(self):
+        # Assumes lock is held. Device keys are secrets, so only the owner may read them
+        data = {device_id: device.to_dict() for device_id, device in self._devices.items()}
+        atomic_write_json(self.path, data, mode=0o600)
+
+    def get(self, device_id: str) -> PairedDevice | None:
+        return self._devices.get(device_id)
+
+    def devices(self) -> list[PairedDevice]:
+        return list(self._devices.values())
+
+    def add(self, name: str) -> PairedDevice:
+        device = PairedDevice(secrets.token_hex(8), name, secrets.token_bytes(32), time.time())
+        with self._lock:
+            self._devices[device.id] = device
+            self._save()
+        logger.info(f"Paired new device {device.id} ({name})")
+        return device
+
+    def remove(self, device_id: str) -> bool:
+        with self._lock:
+            if self._devices.pop(device_id, None) is None:
+                return False
+            self._save()
+        logger.info(f"Removed paired device {device_id}")
+        return True
+
+
+class PairingManager:
+    """
+    Issues short-lived pairing codes and checks handshake responses.
+    A code is single-use and is burnt after PAIRING_MAX_ATTEMPTS wrong guesses, so a
+    six-digit code can't be brute-forced from the LAN.
+    """
+
+    def __init__(self, store: PairingStore, required: bool = True, code_ttl=PAIRING_CODE_TTL):
+        self.store = store
+        self.required = required
+        self.code_ttl = code_ttl
+        self._lock = threading.Lock()
+        self._code: str | None = None
+        self._code_expires = 0.0
+        self._attempts = 0
+
+    def new_code(self) -> str:
+        code = "".join(secrets.choice("0123456789") for _ in range(PAIRING_CODE_DIGITS))
+        with self._lock:
+            self._code = code
+            self._code_expires = time.monotonic() + self.code_ttl
+            self._attempts = 0
+        logger.info("Pairing code issued")
+        return code
+
+    def active_code(self) -> str | None:
+        with self._lock:
+            if self._code and time.monotonic() < self._code_expires:
+                return self._code
+            return None
+
+    def redeem(self, code: str, name: str) -> PairedDevice | None:
+        with self._lock:
+            if not self._code or time.monotonic() >= self._code_expires:
+                return None
+            if not hmac.compare_digest(code.encode(), self._code.encode()):
+                self._attempts += 1
+                if self._attempts >= PAIRING_MAX_ATTEMPTS:
+                    logger.warning("Too many wrong pairing codes, code revoked")
+                    self._code = None
+                return None
+            self._code = None
+        return self.store.add(name[:64] or "Unnamed device")
+
+    @staticmethod
+    def new_challenge() -> str:
+        return secrets.token_hex(16)
+
+    def verify(self, device_id: str, nonce: str, mac: str) -> bool:
+        device = self.store.get(device_id)
+        if device is None:
+            return False
+        return hmac.compare_digest(mac.encode(), challenge_mac(device.key, nonce).encode())
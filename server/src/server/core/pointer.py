@@ -0,0 +1,116 @@
+import struct
+import threading
+import time
+
+from server.config import CURSOR_RESYNC_IDLE
+from server.core.backend import injection_lock, pyautogui
+from server.core.hotlog import hotlog
+from server.core.metrics import metrics
+from server.core.monitors import MonitorIndex
+
+# Absolute pointer positioning on /ws (tablet mode)
+OP_MOVE_ABS = 0x0C
+
+# [OpCode] [Monitor u8] [x u16] [y u16]. Monitor 0 is the whole desktop, 1.. a single
+# monitor; x and y span it from 0 to ABS_SCALE
+MOVE_ABS = struct.Struct(">BHH")
+ABS_SCALE = 0xFFFF
+
+
+def _fast_move(backend):
+    """
+    pyautogui's moveTo and moveRel read the cursor position before every move. The
+    platform module underneath moves without asking, which is all a tracked cursor needs.
+    """
+    platform = getattr(backend, "platformModule", None)
+    platform_move = getattr(platform, "_moveTo", None)
+    if not callable(platform_move):
+        return lambda x, y: backend.moveTo(x, y)
+
+    # Bypasses the backend wrapper, so it takes the injection lock itself
+    def move(x, y):
+        with injection_lock:
+            platform_move(x, y)
+
+    return move
+
+
+class CursorTracker:
+    """
+    Moves the pointer from a position the server keeps itself, so a move costs a single
+    OS call. The real position is read again only after CURSOR_RESYNC_IDLE seconds
+    without input, when the desktop's own mouse may have moved it. Offers the moveRel of
+    a pyautogui backend, so the motion pacer can drive it as well.
+    """
+
+    def __init__(
+        self,
+        monitors: MonitorIndex | None = None,
+        backend=None,
+        resync_idle: float = CURSOR_RESYNC_IDLE,
+        clock=time.monotonic,
+    ):
+        self.monitors = monitors or MonitorIndex()
+        self.backend = backend or pyautogui
+        self.resync_idle = resync_idle
+        self.clock = clock
+        self._move = None  # Resolved on the first move, so the backend loads with it
+        self._lock = threading.Lock()
+        self._position: tuple[int, int] | None = None
+        self._last_move = float("-inf")
+
+    @property
+    def position(self) -> tuple[int, int] | None:
+        return self._position
+
+    def moveRel(self, dx: int, dy: int):  # noqa: N802 - pyautogui backend interface
+        with self._lock:
+            now = self.clock()
+            if self._position is None or now - self._last_move > self.resync_idle:
+                x, y = self.backend.position()
+                self._position = (int(x), int(y))
+            x, y = self._position
+            self._apply(x + dx, y + dy, now)
+
+    def move_to(self, x: int, y: int):
+        with self._lock:
+            self._apply(x, y, self.clock())
+
+    def _apply(self, x: int, y: int, now: float):
+        # Stop where the OS would, or the tracked position drifts off screen
+        x, y = self.monitors.layout().clamp(x, y)
+        self._last_move = now
+        if (x, y) == self._position:
+            return
+        self._position = (x, y)
+        if self._move is None:
+            self._move = _fast_move(self.backend)
+        self._move(x, y)
+
+
+class AbsolutePointer:
+    """Maps OP_MOVE_ABS frames onto a monitor of the cached layout."""
+
+    def __init__(self, cursor: CursorTracker):
+        self.cursor = cursor
+
+    def handle(self, data: bytes) -> bool:
+        if len(data) < MOVE_ABS.size + 1:
+            metrics.record_malformed()
+            hotlog.warning("malformed_abs", "Malformed absolute move: {} bytes", len(data))
+            return False
+        index, nx, ny = MOVE_ABS.unpack_from(data, 1)
+        try:
+            target = self.cursor.monitors.layout().target(index)
+            x = target.x + round(nx * (target.width - 1) / ABS_SCALE)
+            y = target.y + round(ny * (target.height - 1) / ABS_SCALE)
+            self.cursor.move_to(x, y)
+        except Exception as e:
+            metrics.record_dropped()
+            hotlog.error("move_abs", "Error applying absolute move: {}", e)
+            return False
+        return True
+
+
+# One pointer per desktop, shared by every connection
+cursor = CursorTracker()
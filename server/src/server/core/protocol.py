@@ -1,5 +1,4 @@
 import struct
-import pyautogui
 import logging
 import pyperclip
 import sys
@@ -8,10 +7,11 @@ from contextlib import ExitStack
 
 from loguru import logger
 
-# 禁用 PyAutoGUI 的故障保险
-pyautogui.FAILSAFE = False
-# 移除每个指令后的默认暂停
-pyautogui.PAUSE = 0
+from server.core.backend import pyautogui
+from server.core.hotlog import hotlog
+from server.core.metrics import metrics
+from server.core.pointer import cursor
+from server.core.session import HeldInput
 
 OP_MOVE = 0x01
 OP_CLICK = 0x02
@@ -19,6 +19,26 @@ OP_SCROLL = 0x03
 OP_DRAG = 0x04
 OP_TEXT = 0x05
 OP_KEY_ACTION = 0x06
+OP_PING = 0x07  # Heartbeat, echoed back to the client unchanged
+# 0x08 OP_SCREEN_FRAME: screen preview channel (server.core.screen)
+# 0x09 OP_CLIPBOARD: clipboard sync (server.core.clipboard)
+# 0x0A OP_GESTURE: multi-finger gestures (server.core.gesture)
+# 0x0B OP_SCROLL_HIRES: sub-step scrolling (server.core.scroll)
+# 0x0C OP_MOVE_ABS: absolute positioning (server.core.pointer)
+# 0x0D OP_MACRO: stored macro playback (server.core.macro)
+
+# [OpCode] [dx i16] [dy i16]
+MOVE = struct.Struct(">hh")
+
+# Minimum frame length (including opcode) per opcode; shorter frames are malformed
+MIN_FRAME_LENGTH = {
+    OP_MOVE: 5,
+    OP_CLICK: 2,
+    OP_SCROLL: 5,
+    OP_DRAG: 2,
+    OP_TEXT: 1,
+    OP_KEY_ACTION: 2,
+}
 
 
 def get_modifiers_list(mask: int):
@@ -44,24 +64,69 @@ def get_modifiers_list(mask: int):
     return modifiers
 
 
-def process_binary_command(data: bytes):
+def paste_text(text: str):
+    # Use clipboard paste to support unicode (Chinese, etc.)
+    try:
+        # Save old clipboard content (best effort)
+        try:
+            old_content = pyperclip.paste()
+        except Exception:
+            old_content = ""
+
+        # Set new content
+        pyperclip.copy(text)
+
+        # Wait briefly for clipboard to update
+        time.sleep(0.1)
+
+        # Paste
+        if sys.platform == "darwin":
+            pyautogui.hotkey("command", "v")
+        else:
+            pyautogui.hotkey("ctrl", "v")
+
+        # Wait briefly for paste to complete
+        time.sleep(0.1)
+
+        # Restore old clipboard content
+        if old_content:
+            pyperclip.copy(old_content)
+    except Exception as e:
+        logger.error(f"Clipboard paste failed: {e}")
+        # Fallback to write if clipboard fails?
+        # might be better to just fail or try write as last resort
+        pyautogui.write(text)
+
+
+def release_held_input(held: HeldInput):
+    """Release every button still held, e.g. after a client vanished mid-drag."""
+    for button in list(held.buttons):
+        pyautogui.mouseUp(button=button)
+        held.buttons.discard(button)
+
+
+def process_binary_command(data: bytes, held: HeldInput | None = None) -> bool:
+    """Apply one input frame; returns False if it was malformed or failed."""
     if not data:
-        return
+        return False
 
     opcode = data[0]
 
+    min_length = MIN_FRAME_LENGTH.get(opcode)
+    if min_length is None or len(data) < min_length:
+        metrics.record_malformed()
+        hotlog.warning(
+            ("malformed", opcode), "Malformed frame: opcode {}, {} bytes", opcode, len(data)
+        )
+        return False
+
     try:
         if opcode == OP_MOVE:
-            if len(data) < 5:
-                return
-            dx, dy = struct.unpack(">hh", data[1:5])
-            pyautogui.moveRel(dx, dy)
+            dx, dy = MOVE.unpack_from(data, 1)
+            cursor.moveRel(dx, dy)
 
         elif opcode == OP_CLICK:
             # [OpCode] [Button] [ModifierMask]
-            if len(data) < 2:
-                return
-
             button_code = data[1]
             button = "left" if button_code == 0x01 else "right"
 
@@ -77,8 +142,6 @@ def process_binary_command(data: bytes):
                 pyautogui.click(button=button)
 
         elif opcode == OP_SCROLL:
-            if len(data) < 5:
-                return
             # aiortc/pyautogui scroll might need adjustment
             # pyautogui.scroll(clicks, x, y) - vertical
             # hscroll for horizontal if available
@@ -89,53 +152,21 @@ def process_binary_command(data: bytes):
                 pyautogui.hscroll(sx)
 
         elif opcode == OP_DRAG:
-            if len(data) < 2:
-                return
             state = data[1]
             if state == 0x01:
                 pyautogui.mouseDown(button="left")
+                if held is not None:
+                    held.buttons.add("left")
             else:
                 pyautogui.mouseUp(button="left")
+                if held is not None:
+                    held.buttons.discard("left")
 
         elif opcode == OP_TEXT:
-            text = data[1:].decode("utf-8")
-            # Use clipboard paste to support unicode (Chinese, etc.)
-            try:
-                # Save old clipboard content (best effort)
-                try:
-                    old_content = pyperclip.paste()
-                except Exception:
-                    old_content = ""
-
-                # Set new content
-                pyperclip.copy(text)
-
-                # Wait briefly for clipboard to update
-                time.sleep(0.1)
-
-                # Paste
-                if sys.platform == "darwin":
-                    pyautogui.hotkey("command", "v")
-                else:
-                    pyautogui.hotkey("ctrl", "v")
-
-                # Wait briefly for paste to complete
-                time.sleep(0.1)
-
-                # Restore old clipboard content
-                if old_content:
-                    pyperclip.copy(old_content)
-            except Exception as e:
-                logger.error(f"Clipboard paste failed: {e}")
-                # Fallback to write if clipboard fails?
-                # might be better to just fail or try write as last resort
-                pyautogui.write(text)
+            paste_text(data[1:].decode("utf-8"))
 
         elif opcode == OP_KEY_ACTION:
             # [OpCode] [ModifierMask] [KeyName: UTF8]
-            if len(data) < 2:
-                return
-
             mask = data[1]
             key_name = data[2:].decode("utf-8")
 
@@ -155,4 +186,7 @@ def process_binary_command(data: bytes):
                 pyautogui.press(key_name)
 
     except Exception as e:
-        logger.error(f"Error processing opcode {opcode}: {e}")
+        metrics.record_dropped()
+        hotlog.error(("opcode", opcode), "Error processing opcode {}: {}", opcode, e)
+        return False
+    return True
@@ -0,0 +1,57 @@
+import asyncio
+from collections.abc import Callable
+
+from loguru import logger
+
+
+class OnDemand:
+    """
+    Resources started for the first user and released `idle_timeout` seconds after the
+    last one leaves; a user returning within the timeout finds them still running.
+
+    Lives on the event loop. The idle timeout is a single call_later handle, cancelled
+    when a user arrives, so nothing runs periodically while the server waits.
+    """
+
+    def __init__(
+        self,
+        start: Callable[[], None],
+        stop: Callable[[], None],
+        idle_timeout: float | None = None,
+    ):
+        self.start_callback = start
+        self.stop_callback = stop
+        self.idle_timeout = idle_timeout
+        self.users = 0
+        self.active = False
+        self._timer: asyncio.TimerHandle | None = None
+
+    def acquire(self):
+        self.users += 1
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if not self.active:
+            self.active = True
+            logger.info("Starting input services")
+            self.start_callback()
+
+    def release(self):
+        self.users -= 1
+        if self.users == 0 and self.active and self.idle_timeout is not None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.idle_timeout, self._expire)
+
+    def _expire(self):
+        self._timer = None
+        if self.users == 0 and self.active:
+            logger.info(f"No client for {self.idle_timeout:.0f}s, releasing input services")
+            self.close()
+
+    def close(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self.active:
+            self.active = False
+            self.stop_callback()
@@ -0,0 +1,191 @@
+import asyncio
+import io
+import struct
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageGrab
+
+from server.config import (
+    SCREEN_ENCODER_THREADS,
+    SCREEN_IDLE_FPS,
+    SCREEN_IMAGE_QUALITY,
+    SCREEN_MAX_FPS,
+    SCREEN_MAX_KBPS,
+    SCREEN_MAX_WIDTH,
+    SCREEN_TILE_SIZE,
+)
+
+# Server -> client message on the /ws/screen channel
+OP_SCREEN_FRAME = 0x08
+
+# [OpCode] [Flags] [Width] [Height] [TileSize] [TileCount]
+FRAME_HEADER = struct.Struct(">BBHHHH")
+# [Column] [Row] [Length] followed by the encoded image
+TILE_HEADER = struct.Struct(">HHI")
+
+FLAG_KEYFRAME = 0x01
+FLAG_WEBP = 0x02
+
+
+def capture_screen(max_width: int = SCREEN_MAX_WIDTH) -> np.ndarray:
+    """Grab the whole desktop, downscaled to at most `max_width`, as an RGB array."""
+    image = ImageGrab.grab(all_screens=True).convert("RGB")
+    if image.width > max_width:
+        height = max(1, round(image.height * max_width / image.width))
+        image = image.resize((max_width, height), Image.Resampling.BILINEAR)
+    return np.asarray(image)
+
+
+class TileDiffer:
+    """Finds fixed-size tiles that changed since the previous frame."""
+
+    def __init__(self, tile_size: int = SCREEN_TILE_SIZE):
+        self.tile_size = tile_size
+        self.previous: np.ndarray | None = None
+
+    def diff(self, frame: np.ndarray) -> np.ndarray:
+        """Return an (N, 2) array of (row, column) indices of changed tiles."""
+        ts = self.tile_size
+        height, width = frame.shape[:2]
+        rows, cols = -(-height // ts), -(-width // ts)
+
+        if self.previous is None or self.previous.shape != frame.shape:
+            self.previous = frame.copy()
+            return np.argwhere(np.ones((rows, cols), dtype=bool))
+
+        changed = (frame != self.previous).any(axis=2)
+        np.copyto(self.previous, frame)
+
+        if height % ts or width % ts:
+            padded = np.zeros((rows * ts, cols * ts), dtype=bool)
+            padded[:height, :width] = changed
+            changed = padded
+
+        grid = changed.reshape(rows, ts, cols, ts).any(axis=(1, 3))
+        return np.argwhere(grid)
+
+
+def encode_tile(
+    frame: np.ndarray,
+    row: int,
+    col: int,
+    tile_size: int = SCREEN_TILE_SIZE,
+    quality: int = SCREEN_IMAGE_QUALITY,
+    image_format: str = "JPEG",
+) -> bytes:
+    tile = frame[row * tile_size : (row + 1) * tile_size, col * tile_size : (col + 1) * tile_size]
+    buffer = io.BytesIO()
+    Image.fromarray(tile).save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def pack_frame(
+    width: int,
+    height: int,
+    tile_size: int,
+    tiles: list[tuple[int, int, bytes]],
+    flags: int = 0,
+) -> bytes:
+    parts = [FRAME_HEADER.pack(OP_SCREEN_FRAME, flags, width, height, tile_size, len(tiles))]
+    for row, col, payload in tiles:
+        parts.append(TILE_HEADER.pack(col, row, len(payload)))
+        parts.append(payload)
+    return b"".join(parts)
+
+
+class ScreenStreamer:
+    """
+    Streams changed screen tiles to one subscriber.
+    Capture, diffing and encoding all run in a private thread pool so the event loop
+    (and with it the input path) is never blocked. The frame rate drops towards
+    SCREEN_IDLE_FPS while the screen is static and the output is paced to `max_kbps`.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[bytes], Awaitable[None]],
+        capture: Callable[[], np.ndarray] = capture_screen,
+        max_fps: float = SCREEN_MAX_FPS,
+        max_kbps: float = SCREEN_MAX_KBPS,
+        tile_size: int = SCREEN_TILE_SIZE,
+        quality: int = SCREEN_IMAGE_QUALITY,
+        image_format: str = "JPEG",
+    ):
+        self.send = send
+        self.capture = capture
+        self.max_fps = max(0.1, min(max_fps, SCREEN_MAX_FPS))
+        self.max_bytes_per_second = max(1.0, min(max_kbps, SCREEN_MAX_KBPS)) * 1000 / 8
+        self.tile_size = tile_size
+        self.quality = quality
+        self.image_format = image_format
+        self.differ = TileDiffer(tile_size)
+        self.frames_sent = 0
+        self.bytes_sent = 0
+
+    async def next_frame(self, executor: ThreadPoolExecutor) -> bytes | None:
+        """Capture and encode one frame. Returns None if nothing changed."""
+        loop = asyncio.get_running_loop()
+        frame = await loop.run_in_executor(executor, self.capture)
+        keyframe = self.differ.previous is None
+        changed = await loop.run_in_executor(executor, self.differ.diff, frame)
+        if not len(changed):
+            return None
+
+        payloads = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    encode_tile,
+                    frame,
+                    row,
+                    col,
+                    self.tile_size,
+                    self.quality,
+                    self.image_format,
+                )
+                for row, col in changed.tolist()
+            )
+        )
+        tiles = [
+            (row, col, payload)
+            for (row, col), payload in zip(changed.tolist(), payloads, strict=True)
+        ]
+
+        flags = FLAG_KEYFRAME if keyframe else 0
+        if self.image_format == "WEBP":
+            flags |= FLAG_WEBP
+        height, width = frame.shape[:2]
+        return pack_frame(width, height, self.tile_size, tiles, flags)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        min_interval = 1 / self.max_fps
+        idle_interval = max(min_interval, 1 / SCREEN_IDLE_FPS)
+        interval = min_interval
+
+        executor = ThreadPoolExecutor(
+            max_workers=SCREEN_ENCODER_THREADS, thread_name_prefix="screen-encoder"
+        )
+        try:
+            while True:
+                started = loop.time()
+                message = await self.next_frame(executor)
+
+                if message is None:
+                    # Static screen: back off towards the idle frame rate
+                    interval = min(interval * 2, idle_interval)
+                    delay = interval
+                else:
+                    await self.send(message)
+                    self.frames_sent += 1
+                    self.bytes_sent += len(message)
+                    interval = min_interval
+                    # Bandwidth cap: don't start the next frame before this one "drained"
+                    delay = max(interval, len(message) / self.max_bytes_per_second)
+
+                await asyncio.sleep(max(0.0, delay - (loop.time() - started)))
+        finally:
+            # Don't block the event loop waiting for an in-flight capture on cancellation
+            executor.shutdown(wait=False, cancel_futures=True)
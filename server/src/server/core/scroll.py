@@ -0,0 +1,180 @@
+import os
+import struct
+import sys
+import threading
+from contextlib import suppress
+
+from loguru import logger
+
+from server.core.backend import pyautogui
+from server.core.hotlog import hotlog
+from server.core.metrics import metrics
+
+# Sub-step scrolling on /ws, one frame per batch of scroll motion
+OP_SCROLL_HIRES = 0x0B
+
+# [OpCode] [sx i16] [sy i16], in 1/120 of an OP_SCROLL step (the resolution of a Windows
+# WHEEL_DELTA and of the Linux REL_WHEEL_HI_RES axes)
+SCROLL_HIRES = struct.Struct(">hh")
+UNITS_PER_STEP = 120
+
+# linux/uinput.h and linux/input-event-codes.h
+UI_SET_EVBIT = 0x40045564
+UI_SET_KEYBIT = 0x40045565
+UI_SET_RELBIT = 0x40045566
+UI_DEV_SETUP = 0x405C5503
+UI_DEV_CREATE = 0x5501
+UI_DEV_DESTROY = 0x5502
+BUS_VIRTUAL = 0x06
+EV_SYN, EV_KEY, EV_REL = 0x00, 0x01, 0x02
+SYN_REPORT = 0x00
+BTN_LEFT = 0x110
+REL_X, REL_Y = 0x00, 0x01
+REL_HWHEEL, REL_WHEEL = 0x06, 0x08
+REL_WHEEL_HI_RES, REL_HWHEEL_HI_RES = 0x0B, 0x0C
+
+# struct input_event: timeval (zero lets the kernel stamp it), type, code, value
+INPUT_EVENT = struct.Struct("llHHi")
+# struct uinput_setup: input_id, name[80], ff_effects_max
+UINPUT_SETUP = struct.Struct("HHHH80sI")
+
+
+def _split(total: int) -> tuple[int, int]:
+    """Whole steps in `total` units, rounded toward zero, and the remainder."""
+    steps = int(total / UNITS_PER_STEP)
+    return steps, total - steps * UNITS_PER_STEP
+
+
+class QuantizedWheel:
+    """
+    Whole wheel steps through pyautogui. The sub-step remainder is carried on the server,
+    so a slow scroll still produces a step once enough motion has built up.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or pyautogui
+        self.rest_x = 0
+        self.rest_y = 0
+
+    def scroll(self, units_x: int, units_y: int):
+        # A change of direction drops what was left over from the other way
+        if units_x * self.rest_x < 0:
+            self.rest_x = 0
+        if units_y * self.rest_y < 0:
+            self.rest_y = 0
+        steps_x, self.rest_x = _split(self.rest_x + units_x)
+        steps_y, self.rest_y = _split(self.rest_y + units_y)
+        if steps_y:
+            self.backend.scroll(steps_y)
+        if steps_x:
+            self.backend.hscroll(steps_x)
+
+    def close(self):
+        pass
+
+
+class UinputWheel:
+    """
+    A virtual mouse with the kernel's high-resolution wheel axes (Linux).
+    Every frame is passed on at full resolution; the legacy REL_WHEEL notch is emitted
+    alongside whenever a whole step has built up, as hi-res hardware does.
+    """
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.rest_x = 0
+        self.rest_y = 0
+
+    @classmethod
+    def open(cls, path: str = "/dev/uinput") -> "UinputWheel":
+        import fcntl
+
+        fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+        try:
+            fcntl.ioctl(fd, UI_SET_EVBIT, EV_KEY)
+            # Pointer axes and a button so the device is classified as a mouse
+            fcntl.ioctl(fd, UI_SET_KEYBIT, BTN_LEFT)
+            fcntl.ioctl(fd, UI_SET_EVBIT, EV_REL)
+            for code in (REL_X, REL_Y, REL_WHEEL, REL_HWHEEL, REL_WHEEL_HI_RES, REL_HWHEEL_HI_RES):
+                fcntl.ioctl(fd, UI_SET_RELBIT, code)
+            setup = UINPUT_SETUP.pack(BUS_VIRTUAL, 0, 0, 1, b"Remote Mouse Wheel", 0)
+            fcntl.ioctl(fd, UI_DEV_SETUP, setup)
+            fcntl.ioctl(fd, UI_DEV_CREATE)
+        except OSError:
+            os.close(fd)
+            raise
+        return cls(fd)
+
+    def scroll(self, units_x: int, units_y: int):
+        events = []
+        if units_y:
+            if units_y * self.rest_y < 0:
+                self.rest_y = 0
+            steps, self.rest_y = _split(self.rest_y + units_y)
+            events.append(INPUT_EVENT.pack(0, 0, EV_REL, REL_WHEEL_HI_RES, units_y))
+            if steps:
+                events.append(INPUT_EVENT.pack(0, 0, EV_REL, REL_WHEEL, steps))
+        if units_x:
+            if units_x * self.rest_x < 0:
+                self.rest_x = 0
+            steps, self.rest_x = _split(self.rest_x + units_x)
+            events.append(INPUT_EVENT.pack(0, 0, EV_REL, REL_HWHEEL_HI_RES, units_x))
+            if steps:
+                events.append(INPUT_EVENT.pack(0, 0, EV_REL, REL_HWHEEL, steps))
+        if events:
+            events.append(INPUT_EVENT.pack(0, 0, EV_SYN, SYN_REPORT, 0))
+            os.write(self.fd, b"".join(events))
+
+    def close(self):
+        import fcntl
+
+        with suppress(OSError):
+            fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+        os.close(self.fd)
+
+
+def open_wheel():
+    """The best wheel the platform offers: uinput hi-res on Linux, else quantized steps."""
+    if sys.platform.startswith("linux"):
+        try:
+            wheel = UinputWheel.open()
+            logger.info("Scrolling through a high-resolution uinput wheel")
+            return wheel
+        except OSError as e:
+            logger.debug(f"uinput unavailable, scrolling in whole steps: {e}")
+    return QuantizedWheel()
+
+
+class HiResScroll:
+    """Handles OP_SCROLL_HIRES frames. The wheel is opened on first use and shared."""
+
+    def __init__(self, wheel=None):
+        self._wheel = wheel
+        self._lock = threading.Lock()
+
+    @property
+    def wheel(self):
+        with self._lock:
+            if self._wheel is None:
+                self._wheel = open_wheel()
+            return self._wheel
+
+    def handle(self, data: bytes) -> bool:
+        if len(data) < 1 + SCROLL_HIRES.size:
+            metrics.record_malformed()
+            hotlog.warning("malformed_scroll", "Malformed hi-res scroll: {} bytes", len(data))
+            return False
+        units_x, units_y = SCROLL_HIRES.unpack_from(data, 1)
+        try:
+            self.wheel.scroll(units_x, units_y)
+        except Exception as e:
+            metrics.record_dropped()
+            hotlog.error("scroll", "Error processing hi-res scroll: {}", e)
+            return False
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._wheel is not None:
+                self._wheel.close()
+                self._wheel = None
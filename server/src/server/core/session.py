@@ -0,0 +1,91 @@
+import asyncio
+import secrets
+from collections.abc import Callable
+
+from loguru import logger
+
+from server.config import SESSION_GRACE_PERIOD
+
+
+class HeldInput:
+    """
+    Buttons currently held down on behalf of a client. Keys never are: modifiers are
+    sent with the click or key they apply to and released within the same frame.
+    """
+
+    def __init__(self):
+        self.buttons: set[str] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.buttons)
+
+
+class Session:
+    def __init__(self, token: str):
+        self.token = token
+        self.held = HeldInput()
+        # Incremented on every (re)attach so a stale connection can't detach a resumed session
+        self.generation = 0
+        self.expiry: asyncio.TimerHandle | None = None
+
+
+class SessionManager:
+    """
+    Issues session tokens and keeps sessions alive for a grace period after disconnect.
+    A client reconnecting within the grace window resumes its session with held input
+    intact; once the window expires all held input is released.
+    """
+
+    def __init__(
+        self,
+        release_callback: Callable[[HeldInput], None],
+        grace_period: float = SESSION_GRACE_PERIOD,
+    ):
+        self.release_callback = release_callback
+        self.grace_period = grace_period
+        self.sessions: dict[str, Session] = {}
+
+    def attach(self, token: str | None = None) -> tuple[Session, bool]:
+        """Resume the session for `token` if it is still alive, otherwise start a new one."""
+        session = self.sessions.get(token) if token else None
+        resumed = session is not None
+
+        if session is None:
+            session = Session(secrets.token_urlsafe(16))
+            self.sessions[session.token] = session
+        elif session.expiry:
+            session.expiry.cancel()
+            session.expiry = None
+
+        session.generation += 1
+        return session, resumed
+
+    def detach(self, session: Session, generation: int):
+        """Start the grace timer unless the session was already resumed elsewhere."""
+        if session.generation != generation or self.sessions.get(session.token) is not session:
+            return
+
+        if self.grace_period <= 0:
+            self.expire(session.token)
+            return
+
+        loop = asyncio.get_running_loop()
+        session.expiry = loop.call_later(self.grace_period, self.expire, session.token)
+
+    def expire(self, token: str):
+        session = self.sessions.pop(token, None)
+        if session is None:
+            return
+        if session.expiry:
+            session.expiry.cancel()
+            session.expiry = None
+        if session.held:
+            logger.info("Session expired with held input, releasing")
+            try:
+                self.release_callback(session.held)
+            except Exception as e:
+                logger.error(f"Failed to release held input: {e}")
+
+    def expire_all(self):
+        for token in list(self.sessions):
+            self.expire(token)
@@ -0,0 +1,18 @@
+import json
+import os
+from pathlib import Path
+
+
+def atomic_write_json(path: Path, data, mode: int | None = None):
+    """
+    Write `data` as JSON through a temporary file renamed over `path`, so a crash never
+    leaves a truncated file. `mode` is applied before the rename, so the content is never
+    readable with looser permissions.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    if mode is not None:
+        os.chmod(temp_path, mode)
+    os.replace(temp_path, path)
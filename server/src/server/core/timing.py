@@ -0,0 +1,21 @@
+import time
+
+from server.config import TIMER_SPIN
+
+
+def spin_until(deadline: float, clock=time.perf_counter):
+    """Busy-wait for the last stretch before `deadline`, which no sleep can hit exactly."""
+    while clock() < deadline:
+        pass
+
+
+def sleep_until(deadline: float, clock=time.perf_counter):
+    """
+    Sleep most of the way, then spin: sleeps alone overshoot by up to a millisecond.
+    Callers that need to be woken early wait on their own condition for the first part
+    and only call spin_until() for the last TIMER_SPIN seconds.
+    """
+    remaining = deadline - clock() - TIMER_SPIN
+    if remaining > 0:
+        time.sleep(remaining)
+    spin_until(deadline, clock)
@@ -1,58 +1,157 @@
 import argparse
+import os
 import sys
 from loguru import logger
 
-from server.config import DEFAULT_PORT, configure_logging
-from server.services.mdns import MDNSResponder
+from server.config import (
+    DEFAULT_PORT,
+    INPUT_IDLE_TIMEOUT,
+    PACING_HZ,
+    configure_logging,
+    get_paired_devices_file,
+)
+from server.core.hotlog import hotlog
+from server.core.pairing import PairingManager, PairingStore
+from server.services.mdns import get_local_ip
 from server.services.manager import ServiceManager
-from server.ui.tray_icon import TrayIcon
+
+# First descriptor passed by systemd socket activation (sd_listen_fds)
+SD_LISTEN_FDS_START = 3
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Remote Mouse Server")
     parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
     parser.add_argument("--log", action="store_true", help="Enable file logging")
+    parser.add_argument(
+        "--trace", action="store_true", help="Write sampled command traces to trace.jsonl"
+    )
+    parser.add_argument(
+        "--no-pairing",
+        action="store_true",
+        help="Accept unpaired clients (only on networks you trust)",
+    )
+    parser.add_argument(
+        "--pace",
+        type=float,
+        nargs="?",
+        const=PACING_HZ,
+        metavar="HZ",
+        help=f"Smooth bursty pointer motion, re-timed at HZ (default {PACING_HZ:.0f})",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Run without the tray; input is only loaded while a client is connected",
+    )
+    parser.add_argument(
+        "--fd",
+        type=int,
+        metavar="FD",
+        help="Serve on an already-bound listening socket (detected under systemd)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=INPUT_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help="Headless: release input this long after the last client disconnects",
+    )
     return parser.parse_args()
 
 
+def inherited_socket() -> int | None:
+    """The listening socket systemd passed to this process, if any."""
+    if os.environ.get("LISTEN_PID") != str(os.getpid()):
+        return None
+    if int(os.environ.get("LISTEN_FDS", "0")) < 1:
+        return None
+    return SD_LISTEN_FDS_START
+
+
+def run_headless(service_manager: ServiceManager, pairing: PairingManager):
+    # Without a tray to show one, a code is logged for the first device to pair with;
+    # later ones are issued on request from this machine
+    if pairing.required:
+        if not pairing.store.devices():
+            logger.info(f"No paired devices. Pairing code: {pairing.new_code()}")
+        logger.info(
+            "To pair a device, get a code with: "
+            f"curl -X POST http://127.0.0.1:{service_manager.port}/api/local/pairing-code"
+        )
+    service_manager.run()
+    logger.info("Application exited gracefully.")
+
+
 def main():
     args = parse_args()
 
     # Initial logging configuration
-    configure_logging(args.log)
-    logger.info(f"Application starting... (Port: {args.port}, Log: {args.log})")
+    configure_logging(args.log, args.trace)
+    logging_state = {"debug": args.log, "trace": args.trace}
+    if args.trace:
+        hotlog.set_tracing(True)
+    logger.info(
+        f"Application starting... (Port: {args.port}, Log: {args.log}, Headless: {args.headless})"
+    )
 
     # 1. Initialize Service Manager
-    # Pass initial debug state
-    service_manager = ServiceManager(port=args.port, debug=args.log)
+    # Pass initial debug state. Pairing outlives restarts so a code shown in the tray stays valid
+    pairing = PairingManager(PairingStore(get_paired_devices_file()), required=not args.no_pairing)
+    service_manager = ServiceManager(
+        port=args.port,
+        debug=args.log,
+        pairing=pairing,
+        pace_hz=args.pace,
+        headless=args.headless,
+        fd=args.fd if args.fd is not None else inherited_socket(),
+        idle_timeout=args.idle_timeout,
+    )
+
+    if args.headless:
+        # Never touches the tray stack, so no display or icon libraries are loaded
+        try:
+            run_headless(service_manager, pairing)
+        except Exception as e:
+            logger.critical(f"Unhandled exception in main: {e}", exc_info=True)
+            sys.exit(1)
+        sys.exit(0)
 
     # 2. Helper to handle logging toggle from Tray
     def on_log_toggle(enabled: bool):
         # Update global logging configuration
-        configure_logging(enabled)
+        logging_state["debug"] = enabled
+        configure_logging(enabled, logging_state["trace"])
         # Update ServiceManager state (will take effect on next restart)
         service_manager.set_debug(enabled)
 
-    # 3. Get Local IP for Tray (using a temporary mDNS instance)
-    temp_mdns = MDNSResponder(port=args.port)
-    local_ip = temp_mdns.get_local_ip()
-    # No need to register, just need the IP logic.
+    # Command tracing switches at once: the trace file handler comes and goes with it
+    def on_trace_toggle(enabled: bool):
+        logging_state["trace"] = enabled
+        configure_logging(logging_state["debug"], enabled)
+        hotlog.set_tracing(enabled)
 
-    # 4. Initialize Tray Icon
+    from server.ui.tray_icon import TrayIcon
+
+    # 3. Initialize Tray Icon. The address shown is updated from the event bus whenever
+    # mDNS registers again, e.g. after a restart on a new network
     tray = TrayIcon(
-        port=args.port,
-        ip_address=local_ip,
+        port=service_manager.port,
+        ip_address=get_local_ip(),
         on_exit_callback=service_manager.stop,
         restart_callback=service_manager.restart,
         on_log_toggle_callback=on_log_toggle,
         initial_logging_state=args.log,
+        on_pair_callback=pairing.new_code if pairing.required else None,
+        on_trace_toggle_callback=on_trace_toggle,
+        initial_trace_state=args.trace,
     )
 
     try:
-        # 5. Start Services (mDNS + Web Server)
+        # 4. Start Services (mDNS + Web Server)
         service_manager.start()
 
-        # 6. Start Tray Icon (Main Thread Blocking)
+        # 5. Start Tray Icon (Main Thread Blocking)
         tray.run()
 
         # When tray.run() returns (after Stop/Exit clicked)
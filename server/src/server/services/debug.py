@@ -0,0 +1,88 @@
+import asyncio
+import ipaddress
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+
+from server.config import DEBUG_PROFILE_INTERVAL
+from server.core.diagnostics import MemoryTracker, SamplingProfiler, thread_states
+from server.core.metrics import metrics
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def require_loopback(request: Request):
+    """
+    Diagnostics expose stacks and file paths, and pairing codes grant input control, so
+    they are only served to this machine, and not to web pages open on it: any page can
+    send a simple cross-origin POST to 127.0.0.1, and a DNS name rebound to it looks
+    same-origin. Browsers always send Origin with those; command-line tools don't.
+    """
+    if not is_loopback(request.client.host if request.client else ""):
+        raise HTTPException(status_code=403, detail="Only served on localhost")
+
+    origin = request.headers.get("origin")
+    if origin is not None:
+        parsed = urlsplit(origin)
+        same_origin = parsed.netloc == request.headers.get("host")
+        if not same_origin or not is_loopback(parsed.hostname or ""):
+            raise HTTPException(status_code=403, detail="Not served to other origins")
+
+
+router = APIRouter(prefix="/api/debug", dependencies=[Depends(require_loopback)])
+
+profiler = SamplingProfiler()
+memory = MemoryTracker()
+
+
+@router.post("/profile/start")
+async def start_profile(interval: float = DEBUG_PROFILE_INTERVAL):
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="Profiler already running")
+    profiler.interval = max(0.001, interval)
+    profiler.start()
+    return {"status": "started", "interval": profiler.interval}
+
+
+@router.post("/profile/stop")
+async def stop_profile():
+    if not profiler.running and not profiler.sample_count:
+        raise HTTPException(status_code=409, detail="Profiler not running")
+    collapsed = await asyncio.to_thread(profiler.stop)
+    return Response(
+        collapsed,
+        media_type="text/plain",
+        headers={"Content-Disposition": 'attachment; filename="remote-mouse.folded"'},
+    )
+
+
+@router.post("/memory/snapshot")
+async def memory_snapshot():
+    # Snapshots walk every traced allocation; keep that off the event loop serving input
+    return await asyncio.to_thread(memory.snapshot)
+
+
+@router.get("/memory/diff")
+async def memory_diff(limit: int = 25):
+    top = await asyncio.to_thread(memory.diff, limit)
+    if top is None:
+        raise HTTPException(status_code=409, detail="Take a snapshot first")
+    return {"top": top}
+
+
+@router.post("/memory/stop")
+async def memory_stop():
+    await asyncio.to_thread(memory.stop)
+    return {"status": "stopped"}
+
+
+@router.get("/threads")
+async def threads():
+    return {"threads": thread_states(), "loop_lag": metrics.loop_lag_summary()}
@@ -1,8 +1,12 @@
+import signal
+import socket
 import threading
 import uvicorn
 from loguru import logger
 
-from server.services.mdns import MDNSResponder
+from server.config import INPUT_IDLE_TIMEOUT, WS_PING_INTERVAL, WS_PING_TIMEOUT
+from server.core.pairing import PairingManager
+from server.services.mdns import MDNSResponder, PeerCache
 from server.services.web import create_app
 
 
@@ -10,11 +14,34 @@ class ServiceManager:
     """
     Manages the lifecycle of background services (HTTP server and mDNS).
     Provides methods for clean startup, shutdown, and soft restart.
+
+    Headless, input is only loaded while a client is connected (see create_app's `lazy`),
+    and `fd` may be a listening socket inherited from the service manager, e.g. systemd
+    socket activation, which is used instead of binding `port`.
     """
 
-    def __init__(self, port: int, debug: bool = False):
+    def __init__(
+        self,
+        port: int,
+        debug: bool = False,
+        pairing: PairingManager | None = None,
+        pace_hz: float | None = None,
+        headless: bool = False,
+        fd: int | None = None,
+        idle_timeout: float = INPUT_IDLE_TIMEOUT,
+    ):
+        if fd is not None:
+            # Announce the port the inherited socket is actually bound to
+            with socket.socket(fileno=socket.dup(fd)) as inherited:
+                port = inherited.getsockname()[1]
         self.port = port
+        self.headless = headless
+        self.fd = fd
+        self.idle_timeout = idle_timeout
         self.debug = debug
+        self.pairing = pairing
+        self.pace_hz = pace_hz
+        self.peers = PeerCache()
         self.mdns = None
         self.server = None
         self.server_thread = None
@@ -23,33 +50,75 @@ class ServiceManager:
         self.debug = debug
         # Note: Changing this doesn't affect currently running service until restart.
 
+    def _create_server(self) -> uvicorn.Server:
+        # Determine Uvicorn log level based on debug state
+        log_level = "debug" if self.debug else "info"
+        app = create_app(
+            self.pairing,
+            self.pace_hz,
+            self.peers,
+            lazy=self.headless,
+            idle_timeout=self.idle_timeout,
+        )
+        config = uvicorn.Config(
+            app,
+            host="0.0.0.0",
+            port=self.port,
+            fd=self.fd,
+            log_level=log_level,
+            ws_ping_interval=WS_PING_INTERVAL,
+            ws_ping_timeout=WS_PING_TIMEOUT,
+            log_config=None,  # Delegate logging to loguru (via global intercept if configured)
+        )
+        return uvicorn.Server(config)
+
+    def _start_mdns(self):
+        self.mdns = MDNSResponder(port=self.port, peers=self.peers)
+        self.mdns.register()
+        self.mdns.browse()
+        self.mdns.watch_address()
+
     def start(self):
         logger.info(f"Starting services (Debug: {self.debug})...")
         try:
             # 1. Start mDNS
-            self.mdns = MDNSResponder(port=self.port)
-            self.mdns.register()
+            self._start_mdns()
 
             # 2. Start Uvicorn
-            # Determine Uvicorn log level based on debug state
-            log_level = "debug" if self.debug else "info"
-
-            config = uvicorn.Config(
-                create_app(),
-                host="0.0.0.0",
-                port=self.port,
-                log_level=log_level,
-                log_config=None,  # Delegate logging to loguru (via global intercept if configured)
+            self.server = self._create_server()
+            self.server_thread = threading.Thread(
+                target=self.server.run, name="uvicorn", daemon=True
             )
-            self.server = uvicorn.Server(config)
-            self.server_thread = threading.Thread(target=self.server.run, daemon=True)
             self.server_thread.start()
-            logger.info(f"Server started on port {self.port} with log level '{log_level}'")
+            logger.info(f"Server started on port {self.port} (Debug: {self.debug})")
 
         except Exception as e:
             logger.error(f"Failed to start services: {e}")
             self.stop()
 
+    def run(self):
+        """
+        Serve in the calling thread until uvicorn exits, which it does on SIGINT/SIGTERM.
+        Used headless, where there is no tray to own the main thread.
+        """
+        logger.info(f"Starting headless services on port {self.port}...")
+
+        # uvicorn handles the signal itself, then re-raises it with this handler restored;
+        # returning normally lets mDNS be unregistered on the way out
+        def on_signal(signum, frame):
+            if self.server:
+                self.server.should_exit = True
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, on_signal)
+        try:
+            self._start_mdns()
+            self.server = self._create_server()
+            self.server.run()
+        finally:
+            self.server = None
+            self.stop()
+
     def stop(self):
         logger.info("Stopping services...")
         # Stop mDNS
@@ -1,8 +1,77 @@
 import socket
-from zeroconf import IPVersion, ServiceInfo, Zeroconf
+import threading
+import time
+from zeroconf import (
+    InterfaceChoice,
+    IPVersion,
+    ServiceBrowser,
+    ServiceInfo,
+    ServiceStateChange,
+    Zeroconf,
+)
 from loguru import logger
 
-from server.config import APP_NAME, DEFAULT_PORT, MDNS_HOSTNAME, is_dev
+from server.config import (
+    APP_NAME,
+    DEFAULT_PORT,
+    MDNS_ADDRESS_CHECK_INTERVAL,
+    MDNS_APP_ID,
+    MDNS_HOSTNAME,
+    MDNS_INFO_TIMEOUT,
+    is_dev,
+)
+from server.core.events import TOPIC_ADDRESS, EventBus, bus
+
+
+class Peer:
+    def __init__(self, name: str, host: str, addresses: list[str], port: int):
+        self.name = name
+        self.host = host
+        self.addresses = addresses
+        self.port = port
+        self.last_seen = time.time()
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "host": self.host,
+            "addresses": self.addresses,
+            "port": self.port,
+            "last_seen": self.last_seen,
+        }
+
+
+class PeerCache:
+    """
+    Other Remote Mouse instances on the network, kept up to date by the mDNS browser.
+    Owned by the ServiceManager so the list survives service restarts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._peers: dict[str, Peer] = {}
+
+    def update(self, peer: Peer):
+        with self._lock:
+            self._peers[peer.name] = peer
+
+    def remove(self, name: str):
+        with self._lock:
+            self._peers.pop(name, None)
+
+    def peers(self) -> list[Peer]:
+        with self._lock:
+            return sorted(self._peers.values(), key=lambda peer: peer.name)
+
+
+def get_local_ip(probe_ip: str = "8.8.8.8", probe_port: int = 1) -> str:
+    """Address of the interface that routes outwards. Connecting a UDP socket sends nothing."""
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        s.connect((probe_ip, probe_port))
+        return s.getsockname()[0]
+    finally:
+        s.close()
 
 
 class MDNSResponder:
@@ -10,8 +79,17 @@ class MDNSResponder:
     TEST_CONN_IP = "8.8.8.8"
     TEST_CONN_PORT = 1
 
-    def __init__(self, service_name=APP_NAME, port=DEFAULT_PORT, hostname=MDNS_HOSTNAME):
-        self.zeroconf = Zeroconf(ip_version=IPVersion.V4Only)
+    def __init__(
+        self,
+        service_name=APP_NAME,
+        port=DEFAULT_PORT,
+        hostname=MDNS_HOSTNAME,
+        peers: PeerCache | None = None,
+        interfaces=InterfaceChoice.All,
+        address: str | None = None,
+        event_bus: EventBus | None = None,
+    ):
+        self.zeroconf = Zeroconf(ip_version=IPVersion.V4Only, interfaces=interfaces)
 
         if is_dev():
             # Get only the first part of the hostname (e.g. "my-mac" from "my-mac.local")
@@ -26,30 +104,35 @@ class MDNSResponder:
             self.hostname = hostname
 
         self.port = port
+        self.address = address
+        self.bus = event_bus or bus
+        self.peers = peers if peers is not None else PeerCache()
         self.service_info = None
+        self.browser = None
+        self.announced_ip: str | None = None
+        self._watch_stop = threading.Event()
+        self._watch_thread: threading.Thread | None = None
 
     def get_local_ip(self):
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect((self.TEST_CONN_IP, self.TEST_CONN_PORT))
-        ip = s.getsockname()[0]
-        s.close()
-
-        return ip
+        return get_local_ip(self.TEST_CONN_IP, self.TEST_CONN_PORT)
 
     def register(self):
         # mDNS 规范要求主机名以 .local. 结尾
-        local_ip = self.get_local_ip()
+        local_ip = self.address or self.get_local_ip()
         logger.info(f"Detected Local IP: {local_ip}")
+        self.announced_ip = local_ip
+        self.bus.publish(TOPIC_ADDRESS, local_ip)
 
         # 我们注册一个固定的服务名以便发现，但也包含主机名以防冲突
-        service_name = f"{self.service_name_base} Service.{self.SERVICE_TYPE}"
+        service_name = self.service_name
 
         self.service_info = ServiceInfo(
             self.SERVICE_TYPE,
             service_name,
             addresses=[socket.inet_aton(local_ip)],
             port=self.port,
-            properties={"path": "/"},
+            # "app" tells our instances apart from every other _http service
+            properties={"path": "/", "app": MDNS_APP_ID},
             server=self.hostname,
         )
 
@@ -61,7 +144,88 @@ class MDNSResponder:
         except Exception as e:
             logger.error(f"Failed to register mDNS: {e}")
 
+    def check_address(self) -> bool:
+        """Re-announce the service if the LAN address changed; True if it did."""
+        if self.service_info is None or self.address is not None:
+            return False
+        try:
+            local_ip = self.get_local_ip()
+        except OSError as e:
+            # No route at the moment, e.g. between two Wi-Fi networks
+            logger.debug(f"Local IP unavailable: {e}")
+            return False
+        if local_ip == self.announced_ip:
+            return False
+
+        logger.info(f"Local IP changed from {self.announced_ip} to {local_ip}")
+        self.announced_ip = local_ip
+        self.bus.publish(TOPIC_ADDRESS, local_ip)
+        self.service_info.addresses = [socket.inet_aton(local_ip)]
+        try:
+            self.zeroconf.update_service(self.service_info)
+        except Exception as e:
+            logger.error(f"Failed to update mDNS: {e}")
+        return True
+
+    def watch_address(self, interval: float = MDNS_ADDRESS_CHECK_INTERVAL):
+        """
+        Check the LAN address every `interval` seconds until unregister(). Finding it
+        costs one unconnected UDP socket and no packets, so polling stays cheap.
+        """
+        if self.address is not None or self._watch_thread is not None:
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch_loop, args=(interval,), name="mdns-address", daemon=True
+        )
+        self._watch_thread.start()
+
+    def _watch_loop(self, interval: float):
+        while not self._watch_stop.wait(interval):
+            self.check_address()
+
+    @property
+    def service_name(self) -> str:
+        return f"{self.service_name_base} Service.{self.SERVICE_TYPE}"
+
+    def browse(self):
+        """Start following the other Remote Mouse instances into the peer cache."""
+        logger.info(f"Browsing {self.SERVICE_TYPE} for peers")
+        self.browser = ServiceBrowser(
+            self.zeroconf, self.SERVICE_TYPE, handlers=[self._on_service_state_change]
+        )
+
+    def _on_service_state_change(
+        self, zeroconf: Zeroconf, service_type: str, name: str, state_change: ServiceStateChange
+    ):
+        # Runs on the browser thread, so the blocking info lookup is fine here
+        if name == self.service_name:
+            return
+        display_name = name.removesuffix(f".{service_type}")
+        if state_change is ServiceStateChange.Removed:
+            self.peers.remove(display_name)
+            return
+
+        info = zeroconf.get_service_info(service_type, name, timeout=MDNS_INFO_TIMEOUT)
+        if info is None or info.properties.get(b"app") != MDNS_APP_ID.encode():
+            return
+        peer = Peer(
+            display_name,
+            info.server or "",
+            info.parsed_addresses(IPVersion.V4Only),
+            info.port or 0,
+        )
+        self.peers.update(peer)
+        logger.debug(f"Peer {peer.name} at {peer.addresses}:{peer.port}")
+
     def unregister(self):
+        self._watch_stop.set()
+        if self._watch_thread:
+            self._watch_thread.join(timeout=1.0)
+            self._watch_thread = None
+        if self.browser:
+            self.browser.cancel()
+            self.browser = None
         if self.service_info:
             logger.info("Unregistering mDNS service")
             self.zeroconf.unregister_service(self.service_info)
@@ -1,39 +1,433 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import Annotated
+
+from fastapi import (
+    Body,
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from server.config import (
+    INPUT_IDLE_TIMEOUT,
+    LOOP_LAG_INTERVAL,
+    PAIRING_AUTH_TIMEOUT,
+    SCREEN_MAX_FPS,
+    SCREEN_MAX_KBPS,
+    get_gestures_file,
+    get_inbox_dir,
+    get_macros_file,
+    get_paired_devices_file,
+    get_static_dir,
+)
+from server.core.backend import pyautogui
+from server.core.clipboard import OP_CLIPBOARD, ClipboardSync
+from server.core.events import TOPIC_SHOW_RATE, bus
+from server.core.gesture import OP_GESTURE, GestureEngine, load_gesture_map
+from server.core.hotlog import hotlog
+from server.core.inbox import Inbox, UploadConflict, UploadNotFound, UploadTooLarge
+from server.core.macro import OP_MACRO, MacroPlayer, MacroStore
+from server.core.metrics import OPENMETRICS_CONTENT_TYPE, metrics
+from server.core.pacing import MotionPacer
+from server.core.pairing import WS_CLOSE_UNAUTHORIZED, PairingManager, PairingStore
+from server.core.pointer import OP_MOVE_ABS, AbsolutePointer, cursor
+from server.core.protocol import (
+    MOVE,
+    OP_MOVE,
+    OP_PING,
+    process_binary_command,
+    release_held_input,
+)
+from server.core.runtime import OnDemand
+from server.core.scroll import OP_SCROLL_HIRES, HiResScroll
+from server.core.session import SessionManager
+from server.services import debug
+from server.services.mdns import PeerCache
+
+# Routes a page served by another desktop calls: pairing with this one, listing its
+# monitors for tablet mode and managing its macros. Everything else stays same-origin
+CROSS_ORIGIN_PATHS = ("/api/pairing", "/api/monitors", "/api/macros")
+
+
+class ScopedCORS:
+    """CORSMiddleware for the paths under `paths` only."""
+
+    def __init__(self, app: ASGIApp, paths: tuple[str, ...], **options):
+        self.app = app
+        self.cors = CORSMiddleware(app, **options)
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        path = scope.get("path", "")
+        if scope["type"] == "http" and any(
+            path == prefix or path.startswith(prefix + "/") for prefix in self.paths
+        ):
+            await self.cors(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
+async def monitor_loop_lag(interval: float = LOOP_LAG_INTERVAL):
+    """Measure how late the event loop wakes up compared to the requested sleep."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        metrics.observe_loop_lag(loop.time() - start - interval)
+
+
+async def authenticate(websocket: WebSocket, pairing: PairingManager) -> bool:
+    """
+    Challenge a new connection once. Frames after a successful handshake carry no
+    authentication at all, so the input path costs the same as before pairing existed.
+    """
+    if not pairing.required:
+        return True
+
+    nonce = pairing.new_challenge()
+    await websocket.send_json({"type": "challenge", "nonce": nonce})
+    reply = None
+    try:
+        async with asyncio.timeout(PAIRING_AUTH_TIMEOUT):
+            while reply is None:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                data = message.get("bytes")
+                if data and data[0] == OP_PING:
+                    # Heartbeats may already be running while the reply is computed
+                    await websocket.send_bytes(data)
+                elif message.get("text"):
+                    reply = json.loads(message["text"])
+    except (TimeoutError, ValueError):
+        pass
+
+    if (
+        isinstance(reply, dict)
+        and isinstance(reply.get("device"), str)
+        and isinstance(reply.get("mac"), str)
+        and pairing.verify(reply["device"], nonce, reply["mac"])
+    ):
+        return True
+
+    logger.warning(f"WebSocket client {websocket.client} failed the pairing handshake")
+    await websocket.close(code=WS_CLOSE_UNAUTHORIZED)
+    return False
+
 
-from server.core.protocol import process_binary_command
-from server.config import get_static_dir
-from server.core.metrics import metrics
-from server.ui.tray_icon import TrayIcon
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    services: OnDemand = app.state.input_services
+    if not app.state.lazy:
+        # Held for the server's lifetime, so input is ready before anyone connects
+        services.acquire()
+    try:
+        yield
+    finally:
+        services.close()
+        # Never leave a button stuck down when the server goes away
+        app.state.sessions.expire_all()
 
 
-def create_app() -> FastAPI:
-    app = FastAPI()
+def create_app(
+    pairing: PairingManager | None = None,
+    pace_hz: float | None = None,
+    peers: PeerCache | None = None,
+    lazy: bool = False,
+    idle_timeout: float = INPUT_IDLE_TIMEOUT,
+) -> FastAPI:
+    """
+    With `lazy`, the input backend, the pacer thread and the event loop lag probe are
+    only started by the first /ws connection, and released again once no socket has
+    been connected for `idle_timeout` seconds.
+    """
+    app = FastAPI(lifespan=lifespan)
+    # Nothing here relies on cookies: the session header has to be sent explicitly
+    app.add_middleware(
+        ScopedCORS,
+        paths=CROSS_ORIGIN_PATHS,
+        allow_origins=["*"],
+        allow_methods=["GET", "POST", "PUT", "DELETE"],
+        allow_headers=["Content-Type", "X-Session-Token"],
+    )
+    app.state.peers = peers if peers is not None else PeerCache()
+    app.state.pacer = MotionPacer(pace_hz, backend=cursor) if pace_hz else None
+    app.state.pointer = AbsolutePointer(cursor)
+    app.state.scroll = HiResScroll()
+    app.state.sessions = SessionManager(release_callback=release_held_input)
+    app.state.pairing = pairing or PairingManager(PairingStore(get_paired_devices_file()))
+    app.state.inbox = Inbox(get_inbox_dir())
+    app.state.gesture_map = load_gesture_map(get_gestures_file())
+    app.state.macros = MacroPlayer(MacroStore(get_macros_file()))
+    app.state.lazy = lazy
+    lag_task: asyncio.Task | None = None
+    backend_load: asyncio.Future | None = None
+
+    def log_backend_failure(future: asyncio.Future):
+        # Otherwise the first sign of a missing display is an error on every frame
+        if not future.cancelled() and (error := future.exception()) is not None:
+            logger.opt(exception=error).error(f"Failed to load the input backend: {error}")
+
+    def start_input():
+        nonlocal lag_task, backend_load
+        loop = asyncio.get_running_loop()
+        # Import the backend off the loop; a frame arriving first waits for it in load()
+        backend_load = loop.run_in_executor(None, pyautogui.load)
+        backend_load.add_done_callback(log_backend_failure)
+        lag_task = loop.create_task(monitor_loop_lag())
+        if app.state.pacer:
+            app.state.pacer.start()
+
+    def stop_input():
+        nonlocal backend_load
+        if backend_load:
+            backend_load.cancel()
+            backend_load = None
+        if lag_task:
+            lag_task.cancel()
+        if app.state.pacer:
+            app.state.pacer.stop()
+        app.state.scroll.close()
+        app.state.macros.stop()
+
+    app.state.input_services = OnDemand(
+        start_input, stop_input, idle_timeout=idle_timeout if lazy else None
+    )
     static_dir = get_static_dir()
 
     if not static_dir.exists():
         logger.warning(f"Static directory {static_dir} does not exist!")
 
+    def require_session(x_session_token: str | None = Header(default=None)):
+        """HTTP calls ride on the session of an authenticated WebSocket."""
+        if not app.state.pairing.required:
+            return
+        if not x_session_token or x_session_token not in app.state.sessions.sessions:
+            raise HTTPException(status_code=401, detail="Not paired")
+
+    @app.post("/api/pairing")
+    async def pair(code: str = Body(), name: str = Body(default="")):
+        device = app.state.pairing.redeem(code, name)
+        if device is None:
+            raise HTTPException(status_code=403, detail="Invalid or expired pairing code")
+        return {"device": device.id, "key": device.key.hex()}
+
+    @app.post("/api/local/pairing-code", dependencies=[Depends(debug.require_loopback)])
+    async def issue_pairing_code():
+        # The tray's "Pair Device" for servers without one, e.g. run over SSH
+        if not app.state.pairing.required:
+            raise HTTPException(status_code=409, detail="Pairing is disabled")
+        code = app.state.pairing.new_code()
+        return {"code": code, "expires_in": app.state.pairing.code_ttl}
+
+    @app.get("/api/peers")
+    async def list_peers():
+        return {"peers": [peer.to_dict() for peer in app.state.peers.peers()]}
+
+    @app.get("/api/monitors")
+    async def list_monitors():
+        # Someone is about to pick a monitor, so don't answer from a stale layout
+        layout = cursor.monitors.refresh()
+        return {
+            "monitors": [
+                {"index": index, **monitor.to_dict()}
+                for index, monitor in enumerate(layout.monitors, start=1)
+            ]
+        }
+
     @app.post("/api/settings/tray/rate")
     async def toggle_server_rate(enabled: bool):
-        if TrayIcon.instance:
-            TrayIcon.instance.set_show_rate(enabled)
+        # Picked up by the tray, if there is one
+        bus.publish(TOPIC_SHOW_RATE, enabled)
         return {"status": "ok"}
 
-    @app.websocket("/ws")
-    async def websocket_endpoint(websocket: WebSocket):
-        await websocket.accept()
-        logger.info(f"WebSocket client connected: {websocket.client}")
+    @app.post("/api/inbox/uploads", dependencies=[Depends(require_session)])
+    async def create_upload(name: str, size: int):
+        try:
+            upload = app.state.inbox.create(name, size)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e)) from e
+        return upload.to_dict()
+
+    @app.get("/api/inbox/uploads/{upload_id}", dependencies=[Depends(require_session)])
+    async def get_upload(upload_id: str):
         try:
+            return app.state.inbox.get(upload_id).to_dict()
+        except UploadNotFound as e:
+            raise HTTPException(status_code=404, detail="Upload not found") from e
+
+    @app.patch("/api/inbox/uploads/{upload_id}", dependencies=[Depends(require_session)])
+    async def append_upload(
+        upload_id: str,
+        request: Request,
+        upload_offset: int = Header(),
+        upload_crc32: int | None = Header(default=None),
+    ):
+        inbox: Inbox = app.state.inbox
+        try:
+            upload = inbox.get(upload_id)
+            # Stream the body to disk chunk by chunk; it is never buffered whole
+            path = await inbox.append(upload, upload_offset, request.stream(), upload_crc32)
+        except UploadNotFound as e:
+            raise HTTPException(status_code=404, detail="Upload not found") from e
+        except UploadConflict as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e)) from e
+        return {**upload.to_dict(), "complete": path is not None}
+
+    @app.get("/api/macros", dependencies=[Depends(require_session)])
+    async def list_macros():
+        return {"macros": [plan.to_dict() for plan in app.state.macros.store.plans()]}
+
+    @app.put("/api/macros/{name}", dependencies=[Depends(require_session)])
+    async def save_macro(name: str, steps: Annotated[list, Body(embed=True)]):
+        try:
+            return app.state.macros.store.save(name, steps).to_dict()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    @app.delete("/api/macros/{name}", dependencies=[Depends(require_session)])
+    async def delete_macro(name: str):
+        if not app.state.macros.store.remove(name):
+            raise HTTPException(status_code=404, detail="Macro not found")
+        return {"status": "ok"}
+
+    app.include_router(debug.router)
+
+    @app.get("/metrics")
+    async def openmetrics():
+        return Response(metrics.render_openmetrics(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+    async def input_session(websocket: WebSocket):
+        try:
+            if not await authenticate(websocket, app.state.pairing):
+                return
+        except WebSocketDisconnect:
+            return
+        sessions: SessionManager = app.state.sessions
+        session, resumed = sessions.attach(websocket.query_params.get("session"))
+        generation = session.generation
+        logger.info(f"WebSocket client connected: {websocket.client} (resumed: {resumed})")
+        metrics.session_opened()
+        clipboard: ClipboardSync | None = None
+        gestures = GestureEngine(app.state.gesture_map)
+        pacer: MotionPacer | None = app.state.pacer
+        try:
+            await websocket.send_json(
+                {"type": "session", "token": session.token, "resumed": resumed}
+            )
             while True:
                 data = await websocket.receive_bytes()
+                if data and data[0] == OP_PING:
+                    await websocket.send_bytes(data)
+                    continue
+                if data and data[0] == OP_CLIPBOARD:
+                    if clipboard is None:
+                        clipboard = ClipboardSync(websocket.send_bytes)
+                    await clipboard.handle(data)
+                    continue
                 metrics.add(len(data))
-                process_binary_command(data)
+                start = time.perf_counter()
+                if pacer and data and data[0] == OP_MOVE and len(data) >= MOVE.size + 1:
+                    pacer.push(*MOVE.unpack_from(data, 1))
+                    applied = True
+                else:
+                    if pacer:
+                        # Anything else acts at the cursor, so buffered motion lands first
+                        pacer.flush()
+                    if data and data[0] == OP_GESTURE:
+                        applied = gestures.handle(data)
+                    elif data and data[0] == OP_SCROLL_HIRES:
+                        applied = app.state.scroll.handle(data)
+                    elif data and data[0] == OP_MOVE_ABS:
+                        applied = app.state.pointer.handle(data)
+                    elif data and data[0] == OP_MACRO:
+                        applied = app.state.macros.handle(data)
+                    else:
+                        applied = process_binary_command(data, session.held)
+                # Malformed and failed frames are counted by their handlers instead
+                if applied:
+                    elapsed = time.perf_counter() - start
+                    metrics.record_frame(data[0], len(data), elapsed)
+                    hotlog.trace(data[0], len(data), elapsed)
         except WebSocketDisconnect:
             logger.info("WebSocket client disconnected")
         except Exception as e:
-            logger.error(f"WebSocket error: {e}")
+            hotlog.error("websocket", "WebSocket error: {}", e)
+        finally:
+            hotlog.flush()
+            if clipboard:
+                clipboard.close()
+            metrics.session_closed()
+            sessions.detach(session, generation)
+
+    @app.websocket("/ws")
+    async def websocket_endpoint(websocket: WebSocket):
+        await websocket.accept()
+        # Started before the pairing handshake, so loading input overlaps it
+        app.state.input_services.acquire()
+        try:
+            await input_session(websocket)
+        finally:
+            app.state.input_services.release()
+
+    @app.websocket("/ws/screen")
+    async def screen_endpoint(
+        websocket: WebSocket,
+        max_fps: float = SCREEN_MAX_FPS,
+        max_kbps: float = SCREEN_MAX_KBPS,
+        format: str = "jpeg",
+    ):
+        # Imported lazily so NumPy is only loaded once somebody asks for a preview
+        from server.core.screen import ScreenStreamer
+
+        await websocket.accept()
+        try:
+            if not await authenticate(websocket, app.state.pairing):
+                return
+        except WebSocketDisconnect:
+            return
+        logger.info(f"Screen preview client connected: {websocket.client}")
+        streamer = ScreenStreamer(
+            websocket.send_bytes,
+            max_fps=max_fps,
+            max_kbps=max_kbps,
+            image_format="WEBP" if format.lower() == "webp" else "JPEG",
+        )
+
+        async def stream():
+            try:
+                await streamer.run()
+            except Exception as e:
+                logger.error(f"Screen preview stopped: {e}")
+                await websocket.close(code=1011)
+
+        stream_task = asyncio.create_task(stream())
+        try:
+            # The preview channel is one-way; keep reading only to notice the disconnect
+            while True:
+                await websocket.receive_bytes()
+        except WebSocketDisconnect:
+            logger.info("Screen preview client disconnected")
+        except Exception as e:
+            logger.error(f"Screen preview error: {e}")
+        finally:
+            stream_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await stream_task
 
     # 挂载静态文件（必须放在最后，否则可能覆盖 API 路由）
     if static_dir.exists():
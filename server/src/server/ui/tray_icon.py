@@ -1,12 +1,26 @@
 import threading
 import time
-from typing import Callable, Optional, Tuple
+from collections.abc import Callable
 
 import pystray
 from loguru import logger
 from PIL import Image, ImageDraw, ImageFont
 
-from server.config import APP_NAME, get_asset_path
+from server.config import (
+    APP_NAME,
+    PAIRING_CODE_TTL,
+    TRAY_RATE_RECHECK,
+    TRAY_RENDER_DEBOUNCE,
+    get_asset_path,
+)
+from server.core.events import (
+    TOPIC_ADDRESS,
+    TOPIC_RATE,
+    TOPIC_SESSIONS,
+    TOPIC_SHOW_RATE,
+    EventBus,
+    bus,
+)
 from server.core.metrics import metrics
 
 
@@ -17,7 +31,15 @@ def create_image() -> Image.Image:
 
 
 class TrayIcon:
-    """System tray icon manager with real-time metrics display."""
+    """
+    System tray icon manager with real-time metrics display.
+
+    The icon is redrawn by a single renderer thread, and only when a value it shows
+    changes on the event bus. Changes are collected for TRAY_RENDER_DEBOUNCE before
+    drawing, so a burst of updates costs one redraw. With nothing changing the renderer
+    blocks without a timeout; it only polls while a displayed rate is dying down, since
+    no traffic means nobody else rolls the rate window over.
+    """
 
     instance = None
 
@@ -29,6 +51,10 @@ class TrayIcon:
         restart_callback: Callable[[], None],
         on_log_toggle_callback: Callable[[bool], None],
         initial_logging_state: bool = False,
+        on_pair_callback: Callable[[], str] | None = None,
+        on_trace_toggle_callback: Callable[[bool], None] | None = None,
+        initial_trace_state: bool = False,
+        event_bus: EventBus | None = None,
     ):
         TrayIcon.instance = self
         self.port = port
@@ -36,13 +62,25 @@ class TrayIcon:
         self.on_exit_callback = on_exit_callback
         self.restart_callback = restart_callback
         self.on_log_toggle_callback = on_log_toggle_callback
+        self.on_pair_callback = on_pair_callback
+        self.on_trace_toggle_callback = on_trace_toggle_callback
+        # Where the shown values come from; the process-wide bus unless one is passed in
+        self.bus = event_bus or bus
 
-        self.icon: Optional[pystray.Icon] = None
+        self.icon: pystray.Icon | None = None
         self.logging_enabled = initial_logging_state
+        self.trace_enabled = initial_trace_state
         self.show_rate = False
+        self.pairing_code: str | None = None
+        self._pairing_expires = 0.0
 
-        self._monitor_thread: Optional[threading.Thread] = None
-        self._stop_event = threading.Event()
+        self._changed = threading.Condition()
+        self._dirty = False
+        self._stopped = False
+        self._render_thread: threading.Thread | None = None
+        self._unsubscribe: list[Callable[[], None]] = []
+        self._drawn_rate: tuple[int, int] | None = None
+        self.wakeups = 0  # Times the renderer woke up; stays flat while nothing changes
         self._base_image = create_image()
 
         # Calculate appropriate font size based on icon resolution
@@ -80,7 +118,7 @@ class TrayIcon:
 
     def _on_quit(self, icon: pystray.Icon, item: pystray.MenuItem) -> None:
         logger.info("Stopping from tray icon...")
-        self._stop_event.set()
+        self.stop_renderer()
         if self.on_exit_callback:
             self.on_exit_callback()
         icon.stop()
@@ -91,40 +129,124 @@ class TrayIcon:
         if self.on_log_toggle_callback:
             self.on_log_toggle_callback(self.logging_enabled)
 
+    def _on_toggle_trace(self, icon: pystray.Icon, item: pystray.MenuItem) -> None:
+        self.trace_enabled = not self.trace_enabled
+        logger.info(f"Tray toggled command tracing to {self.trace_enabled}")
+        if self.on_trace_toggle_callback:
+            self.on_trace_toggle_callback(self.trace_enabled)
+
+    def _on_pair(self, icon: pystray.Icon, item: pystray.MenuItem) -> None:
+        if not self.on_pair_callback:
+            return
+        self.pairing_code = self.on_pair_callback()
+        self._pairing_expires = time.monotonic() + PAIRING_CODE_TTL
+        icon.update_menu()
+        try:
+            icon.notify(f"Enter {self.pairing_code} on your phone to pair it", APP_NAME)
+        except Exception as e:
+            # Not every backend supports notifications; the code is in the menu too
+            logger.debug(f"Tray notification failed: {e}")
+
+    def _pair_label(self) -> str:
+        if self.pairing_code and time.monotonic() < self._pairing_expires:
+            return f"Pairing Code: {self.pairing_code}"
+        return "Pair Device"
+
     def set_show_rate(self, enabled: bool) -> None:
         if self.show_rate == enabled:
             return
         self.show_rate = enabled
         logger.info(f"Tray toggled rate display to {self.show_rate}")
+        self._on_change()
+
+    def start_renderer(self) -> None:
+        """Subscribe to the event bus and start the renderer thread, unless already running."""
+        with self._changed:
+            if self._render_thread is not None:
+                return
+            self._stopped = False
+            self._dirty = True  # Draw the current state once
+            self._render_thread = threading.Thread(
+                target=self._render_loop, name="tray-render", daemon=True
+            )
+        self._unsubscribe = [
+            self.bus.subscribe(TOPIC_RATE, self._on_rate),
+            self.bus.subscribe(TOPIC_SESSIONS, self._on_change),
+            self.bus.subscribe(TOPIC_ADDRESS, self._on_change),
+            self.bus.subscribe(TOPIC_SHOW_RATE, self.set_show_rate),
+        ]
+        self._render_thread.start()
+
+    def stop_renderer(self) -> None:
+        for unsubscribe in self._unsubscribe:
+            unsubscribe()
+        self._unsubscribe = []
+        with self._changed:
+            self._stopped = True
+            thread, self._render_thread = self._render_thread, None
+            self._changed.notify_all()
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=1.0)
+
+    def _on_change(self, _value=None) -> None:
+        # Runs on the publishing thread: only flag the change, the renderer does the work
+        with self._changed:
+            self._dirty = True
+            self._changed.notify_all()
 
+    def _on_rate(self, _value) -> None:
         if self.show_rate:
-            self._stop_event.clear()  # Ensure thread can run
-            self._monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
-            self._monitor_thread.start()
-        else:
-            self._stop_event.set()
-            if self.icon:
-                self.icon.icon = self._base_image
-
-    def _monitor_loop(self) -> None:
-        """Background loop to update icon with real-time metrics."""
-        while not self._stop_event.is_set():
-            if self.icon and self.show_rate:
-                pps, bps = metrics.get_current()
-                self.icon.icon = self._create_rate_image(pps, bps)
-
-            # Sleep in small increments for better responsiveness to stop event
-            for _ in range(10):
-                if self._stop_event.is_set():
-                    break
-                time.sleep(0.1)
+            self._on_change()
+
+    def _rate_decaying(self) -> bool:
+        return self.show_rate and self.bus.latest(TOPIC_RATE, (0, 0)) != (0, 0)
+
+    def _render_loop(self) -> None:
+        while True:
+            with self._changed:
+                if not self._dirty and not self._stopped:
+                    timeout = TRAY_RATE_RECHECK if self._rate_decaying() else None
+                    self._changed.wait(timeout)
+                    self.wakeups += 1
+                if self._stopped:
+                    return
+                timed_out = not self._dirty
+                if not timed_out:
+                    # Let a burst of changes settle, then draw once with the latest values
+                    self._changed.wait_for(lambda: self._stopped, TRAY_RENDER_DEBOUNCE)
+                    self._dirty = False
+            if timed_out:
+                # Publishes (and flags a redraw) if the rate changed since traffic stopped
+                metrics.get_current()
+            else:
+                self._render()
+
+    def _render(self) -> None:
+        icon = self.icon
+        if icon is None:
+            return
+
+        address = self.bus.latest(TOPIC_ADDRESS, self.ip_address)
+        if address != self.ip_address:
+            self.ip_address = address
+            icon.update_menu()
+
+        sessions = self.bus.latest(TOPIC_SESSIONS, 0)
+        title = f"{APP_NAME} ({sessions} connected)" if sessions else APP_NAME
+        if icon.title != title:
+            icon.title = title
+
+        rate = self.bus.latest(TOPIC_RATE, (0, 0)) if self.show_rate else None
+        if rate != self._drawn_rate:
+            icon.icon = self._create_rate_image(*rate) if rate else self._base_image
+            self._drawn_rate = rate
 
     def _draw_text_with_halo(
         self,
         draw: ImageDraw.ImageDraw,
-        pos: Tuple[int, int],
+        pos: tuple[int, int],
         text: str,
-        color: Tuple[int, int, int, int],
+        color: tuple[int, int, int, int],
         font: ImageFont.FreeTypeFont | ImageFont.ImageFont,
     ) -> None:
         """Draw text with a black halo/outline for better contrast."""
@@ -174,9 +296,9 @@ class TrayIcon:
 
     def run(self) -> None:
         """Initialize and run the system tray icon."""
-        menu = pystray.Menu(
+        items = [
             pystray.MenuItem(
-                f"Address: http://{self.ip_address}:{self.port}",
+                lambda _: f"Address: http://{self.ip_address}:{self.port}",
                 lambda: None,
                 enabled=False,
             ),
@@ -184,10 +306,25 @@ class TrayIcon:
                 lambda _: "Disable Logs" if self.logging_enabled else "Enable Logs",
                 self._on_toggle_logging,
             ),
-            pystray.MenuItem("Restart", self._on_restart),
-            pystray.MenuItem("Exit", self._on_quit),
-        )
+        ]
+        if self.on_trace_toggle_callback:
+            items.append(
+                pystray.MenuItem(
+                    "Trace Commands",
+                    self._on_toggle_trace,
+                    checked=lambda _: self.trace_enabled,
+                )
+            )
+        if self.on_pair_callback:
+            items.append(pystray.MenuItem(lambda _: self._pair_label(), self._on_pair))
+        items.append(pystray.MenuItem("Restart", self._on_restart))
+        items.append(pystray.MenuItem("Exit", self._on_quit))
+        menu = pystray.Menu(*items)
 
         self.icon = pystray.Icon(APP_NAME, self._base_image, APP_NAME, menu)
+        self.start_renderer()
         logger.info("Application minimized to tray.")
-        self.icon.run()
+        try:
+            self.icon.run()
+        finally:
+            self.stop_renderer()
@@ -1,10 +1,20 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
+from server.core.pairing import PairingManager, PairingStore
 from server.services.web import create_app
 from server.services.mdns import MDNSResponder
 
 
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path_factory, monkeypatch):
+    """Keep every test away from the real ~/.remote-mouse (paired devices, macros, inbox)."""
+    home = tmp_path_factory.mktemp("home")
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("USERPROFILE", str(home))
+    return home
+
+
 @pytest.fixture
 def mock_zeroconf():
     """Mock the Zeroconf class to avoid actual network calls."""
@@ -28,9 +38,10 @@ def mock_socket():
 
 
 @pytest.fixture
-def client():
-    """Create a TestClient for the FastAPI app."""
-    app = create_app()
+def client(tmp_path):
+    """Create a TestClient for the FastAPI app. Pairing is exercised in test_pairing.py."""
+    pairing = PairingManager(PairingStore(tmp_path / "devices.json"), required=False)
+    app = create_app(pairing)
     return TestClient(app)
 
 
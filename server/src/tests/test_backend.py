@@ -0,0 +1,68 @@
+import threading
+import time
+import types
+
+from server.core.backend import LazyBackend
+
+
+def fake_module(log):
+    active = {"calls": 0, "peak": 0}
+
+    def call(name):
+        def f(*args):
+            active["calls"] += 1
+            active["peak"] = max(active["peak"], active["calls"])
+            time.sleep(0.005)
+            log.append((name, *args))
+            active["calls"] -= 1
+
+        return f
+
+    module = types.SimpleNamespace(
+        moveRel=call("moveRel"),
+        click=call("click"),
+        keyDown=call("keyDown"),
+        keyUp=call("keyUp"),
+        KEYBOARD_KEYS=["ctrl"],
+    )
+    return module, active
+
+
+def backend_with(module) -> LazyBackend:
+    backend = LazyBackend()
+    backend._module = module
+    return backend
+
+
+def test_calls_from_several_threads_never_overlap():
+    log = []
+    module, active = fake_module(log)
+    backend = backend_with(module)
+
+    threads = [
+        threading.Thread(target=lambda: [backend.moveRel(1, 0) for _ in range(10)])
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(log) == 30
+    assert active["peak"] == 1
+    assert backend.KEYBOARD_KEYS == ["ctrl"]
+
+
+def test_hold_keeps_other_threads_out_until_released():
+    log = []
+    module, _ = fake_module(log)
+    backend = backend_with(module)
+
+    with backend.hold(["ctrl"]):
+        other = threading.Thread(target=lambda: backend.moveRel(5, 0))
+        other.start()
+        time.sleep(0.02)
+        backend.click()
+
+    other.join()
+    assert log == [("keyDown", "ctrl"), ("click",), ("keyUp", "ctrl"), ("moveRel", 5, 0)]
@@ -0,0 +1,207 @@
+import asyncio
+import zlib
+
+from server.core.clipboard import (
+    ABORT,
+    ACK,
+    BEGIN,
+    CHUNK_HEADER,
+    KIND_ABORT,
+    KIND_ACK,
+    KIND_BEGIN,
+    KIND_CHUNK,
+    OP_CLIPBOARD,
+    ClipboardSync,
+)
+
+
+class MemoryClipboard:
+    """In-memory stand-in for the desktop clipboard with a change counter."""
+
+    def __init__(self, text=""):
+        self.text = text
+        self.sequence = 0
+        self.reads = 0
+
+    def change_token(self):
+        return self.sequence
+
+    def read(self):
+        self.reads += 1
+        return self.text
+
+    def write(self, text):
+        self.text = text
+        self.sequence += 1
+
+
+class Peer:
+    """Collects frames the server sends to the client."""
+
+    def __init__(self):
+        self.frames = []
+
+    async def send(self, data):
+        self.frames.append(bytes(data))
+
+    def kinds(self):
+        return [frame[1] for frame in self.frames]
+
+
+def begin(transfer_id, data):
+    return BEGIN.pack(OP_CLIPBOARD, KIND_BEGIN, transfer_id, len(data), zlib.crc32(data))
+
+
+def chunk(transfer_id, seq, payload):
+    return CHUNK_HEADER.pack(OP_CLIPBOARD, KIND_CHUNK, transfer_id, seq) + payload
+
+
+def test_incoming_chunks_are_acked_and_applied():
+    clipboard = MemoryClipboard()
+    peer = Peer()
+    data = "你好, clipboard".encode()
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=clipboard)
+        await sync.handle(begin(7, data))
+        await sync.handle(chunk(7, 0, data[:5]))
+        await sync.handle(chunk(7, 1, data[5:]))
+        await sync.apply_task
+
+    asyncio.run(scenario())
+
+    assert clipboard.text == "你好, clipboard"
+    assert peer.frames == [
+        ACK.pack(OP_CLIPBOARD, KIND_ACK, 7, 0),
+        ACK.pack(OP_CLIPBOARD, KIND_ACK, 7, 1),
+    ]
+
+
+def test_oversized_transfer_is_rejected():
+    peer = Peer()
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=MemoryClipboard(), max_bytes=4)
+        await sync.handle(begin(1, b"too large"))
+
+    asyncio.run(scenario())
+
+    assert peer.frames == [ABORT.pack(OP_CLIPBOARD, KIND_ABORT, 1)]
+
+
+def test_unchanged_content_is_not_transferred_again():
+    clipboard = MemoryClipboard()
+    peer = Peer()
+    data = b"same"
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=clipboard)
+        await sync.handle(begin(1, data))
+        await sync.handle(chunk(1, 0, data))
+        await sync.apply_task
+        await sync.handle(begin(2, data))
+        # Server would echo it right back without dedupe
+        return await sync.push("same")
+
+    assert asyncio.run(scenario()) is True
+    assert peer.kinds() == [KIND_ACK, KIND_ABORT]
+
+
+def test_out_of_order_chunk_aborts():
+    peer = Peer()
+    data = b"abcdef"
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=MemoryClipboard())
+        await sync.handle(begin(3, data))
+        await sync.handle(chunk(3, 1, data[3:]))
+        return sync
+
+    sync = asyncio.run(scenario())
+
+    assert peer.frames == [ABORT.pack(OP_CLIPBOARD, KIND_ABORT, 3)]
+    assert sync.incoming is None
+
+
+def test_push_respects_ack_window():
+    peer = Peer()
+    text = "x" * 10
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=MemoryClipboard(), chunk_size=2, window=2)
+        task = asyncio.create_task(sync.push(text))
+        await asyncio.sleep(0.01)
+        in_flight = peer.kinds().count(KIND_CHUNK)
+
+        transfer_id = BEGIN.unpack_from(peer.frames[0])[2]
+        await sync.handle(ACK.pack(OP_CLIPBOARD, KIND_ACK, transfer_id, 0))
+        await asyncio.sleep(0.01)
+        after_one_ack = peer.kinds().count(KIND_CHUNK)
+
+        for seq in range(1, 5):
+            await sync.handle(ACK.pack(OP_CLIPBOARD, KIND_ACK, transfer_id, seq))
+        return in_flight, after_one_ack, await task
+
+    in_flight, after_one_ack, accepted = asyncio.run(scenario())
+
+    assert in_flight == 2
+    assert after_one_ack == 3
+    assert accepted is True
+    payload = b"".join(
+        frame[CHUNK_HEADER.size :] for frame in peer.frames if frame[1] == KIND_CHUNK
+    )
+    assert payload == text.encode()
+
+
+def test_abort_from_client_stops_push():
+    peer = Peer()
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=MemoryClipboard(), chunk_size=1, window=1)
+        task = asyncio.create_task(sync.push("abcdef"))
+        await asyncio.sleep(0.01)
+        transfer_id = BEGIN.unpack_from(peer.frames[0])[2]
+        await sync.handle(ABORT.pack(OP_CLIPBOARD, KIND_ABORT, transfer_id))
+        return await task
+
+    assert asyncio.run(scenario()) is False
+    assert peer.kinds().count(KIND_CHUNK) == 1
+
+
+def test_watch_reads_only_when_change_counter_moves():
+    clipboard = MemoryClipboard("first")
+    peer = Peer()
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=clipboard, window=64, poll_interval=0.01)
+        sync.set_watching(True)
+        await asyncio.sleep(0.1)
+        reads_while_idle = clipboard.reads
+
+        clipboard.write("second")
+        await asyncio.sleep(0.05)
+        sync.close()
+        return reads_while_idle
+
+    reads_while_idle = asyncio.run(scenario())
+
+    assert reads_while_idle == 1
+    assert clipboard.reads == 2
+    assert peer.kinds().count(KIND_BEGIN) == 2
+
+
+def test_watch_skips_clipboard_without_change_counter():
+    clipboard = MemoryClipboard("first")
+    clipboard.change_token = lambda: None
+    peer = Peer()
+
+    async def scenario():
+        sync = ClipboardSync(peer.send, clipboard=clipboard, poll_interval=0.01)
+        sync.set_watching(True)
+        await asyncio.sleep(0.05)
+        sync.close()
+
+    asyncio.run(scenario())
+
+    assert clipboard.reads == 0
+    assert peer.frames == []
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from server.core.diagnostics import MemoryTracker, SamplingProfiler, thread_states
+from server.core.pairing import PairingManager, PairingStore
+from server.services.web import create_app
+
+
+def busy_worker(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profiler_samples_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop,), name="busy-worker")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.001)
+    try:
+        profiler.start()
+        time.sleep(0.1)
+        collapsed = profiler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profiler.sample_count > 0
+    lines = collapsed.splitlines()
+    worker_stacks = [line for line in lines if line.startswith("busy-worker;")]
+    assert any("busy_worker (test_diagnostics.py:" in line for line in worker_stacks)
+    # The sampler never profiles itself
+    assert not any(line.startswith("sampling-profiler;") for line in lines)
+    # Folded format: stack, space, count
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_profiler_stops_itself():
+    profiler = SamplingProfiler(interval=0.001, max_seconds=0.02)
+    profiler.start()
+    time.sleep(0.1)
+    assert not profiler.running
+    profiler.stop()
+
+
+def test_memory_diff_finds_growth():
+    tracker = MemoryTracker()
+    try:
+        assert tracker.diff() is None
+        tracker.snapshot()
+        leak = [bytearray(1024) for _ in range(1000)]
+        top = tracker.diff(limit=5)
+    finally:
+        tracker.stop()
+
+    assert top[0]["size_diff"] >= 1024 * 1000
+    assert any("test_diagnostics.py" in frame for frame in top[0]["traceback"])
+    del leak
+
+
+def test_thread_states_include_current_thread():
+    states = thread_states()
+    current = next(s for s in states if s["ident"] == threading.get_ident())
+    # The calling thread is caught inside thread_states() itself
+    assert current["current"].endswith(" thread_states")
+    assert current["alive"]
+
+
+def test_debug_endpoints_are_loopback_only(tmp_path):
+    app = create_app(PairingManager(PairingStore(tmp_path / "devices.json")))
+    remote = TestClient(app, client=("192.168.1.20", 50000))
+    assert remote.get("/api/debug/threads").status_code == 403
+    assert remote.post("/api/debug/profile/start").status_code == 403
+
+
+def test_debug_endpoints(tmp_path):
+    app = create_app(PairingManager(PairingStore(tmp_path / "devices.json")))
+    client = TestClient(app, client=("127.0.0.1", 50000))
+
+    response = client.get("/api/debug/threads")
+    assert response.status_code == 200
+    assert "samples" in response.json()["loop_lag"]
+    assert any(t["name"] == "MainThread" for t in response.json()["threads"])
+
+    assert client.get("/api/debug/memory/diff").status_code == 409
+    assert client.post("/api/debug/memory/snapshot").json()["traced_bytes"] >= 0
+    assert isinstance(client.get("/api/debug/memory/diff").json()["top"], list)
+    client.post("/api/debug/memory/stop")
+
+    assert client.post("/api/debug/profile/start", params={"interval": 0.001}).status_code == 200
+    assert client.post("/api/debug/profile/start").status_code == 409
+    time.sleep(0.05)
+    response = client.post("/api/debug/profile/stop")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "MainThread;" in response.text
+
+
+def test_heap_snapshots_run_off_the_event_loop(tmp_path, monkeypatch):
+    from server.services import debug
+
+    on_loop = []
+
+    def snapshot():
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return {"traced_bytes": 0, "peak_bytes": 0}
+
+    monkeypatch.setattr(debug.memory, "snapshot", snapshot)
+    app = create_app(PairingManager(PairingStore(tmp_path / "devices.json")))
+    client = TestClient(app, client=("127.0.0.1", 50000))
+
+    assert client.post("/api/debug/memory/snapshot").status_code == 200
+    assert on_loop == [False]
+
+
+def test_local_web_pages_cannot_reach_debug_endpoints(tmp_path):
+    app = create_app(PairingManager(PairingStore(tmp_path / "devices.json")))
+    client = TestClient(app, base_url="http://127.0.0.1:9997", client=("127.0.0.1", 50000))
+
+    # A page on another site, and one on a name rebound to 127.0.0.1
+    for origin in ("https://example.com", "null"):
+        response = client.post("/api/local/pairing-code", headers={"Origin": origin})
+        assert response.status_code == 403
+    rebound = {"Origin": "http://evil.example:9997", "Host": "evil.example:9997"}
+    assert client.post("/api/debug/memory/stop", headers=rebound).status_code == 403
+
+    # curl sends no Origin; a page served from the loopback address itself is same-origin
+    assert client.post("/api/debug/memory/stop").status_code == 200
+    same_origin = {"Origin": "http://127.0.0.1:9997"}
+    assert client.post("/api/debug/memory/stop", headers=same_origin).status_code == 200
@@ -0,0 +1,43 @@
+from server.core.events import EventBus
+
+
+def test_subscribers_only_see_changes():
+    bus = EventBus()
+    seen = []
+    bus.subscribe("topic", seen.append)
+
+    bus.publish("topic", 1)
+    bus.publish("topic", 1)
+    bus.publish("topic", 2)
+    bus.publish("other", 3)
+
+    assert seen == [1, 2]
+    assert bus.latest("topic") == 2
+    assert bus.latest("missing", "default") == "default"
+
+
+def test_unsubscribe():
+    bus = EventBus()
+    seen = []
+    unsubscribe = bus.subscribe("topic", seen.append)
+
+    bus.publish("topic", 1)
+    unsubscribe()
+    unsubscribe()
+    bus.publish("topic", 2)
+
+    assert seen == [1]
+
+
+def test_failing_subscriber_does_not_stop_others():
+    bus = EventBus()
+    seen = []
+
+    def broken(value):
+        raise RuntimeError("boom")
+
+    bus.subscribe("topic", broken)
+    bus.subscribe("topic", seen.append)
+    bus.publish("topic", "value")
+
+    assert seen == ["value"]
@@ -0,0 +1,177 @@
+import json
+import sys
+from contextlib import contextmanager
+
+import pytest
+
+from server.core.gesture import (
+    GESTURE,
+    KIND_PINCH,
+    KIND_SWIPE_DOWN,
+    KIND_SWIPE_LEFT,
+    KIND_SWIPE_UP,
+    OP_GESTURE,
+    PHASE_BEGIN,
+    PHASE_CANCEL,
+    PHASE_END,
+    PHASE_UPDATE,
+    GestureEngine,
+    HotkeyAction,
+    ScrollAction,
+    ZoomAction,
+    default_gesture_map,
+    load_gesture_map,
+)
+
+
+class FakeBackend:
+    """Records injected input instead of touching the desktop."""
+
+    def __init__(self):
+        self.calls = []
+        self.held = []
+
+    def hotkey(self, *keys):
+        self.calls.append(("hotkey", keys))
+
+    def scroll(self, clicks):
+        self.calls.append(("scroll", clicks, tuple(self.held)))
+
+    def hscroll(self, clicks):
+        self.calls.append(("hscroll", clicks, tuple(self.held)))
+
+    @contextmanager
+    def hold(self, key):
+        self.held.append(key)
+        try:
+            yield
+        finally:
+            self.held.remove(key)
+
+
+def frame(kind, phase, fingers, magnitude=0):
+    return GESTURE.pack(OP_GESTURE, kind, phase, fingers, magnitude)
+
+
+def run(engine, *frames):
+    for data in frames:
+        engine.handle(data)
+
+
+def test_swipe_fires_hotkey_once_on_end():
+    backend = FakeBackend()
+    engine = GestureEngine({(KIND_SWIPE_LEFT, 4): HotkeyAction("ctrl", "win", "right")}, backend)
+
+    run(
+        engine,
+        frame(KIND_SWIPE_LEFT, PHASE_BEGIN, 4),
+        frame(KIND_SWIPE_LEFT, PHASE_UPDATE, 4, 80),
+        frame(KIND_SWIPE_LEFT, PHASE_UPDATE, 4, 160),
+    )
+    assert backend.calls == []
+
+    engine.handle(frame(KIND_SWIPE_LEFT, PHASE_END, 4, 200))
+    assert backend.calls == [("hotkey", ("ctrl", "win", "right"))]
+    assert engine.active == {}
+
+
+def test_cancelled_swipe_does_nothing():
+    backend = FakeBackend()
+    engine = GestureEngine({(KIND_SWIPE_LEFT, 4): HotkeyAction("ctrl", "right")}, backend)
+
+    run(
+        engine,
+        frame(KIND_SWIPE_LEFT, PHASE_BEGIN, 4),
+        frame(KIND_SWIPE_LEFT, PHASE_CANCEL, 4),
+        frame(KIND_SWIPE_LEFT, PHASE_END, 4),
+    )
+    assert backend.calls == []
+
+
+def test_unmapped_finger_count_is_ignored():
+    backend = FakeBackend()
+    engine = GestureEngine({(KIND_SWIPE_LEFT, 4): HotkeyAction("ctrl", "right")}, backend)
+
+    run(engine, frame(KIND_SWIPE_LEFT, PHASE_BEGIN, 3), frame(KIND_SWIPE_LEFT, PHASE_END, 3))
+    assert backend.calls == []
+
+
+def test_pinch_streams_incremental_zoom_steps():
+    backend = FakeBackend()
+    engine = GestureEngine({(KIND_PINCH, 2): ZoomAction(step=1.1)}, backend)
+
+    run(
+        engine,
+        frame(KIND_PINCH, PHASE_BEGIN, 2, 1000),
+        frame(KIND_PINCH, PHASE_UPDATE, 2, 1105),  # ~1 step in
+        frame(KIND_PINCH, PHASE_UPDATE, 2, 1120),  # still 1 step, nothing new
+        frame(KIND_PINCH, PHASE_UPDATE, 2, 1331),  # 3 steps in total
+        frame(KIND_PINCH, PHASE_END, 2, 1000),  # back to where it started
+    )
+
+    assert backend.calls == [
+        ("scroll", 1, ("ctrl",)),
+        ("scroll", 2, ("ctrl",)),
+        ("scroll", -3, ("ctrl",)),
+    ]
+    assert backend.held == []
+
+
+def test_swipe_mapped_to_scroll_stream():
+    backend = FakeBackend()
+    engine = GestureEngine({(KIND_SWIPE_UP, 3): ScrollAction(-1, step=20)}, backend)
+
+    run(
+        engine,
+        frame(KIND_SWIPE_UP, PHASE_BEGIN, 3),
+        frame(KIND_SWIPE_UP, PHASE_UPDATE, 3, 15),
+        frame(KIND_SWIPE_UP, PHASE_UPDATE, 3, 45),
+        frame(KIND_SWIPE_UP, PHASE_END, 3, 100),
+    )
+    assert backend.calls == [("scroll", -2, ()), ("scroll", -3, ())]
+
+
+def test_truncated_frame_is_ignored():
+    backend = FakeBackend()
+    engine = GestureEngine({}, backend)
+    engine.handle(bytes([OP_GESTURE, KIND_PINCH, PHASE_BEGIN]))
+    assert engine.active == {}
+
+
+def test_gesture_map_overrides(tmp_path):
+    path = tmp_path / "gestures.json"
+    path.write_text(
+        json.dumps(
+            {
+                "swipe_up:3": ["ctrl", "up"],
+                "pinch:2": {"action": "zoom", "step": 1.5},
+                "swipe_left:4": "none",
+                "bogus:1": "zoom",
+                "swipe_down:2": "teleport",
+            }
+        )
+    )
+
+    gesture_map = load_gesture_map(path)
+
+    assert gesture_map[(KIND_SWIPE_UP, 3)].keys == ("ctrl", "up")
+    assert isinstance(gesture_map[(KIND_PINCH, 2)], ZoomAction)
+
+    backend = FakeBackend()
+    engine = GestureEngine(gesture_map, backend)
+    run(engine, frame(KIND_SWIPE_LEFT, PHASE_BEGIN, 4), frame(KIND_SWIPE_LEFT, PHASE_END, 4))
+    assert backend.calls == []
+
+
+def test_missing_gesture_file_uses_defaults(tmp_path):
+    gesture_map = load_gesture_map(tmp_path / "missing.json")
+    assert isinstance(gesture_map[(KIND_PINCH, 2)], ZoomAction)
+    assert isinstance(gesture_map[(KIND_SWIPE_LEFT, 4)], HotkeyAction)
+
+
+@pytest.mark.parametrize("platform", ["darwin", "win32", "linux"])
+def test_default_swipes_are_distinct(monkeypatch, platform):
+    monkeypatch.setattr(sys, "platform", platform)
+    gesture_map = default_gesture_map()
+    keys = [gesture_map[(kind, 4)].keys for kind in (KIND_SWIPE_UP, KIND_SWIPE_DOWN)]
+    assert keys[0] != keys[1]
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+from loguru import logger
+
+from server.core.hotlog import HotLog
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def records():
+    captured = []
+    handler_id = logger.add(captured.append, level="TRACE", format="{message}")
+    yield captured
+    logger.remove(handler_id)
+
+
+def messages(records, level=None):
+    return [
+        r.record["message"] for r in records if level is None or r.record["level"].name == level
+    ]
+
+
+def test_burst_then_rate_limited():
+    clock = FakeClock()
+    log = HotLog(rate=1.0, burst=3, clock=clock)
+    captured = []
+    handler_id = logger.add(captured.append, level="ERROR", format="{message}")
+    try:
+        for i in range(10):
+            log.error("key", "failure {}", i)
+    finally:
+        logger.remove(handler_id)
+
+    assert messages(captured) == ["failure 0", "failure 1", "failure 2"]
+
+
+def test_suppressed_count_is_reported_on_next_message(records):
+    clock = FakeClock()
+    log = HotLog(rate=1.0, burst=1, clock=clock)
+
+    for i in range(5):
+        log.warning("key", "bad frame {}", i)
+    clock.now = 1.0
+    log.warning("key", "bad frame {}", 5)
+
+    assert messages(records, "WARNING") == [
+        "bad frame 0",
+        "bad frame 5 (4 similar messages suppressed)",
+    ]
+
+
+def test_keys_are_limited_independently(records):
+    log = HotLog(rate=1.0, burst=1, clock=FakeClock())
+
+    log.error("a", "first a")
+    log.error("a", "second a")
+    log.error("b", "first b")
+
+    assert messages(records, "ERROR") == ["first a", "first b"]
+
+
+def test_arguments_are_not_formatted_when_suppressed():
+    class Exploding:
+        def __format__(self, spec):
+            raise AssertionError("formatted a suppressed message")
+
+    log = HotLog(rate=1.0, burst=0, clock=FakeClock())
+    log.error("key", "value {}", Exploding())
+
+
+def test_flush_reports_pending_counts(records):
+    log = HotLog(rate=1.0, burst=1, clock=FakeClock())
+
+    log.error("key", "boom")
+    log.error("key", "boom")
+    log.error("key", "boom")
+    log.flush()
+    log.flush()
+
+    assert messages(records, "WARNING") == ["2 similar messages suppressed (key)"]
+
+
+def test_trace_is_off_by_default(records):
+    log = HotLog(sample_every=1)
+
+    log.trace(0x01, 5, 0.0001)
+
+    assert not messages(records, "TRACE")
+
+
+def test_trace_samples_commands_as_json(records):
+    log = HotLog(sample_every=3)
+    log.set_tracing(True)
+
+    for _ in range(7):
+        log.trace(0x01, 5, 0.000042)
+
+    traces = [r for r in records if r.record["level"].name == "TRACE"]
+    assert len(traces) == 2
+    assert all(r.record["extra"]["trace"] for r in traces)
+    line = traces[0].record["message"]
+    assert " " not in line
+    entry = json.loads(line)
+    assert entry["op"] == 1
+    assert entry["len"] == 5
+    assert entry["us"] == 42
+    assert entry["seq"] == 3
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import socket
+import threading
+import time
+import zlib
+
+import httpx
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+from server.core.inbox import Inbox, UploadConflict, UploadNotFound, UploadTooLarge, safe_filename
+from server.core.metrics import _process_rss_bytes
+from server.core.pairing import PairingManager, PairingStore
+from server.services.web import create_app
+
+
+async def body_of(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_safe_filename_strips_directories():
+    assert safe_filename("../../etc/passwd") == "passwd"
+    assert safe_filename("C:\\Users\\me\\photo.jpg") == "photo.jpg"
+    assert safe_filename("..") == "upload"
+
+
+def test_upload_in_chunks(tmp_path):
+    inbox = Inbox(tmp_path)
+    data = os.urandom(1000)
+
+    async def scenario():
+        upload = inbox.create("photo.jpg", len(data))
+        first = await inbox.append(upload, 0, body_of(data[:400]), zlib.crc32(data[:400]))
+        final = await inbox.append(upload, 400, body_of(data[400:700], data[700:]))
+        return first, final
+
+    first, final = asyncio.run(scenario())
+
+    assert first is None
+    assert final == tmp_path / "photo.jpg"
+    assert final.read_bytes() == data
+    assert list((tmp_path / ".partial").iterdir()) == []
+
+
+def test_wrong_offset_is_rejected(tmp_path):
+    inbox = Inbox(tmp_path)
+
+    async def scenario():
+        upload = inbox.create("a.bin", 10)
+        await inbox.append(upload, 5, body_of(b"12345"))
+
+    with pytest.raises(UploadConflict):
+        asyncio.run(scenario())
+
+
+def test_checksum_mismatch_rolls_back(tmp_path):
+    inbox = Inbox(tmp_path)
+
+    async def scenario():
+        upload = inbox.create("a.bin", 10)
+        with pytest.raises(UploadConflict):
+            await inbox.append(upload, 0, body_of(b"12345"), expected_crc=1)
+        return upload
+
+    upload = asyncio.run(scenario())
+
+    assert upload.offset == 0
+    assert upload.partial_path.stat().st_size == 0
+
+
+def test_body_larger_than_announced_is_rejected(tmp_path):
+    inbox = Inbox(tmp_path)
+
+    async def scenario():
+        upload = inbox.create("a.bin", 3)
+        await inbox.append(upload, 0, body_of(b"12345"))
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(scenario())
+
+
+def test_resume_after_restart_rebuilds_crc(tmp_path):
+    data = b"hello world"
+
+    async def interrupted():
+        inbox = Inbox(tmp_path)
+        upload = inbox.create("notes.txt", len(data))
+        await inbox.append(upload, 0, body_of(data[:5]))
+        return upload.id
+
+    upload_id = asyncio.run(interrupted())
+
+    # A fresh Inbox (as after a server restart) picks up the partial file
+    inbox = Inbox(tmp_path)
+    upload = inbox.get(upload_id)
+    assert upload.offset == 5
+    assert upload.crc == zlib.crc32(data[:5])
+
+    final = asyncio.run(inbox.append(upload, 5, body_of(data[5:]), zlib.crc32(data)))
+    assert final.read_bytes() == data
+
+
+def test_abandoned_uploads_expire(tmp_path):
+    inbox = Inbox(tmp_path)
+    stale = inbox.create("old.bin", 10)
+    fresh = inbox.create("new.bin", 10)
+    long_ago = time.time() - 2 * 3600
+    for path in (stale.partial_path, tmp_path / ".partial" / f"{stale.id}.json"):
+        os.utime(path, (long_ago, long_ago))
+
+    # As at the next start of the server
+    inbox = Inbox(tmp_path, partial_ttl=3600)
+
+    assert not stale.partial_path.exists()
+    assert not (tmp_path / ".partial" / f"{stale.id}.json").exists()
+    with pytest.raises(UploadNotFound):
+        inbox.get(stale.id)
+    assert inbox.get(fresh.id).offset == 0
+
+
+def test_name_collisions_get_a_suffix(tmp_path):
+    inbox = Inbox(tmp_path)
+    (tmp_path / "a.txt").write_text("existing")
+
+    async def scenario():
+        upload = inbox.create("a.txt", 1)
+        return await inbox.append(upload, 0, body_of(b"x"))
+
+    assert asyncio.run(scenario()) == tmp_path / "a (1).txt"
+
+
+def test_unknown_upload(tmp_path):
+    with pytest.raises(UploadNotFound):
+        Inbox(tmp_path).get("missing")
+    with pytest.raises(UploadNotFound):
+        Inbox(tmp_path).get("../escape")
+
+
+def test_upload_api_resume(tmp_path):
+    from fastapi.testclient import TestClient
+
+    app = create_app(PairingManager(PairingStore(tmp_path / "devices.json"), required=False))
+    app.state.inbox = Inbox(tmp_path)
+    client = TestClient(app)
+    data = b"0123456789"
+
+    upload = client.post("/api/inbox/uploads", params={"name": "x.bin", "size": 10}).json()
+    url = f"/api/inbox/uploads/{upload['id']}"
+
+    response = client.patch(url, content=data[:4], headers={"Upload-Offset": "0"})
+    assert response.json()["offset"] == 4
+    assert response.json()["complete"] is False
+
+    # Client lost track: ask the server where to resume and verify the prefix
+    state = client.get(url).json()
+    assert state["offset"] == 4
+    assert state["crc32"] == zlib.crc32(data[:4])
+
+    response = client.patch(
+        url,
+        content=data[4:],
+        headers={"Upload-Offset": "4", "Upload-CRC32": str(zlib.crc32(data))},
+    )
+    assert response.json()["complete"] is True
+    assert (tmp_path / "x.bin").read_bytes() == data
+
+    assert client.patch(url, content=b"", headers={"Upload-Offset": "0"}).status_code == 404
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.mark.skipif(_process_rss_bytes() is None, reason="RSS not measurable on this platform")
+def test_large_upload_memory_stays_flat(tmp_path):
+    # Kept small by default; REMOTE_MOUSE_UPLOAD_TEST_MIB=4096 opts into a multi-gigabyte run
+    total = int(os.environ.get("REMOTE_MOUSE_UPLOAD_TEST_MIB", "16")) * 1024 * 1024
+    block = os.urandom(1024 * 1024)
+
+    pairing = PairingManager(PairingStore(tmp_path / "devices.json"), required=False)
+    app: FastAPI = create_app(pairing)
+    app.state.inbox = Inbox(tmp_path)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    peak = {"rss": 0}
+
+    def body():
+        crc = 0
+        for _ in range(total // len(block)):
+            crc = zlib.crc32(block, crc)
+            peak["rss"] = max(peak["rss"], _process_rss_bytes())
+            yield block
+        peak["crc"] = crc
+
+    try:
+        base = f"http://127.0.0.1:{port}/api/inbox/uploads"
+        with httpx.Client(timeout=None) as client:
+            upload = client.post(base, params={"name": "big.bin", "size": total}).json()
+            baseline = _process_rss_bytes()
+            response = client.patch(
+                f"{base}/{upload['id']}", content=body(), headers={"Upload-Offset": "0"}
+            )
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    assert response.json()["complete"] is True
+    assert (tmp_path / "big.bin").stat().st_size == total
+    assert response.json()["crc32"] == peak["crc"]
+    # Both client and server run in this process; neither may buffer the body
+    assert peak["rss"] - baseline < min(64 * 1024 * 1024, total // 2)
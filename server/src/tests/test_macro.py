@@ -0,0 +1,197 @@
+import json
+import threading
+
+import pytest
+
+from server.core.macro import (
+    MACRO_CANCEL,
+    MACRO_PLAY,
+    OP_MACRO,
+    ClickStep,
+    KeyStep,
+    MacroPlayer,
+    MacroStore,
+    TextStep,
+    compile_macro,
+)
+
+SIGN_OFF = [
+    {"text": "Best regards,"},
+    {"key": "enter"},
+    {"delay": 0.01},
+    {"delay": 0.02},
+    {"text": "Sam"},
+    {"key": "s", "modifiers": ["ctrl"]},
+]
+
+
+class FakeBackend:
+    """Records injected input instead of touching the desktop."""
+
+    def __init__(self):
+        self.calls = []
+        self.done = threading.Event()
+
+    def press(self, key):
+        self.calls.append(("press", key))
+
+    def hotkey(self, *keys):
+        self.calls.append(("hotkey", keys))
+
+    def write(self, text):
+        self.calls.append(("write", text))
+        if text == "last":
+            self.done.set()
+
+    def click(self, button, clicks):
+        self.calls.append(("click", button, clicks))
+
+
+def frame(command, name=""):
+    return bytes([OP_MACRO, command]) + name.encode("utf-8")
+
+
+def test_compile_merges_delays():
+    plan = compile_macro("sign-off", SIGN_OFF)
+
+    assert [delay for delay, _ in plan.steps] == [0.0, 0.0, pytest.approx(0.03), 0.0]
+    kinds = [type(step) for _, step in plan.steps]
+    assert kinds == [TextStep, KeyStep, TextStep, KeyStep]
+    assert plan.steps[3][1].keys == ("ctrl", "s")
+
+
+@pytest.mark.parametrize(
+    "steps",
+    [
+        [],
+        [{"key": "nosuchkey"}],
+        [{"text": ""}],
+        [{"click": "left", "count": 0}],
+        [{"delay": -1}],
+        [{"key": "a", "text": "b"}],
+        [{"text": "x", "modifiers": ["ctrl"]}],
+        [{"key": "a", "count": 2}],
+        [{"delay": 1, "count": 2}],
+        [{"modifiers": ["ctrl"]}],
+        ["enter"],
+    ],
+)
+def test_compile_rejects_invalid_steps(steps):
+    with pytest.raises(ValueError):
+        compile_macro("bad", steps)
+
+
+def test_store_round_trip(tmp_path):
+    path = tmp_path / "macros.json"
+    store = MacroStore(path)
+    store.save("sign-off", SIGN_OFF)
+    store.save("double", [{"click": "left", "count": 2}])
+    assert store.remove("double")
+    assert not store.remove("double")
+
+    assert json.loads(path.read_text(encoding="utf-8")) == {"sign-off": SIGN_OFF}
+    reloaded = MacroStore(path)
+    assert [plan.name for plan in reloaded.plans()] == ["sign-off"]
+
+
+def test_store_skips_invalid_macros(tmp_path):
+    path = tmp_path / "macros.json"
+    path.write_text(json.dumps({"good": [{"key": "tab"}], "bad": [{"key": "nosuchkey"}]}))
+
+    store = MacroStore(path)
+
+    assert store.get("good") is not None
+    assert store.get("bad") is None
+
+
+def test_playback_runs_steps_in_order(tmp_path):
+    store = MacroStore(None)
+    store.save("m", [{"key": "tab"}, {"delay": 0.01}, {"click": "right"}, {"text": "last"}])
+    backend = FakeBackend()
+    player = MacroPlayer(store, backend=backend)
+
+    player.handle(frame(MACRO_PLAY, "m"))
+    assert backend.done.wait(2.0)
+    player.stop()
+
+    assert backend.calls == [("press", "tab"), ("click", "right", 1), ("write", "last")]
+
+
+def test_cancel_stops_a_delayed_macro():
+    store = MacroStore(None)
+    store.save("slow", [{"key": "tab"}, {"delay": 30}, {"key": "enter"}])
+    store.save("quick", [{"text": "last"}])
+    backend = FakeBackend()
+    player = MacroPlayer(store, backend=backend)
+
+    player.handle(frame(MACRO_PLAY, "slow"))
+    player.handle(frame(MACRO_CANCEL))
+    player.handle(frame(MACRO_PLAY, "quick"))
+    assert backend.done.wait(2.0)
+    player.stop()
+
+    assert ("press", "enter") not in backend.calls
+    assert backend.calls[-1] == ("write", "last")
+
+
+def test_stop_during_a_slow_step_keeps_one_worker():
+    store = MacroStore(None)
+    store.save("slow", [{"text": "slow"}])
+    store.save("quick", [{"text": "last"}])
+    backend = FakeBackend()
+    entered, release = threading.Event(), threading.Event()
+    write = backend.write
+
+    def blocking_write(text):
+        if text == "slow":
+            entered.set()
+            release.wait(2.0)
+        write(text)
+
+    backend.write = blocking_write
+    player = MacroPlayer(store, backend=backend)
+    player.stop_timeout = 0.05
+
+    player.handle(frame(MACRO_PLAY, "slow"))
+    assert entered.wait(2.0)
+    # The step outlasts the join, and a new connection plays straight away
+    player.stop()
+    player.handle(frame(MACRO_PLAY, "quick"))
+    release.set()
+    assert backend.done.wait(2.0)
+
+    workers = [t for t in threading.enumerate() if t.name == "macro-player"]
+    assert workers == [player._thread]
+    player.stop()
+    assert not any(t.name == "macro-player" for t in threading.enumerate())
+    assert backend.calls == [("write", "slow"), ("write", "last")]
+
+
+def test_unknown_macro_is_ignored():
+    player = MacroPlayer(MacroStore(None), backend=FakeBackend())
+
+    player.handle(frame(MACRO_PLAY, "missing"))
+    player.handle(bytes([OP_MACRO]))
+
+    # Nothing to play, so no thread either
+    assert player._thread is None
+
+
+def test_click_step():
+    backend = FakeBackend()
+    ClickStep("left", 2).run(backend)
+    assert backend.calls == [("click", "left", 2)]
+
+
+def test_macro_api(client, tmp_path):
+    client.app.state.macros = MacroPlayer(MacroStore(tmp_path / "macros.json"))
+
+    response = client.put("/api/macros/sign-off", json={"steps": SIGN_OFF})
+    assert response.status_code == 200
+    assert client.get("/api/macros").json() == {"macros": [{"name": "sign-off", "steps": SIGN_OFF}]}
+
+    response = client.put("/api/macros/bad", json={"steps": [{"key": "nosuchkey"}]})
+    assert response.status_code == 400
+
+    assert client.delete("/api/macros/sign-off").status_code == 200
+    assert client.delete("/api/macros/sign-off").status_code == 404
@@ -1,6 +1,13 @@
 import pytest
 import socket
-from server.services.mdns import MDNSResponder
+import threading
+import time
+from unittest.mock import MagicMock
+
+from zeroconf import ServiceStateChange
+
+from server.core.events import TOPIC_ADDRESS, EventBus
+from server.services.mdns import MDNSResponder, Peer, PeerCache
 
 
 def test_initialization(mock_zeroconf):
@@ -64,3 +71,111 @@ def test_unregister_without_register(mock_zeroconf):
 
     mock_zeroconf.unregister_service.assert_not_called()
     mock_zeroconf.close.assert_called_once()
+
+
+def test_browse_ignores_foreign_services(mock_zeroconf):
+    """Only services announcing our app id end up in the peer cache."""
+    responder = MDNSResponder(service_name="Me", hostname="me.local.")
+    zeroconf = MagicMock()
+    zeroconf.get_service_info.return_value.properties = {b"path": b"/"}
+
+    responder._on_service_state_change(
+        zeroconf, MDNSResponder.SERVICE_TYPE, "Printer._http._tcp.local.", ServiceStateChange.Added
+    )
+    responder._on_service_state_change(
+        zeroconf, MDNSResponder.SERVICE_TYPE, responder.service_name, ServiceStateChange.Added
+    )
+
+    assert responder.peers.peers() == []
+    # Our own announcement is skipped without a lookup
+    assert zeroconf.get_service_info.call_count == 1
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_peer_discovery_on_loopback():
+    """Several real instances on loopback find each other and notice one leaving."""
+    responders = [
+        MDNSResponder(
+            service_name=f"Loopback {i}",
+            port=19990 + i,
+            hostname=f"loopback-{i}.local.",
+            interfaces=["127.0.0.1"],
+            address="127.0.0.1",
+        )
+        for i in range(3)
+    ]
+    try:
+        for responder in responders:
+            responder.register()
+            responder.browse()
+
+        def ports(responder):
+            return {peer.port for peer in responder.peers.peers()}
+
+        assert wait_for(lambda: ports(responders[0]) == {19991, 19992})
+        assert wait_for(lambda: ports(responders[2]) == {19990, 19991})
+        peer = next(p for p in responders[0].peers.peers() if p.port == 19991)
+        assert peer.addresses == ["127.0.0.1"]
+        assert peer.name.startswith("Loopback 1")
+
+        responders[1].unregister()
+        assert wait_for(lambda: ports(responders[0]) == {19992})
+    finally:
+        for responder in (responders[0], responders[2]):
+            responder.unregister()
+
+
+def test_peers_api(client):
+    client.app.state.peers.update(Peer("Desk", "desk.local.", ["10.0.0.2"], 9997))
+
+    response = client.get("/api/peers")
+
+    assert response.status_code == 200
+    assert response.json()["peers"][0]["addresses"] == ["10.0.0.2"]
+
+
+def test_peer_cache_replaces_by_name():
+    cache = PeerCache()
+    cache.update(Peer("Desk", "desk.local.", ["10.0.0.2"], 9997))
+    cache.update(Peer("Desk", "desk.local.", ["10.0.0.3"], 9997))
+    cache.remove("Laptop")
+
+    assert [peer.addresses for peer in cache.peers()] == [["10.0.0.3"]]
+
+
+def test_address_change_is_announced(mock_zeroconf, mock_socket):
+    bus = EventBus()
+    responder = MDNSResponder(event_bus=bus)
+    responder.register()
+    assert bus.latest(TOPIC_ADDRESS) == "192.168.1.100"
+    assert responder.check_address() is False
+
+    # Renewed lease on another subnet
+    mock_socket.getsockname.return_value = ["10.0.0.7"]
+    assert responder.check_address() is True
+
+    assert bus.latest(TOPIC_ADDRESS) == "10.0.0.7"
+    updated = mock_zeroconf.update_service.call_args[0][0]
+    assert updated.addresses == [socket.inet_aton("10.0.0.7")]
+    assert responder.check_address() is False
+
+
+def test_address_watcher_stops_on_unregister(mock_zeroconf, mock_socket):
+    responder = MDNSResponder(event_bus=EventBus())
+    responder.register()
+    responder.watch_address(interval=0.01)
+    mock_socket.getsockname.return_value = ["10.0.0.7"]
+
+    deadline = time.monotonic() + 2
+    while not mock_zeroconf.update_service.called and time.monotonic() < deadline:
+        time.sleep(0.01)
+    responder.unregister()
+
+    assert mock_zeroconf.update_service.called
+    assert not any(t.name == "mdns-address" for t in threading.enumerate())
@@ -0,0 +1,60 @@
+from server.core.metrics import LATENCY_BUCKETS, Histogram, Metrics
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram((0.1, 1.0))
+    hist.observe(0.05)
+    hist.observe(0.5)
+    hist.observe(5.0)
+
+    lines = []
+    hist.render("h", lines)
+
+    assert 'h_bucket{le="0.1"} 1' in lines
+    assert 'h_bucket{le="1.0"} 2' in lines
+    assert 'h_bucket{le="+Inf"} 3' in lines
+    assert "h_count 3" in lines
+
+
+def test_record_frame_counts_per_opcode():
+    m = Metrics()
+    m.record_frame(0x01, 5, 0.0002)
+    m.record_frame(0x01, 5, 0.0002)
+    m.record_frame(0x02, 3, 0.003)
+
+    assert m.frames_total[0x01] == 2
+    assert m.frame_bytes_total[0x01] == 10
+    assert m.frames_total[0x02] == 1
+    assert sum(m.injection_latency.counts) == 3
+    # Hot path must not grow any structure
+    assert len(m.frames_total) == 256
+    assert len(m.injection_latency.counts) == len(LATENCY_BUCKETS) + 1
+
+
+def test_render_openmetrics():
+    m = Metrics()
+    m.record_frame(0x01, 5, 0.0002)
+    m.record_malformed()
+    m.record_dropped()
+    m.session_opened()
+
+    text = m.render_openmetrics()
+
+    assert 'remote_mouse_frames_total{opcode="0x01"} 1' in text
+    assert 'remote_mouse_frame_bytes_total{opcode="0x01"} 5' in text
+    assert "remote_mouse_malformed_frames_total 1" in text
+    assert "remote_mouse_dropped_frames_total 1" in text
+    assert "remote_mouse_sessions 1" in text
+    assert "remote_mouse_injection_latency_seconds_count 1" in text
+    assert "process_cpu_seconds_total" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_session_gauge():
+    m = Metrics()
+    m.session_opened()
+    m.session_opened()
+    m.session_closed()
+
+    assert m.sessions_connected == 1
+    assert m.sessions_total == 2
@@ -0,0 +1,100 @@
+import threading
+import time
+
+from server.core.pacing import MotionPacer
+
+FRAME = 1 / 60
+
+
+class FakeBackend:
+    """Records relative moves instead of touching the desktop."""
+
+    def __init__(self):
+        self.moves = []
+        self.moved = threading.Event()
+
+    def moveRel(self, dx, dy):
+        self.moves.append((dx, dy))
+        self.moved.set()
+
+
+def bursty_arrivals(bursts: int, per_burst: int = 3, gap: float = 0.05):
+    """Frames sent at 60 Hz but delivered `per_burst` at a time, as Wi-Fi batching does."""
+    return [(i * gap, 10) for i in range(bursts) for _ in range(per_burst)]
+
+
+def replay(pacer: MotionPacer, arrivals, duration: float) -> list[tuple[int, int]]:
+    """Drive the pacer with a virtual clock ticking exactly once per frame."""
+    arrivals = list(arrivals)
+    out = []
+    for n in range(int(duration / FRAME) + 1):
+        now = n * FRAME
+        while arrivals and arrivals[0][0] <= now:
+            t, dx = arrivals.pop(0)
+            pacer.push(dx, 0, now=t)
+        dx, dy, _ = pacer.tick(now)
+        out.append((dx, dy))
+    return out
+
+
+def test_bursts_are_spread_evenly():
+    pacer = MotionPacer(hz=60, max_delay=0.06, backend=FakeBackend())
+    out = replay(pacer, bursty_arrivals(20), duration=1.2)
+
+    assert sum(dx for dx, _ in out) == 20 * 3 * 10
+    # Once the buffer has adapted to the 50 ms bursts, every frame moves the cursor
+    steady = [dx for dx, _ in out[20:55]]
+    assert min(steady) > 0
+    assert max(steady) - min(steady) <= 2
+
+
+def test_delay_is_bounded():
+    pacer = MotionPacer(hz=60, max_delay=0.03, backend=FakeBackend())
+    for i in range(30):
+        pacer.push(5, 0, now=i * 0.2)
+        pacer.push(5, 0, now=i * 0.2 + 0.01)
+    assert pacer.min_delay <= pacer.delay <= 0.03
+
+    pacer = MotionPacer(hz=60, max_delay=0.03, backend=FakeBackend())
+    pacer.push(7, 3, now=0.0)
+    dx, dy, idle = pacer.tick(0.03)
+    assert (dx, dy, idle) == (7, 3, True)
+
+
+def test_delay_follows_arrival_gaps():
+    pacer = MotionPacer(hz=60, min_delay=0.005, max_delay=0.1, backend=FakeBackend())
+    for i in range(200):
+        pacer.push(1, 0, now=i * 0.008)
+    steady = pacer.delay
+    for i in range(200):
+        pacer.push(1, 0, now=1.6 + i * 0.04)
+    assert steady < 0.01
+    assert 0.035 < pacer.delay <= 0.041
+
+
+def test_flush_emits_buffered_motion_at_once():
+    backend = FakeBackend()
+    pacer = MotionPacer(backend=backend)
+    pacer.push(4, -2, now=0.0)
+    pacer.push(6, -3, now=0.01)
+
+    pacer.flush()
+    assert backend.moves == [(10, -5)]
+    assert pacer.tick(1.0) == (0, 0, True)
+
+
+def test_output_thread_applies_motion():
+    backend = FakeBackend()
+    pacer = MotionPacer(hz=120, backend=backend)
+    pacer.start()
+    try:
+        pacer.push(3, 4)
+        pacer.push(3, 4)
+        assert backend.moved.wait(1)
+        deadline = time.monotonic() + 1
+        while sum(dx for dx, _ in backend.moves) < 6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        pacer.stop()
+    assert sum(dx for dx, _ in backend.moves) == 6
+    assert sum(dy for _, dy in backend.moves) == 8
@@ -0,0 +1,149 @@
+import json
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from server.config import PAIRING_MAX_ATTEMPTS
+from server.core.inbox import Inbox
+from server.core.pairing import (
+    WS_CLOSE_UNAUTHORIZED,
+    PairingManager,
+    PairingStore,
+    challenge_mac,
+)
+from server.services.web import create_app
+
+
+@pytest.fixture
+def pairing(tmp_path):
+    return PairingManager(PairingStore(tmp_path / "devices.json"))
+
+
+@pytest.fixture
+def client(pairing):
+    return TestClient(create_app(pairing))
+
+
+def pair(client, pairing, name="Phone"):
+    code = pairing.new_code()
+    response = client.post("/api/pairing", json={"code": code, "name": name})
+    assert response.status_code == 200
+    body = response.json()
+    return body["device"], bytes.fromhex(body["key"])
+
+
+def handshake(websocket, device, key):
+    challenge = websocket.receive_json()
+    assert challenge["type"] == "challenge"
+    websocket.send_text(
+        json.dumps(
+            {"type": "auth", "device": device, "mac": challenge_mac(key, challenge["nonce"])}
+        )
+    )
+
+
+def test_code_is_single_use(pairing):
+    code = pairing.new_code()
+    assert len(code) == 6
+    assert pairing.redeem(code, "Phone") is not None
+    assert pairing.redeem(code, "Phone") is None
+
+
+def test_code_revoked_after_wrong_guesses(pairing):
+    code = pairing.new_code()
+    wrong = "000000" if code != "000000" else "111111"
+    for _ in range(PAIRING_MAX_ATTEMPTS):
+        assert pairing.redeem(wrong, "Attacker") is None
+    assert pairing.redeem(code, "Phone") is None
+
+
+def test_code_expires(tmp_path):
+    pairing = PairingManager(PairingStore(tmp_path / "devices.json"), code_ttl=0.01)
+    code = pairing.new_code()
+    time.sleep(0.02)
+    assert pairing.active_code() is None
+    assert pairing.redeem(code, "Phone") is None
+
+
+def test_devices_persist(tmp_path):
+    path = tmp_path / "devices.json"
+    device = PairingStore(path).add("Phone")
+
+    reloaded = PairingStore(path)
+    assert reloaded.get(device.id).key == device.key
+    assert reloaded.remove(device.id)
+    assert PairingStore(path).get(device.id) is None
+    if sys.platform != "win32":
+        assert path.stat().st_mode & 0o777 == 0o600
+    assert not path.with_suffix(".tmp").exists()
+
+
+def test_paired_device_connects(client, pairing):
+    device, key = pair(client, pairing)
+
+    with client.websocket_connect("/ws") as websocket:
+        handshake(websocket, device, key)
+        hello = websocket.receive_json()
+        assert hello["type"] == "session"
+
+        # After the handshake frames flow as before
+        websocket.send_bytes(b"\x07\x01")
+        assert websocket.receive_bytes() == b"\x07\x01"
+
+
+def test_wrong_mac_is_rejected(client, pairing):
+    device, _ = pair(client, pairing)
+
+    with client.websocket_connect("/ws") as websocket:
+        handshake(websocket, device, b"\x00" * 32)
+        with pytest.raises(WebSocketDisconnect) as exc:
+            websocket.receive_json()
+    assert exc.value.code == WS_CLOSE_UNAUTHORIZED
+
+
+def test_unpaired_screen_preview_is_rejected(client):
+    with client.websocket_connect("/ws/screen") as websocket:
+        websocket.receive_json()
+        websocket.send_text(json.dumps({"type": "auth", "device": "nope", "mac": "00"}))
+        with pytest.raises(WebSocketDisconnect) as exc:
+            websocket.receive_bytes()
+    assert exc.value.code == WS_CLOSE_UNAUTHORIZED
+
+
+def test_bad_pairing_code(client, pairing):
+    pairing.new_code()
+    assert client.post("/api/pairing", json={"code": "abc"}).status_code == 403
+
+
+def test_code_issued_on_request_from_this_machine(pairing):
+    app = create_app(pairing)
+    remote = TestClient(app, client=("192.168.1.20", 50000))
+    assert remote.post("/api/local/pairing-code").status_code == 403
+    assert pairing.active_code() is None
+
+    local = TestClient(app, client=("127.0.0.1", 50000))
+    body = local.post("/api/local/pairing-code").json()
+    assert body["code"] == pairing.active_code()
+    assert body["expires_in"] == pairing.code_ttl
+    assert local.post("/api/pairing", json={"code": body["code"]}).status_code == 200
+
+
+def test_uploads_need_a_session(client, pairing, tmp_path):
+    response = client.post("/api/inbox/uploads", params={"name": "a.txt", "size": 1})
+    assert response.status_code == 401
+
+    device, key = pair(client, pairing)
+    with client.websocket_connect("/ws") as websocket:
+        handshake(websocket, device, key)
+        token = websocket.receive_json()["token"]
+
+    client.app.state.inbox = Inbox(tmp_path)
+    response = client.post(
+        "/api/inbox/uploads",
+        params={"name": "a.txt", "size": 1},
+        headers={"X-Session-Token": token},
+    )
+    assert response.status_code == 200
@@ -0,0 +1,203 @@
+from unittest.mock import patch
+
+from server.core.metrics import metrics
+from server.core.monitors import DisplayLayout, Monitor, MonitorIndex
+from server.core.pointer import (
+    ABS_SCALE,
+    MOVE_ABS,
+    OP_MOVE_ABS,
+    AbsolutePointer,
+    CursorTracker,
+)
+
+# A 1080p primary with a portrait monitor to its left, top-aligned
+PRIMARY = Monitor(0, 0, 1920, 1080, primary=True)
+PORTRAIT = Monitor(-1080, 0, 1080, 1920)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeBackend:
+    """Records moves and counts position queries instead of touching the desktop."""
+
+    def __init__(self, position=(100, 100)):
+        self.real_position = position
+        self.queries = 0
+        self.moves = []
+
+    def position(self):
+        self.queries += 1
+        return self.real_position
+
+    def moveTo(self, x, y):  # noqa: N802
+        self.moves.append((x, y))
+
+
+def tracker(clock=None, backend=None):
+    clock = clock or FakeClock()
+    index = MonitorIndex(lambda: [PRIMARY, PORTRAIT], clock=clock)
+    return CursorTracker(index, backend or FakeBackend(), clock=clock)
+
+
+def frame(index: int, nx: int, ny: int) -> bytes:
+    return bytes([OP_MOVE_ABS]) + MOVE_ABS.pack(index, nx, ny)
+
+
+def test_layout_numbers_primary_first():
+    layout = DisplayLayout([PORTRAIT, PRIMARY])
+    assert layout.monitors == [PRIMARY, PORTRAIT]
+    assert layout.target(1) == PRIMARY
+    assert layout.target(2) == PORTRAIT
+    # The whole desktop, also for monitors that went away
+    assert layout.target(0) == Monitor(-1080, 0, 3000, 1920)
+    assert layout.target(3) == layout.target(0)
+
+
+def test_layout_clamps_to_nearest_monitor():
+    layout = DisplayLayout([PRIMARY, PORTRAIT])
+    # Below the primary, beside the taller portrait monitor: no screen there
+    assert layout.clamp(500, 1500) == (500, 1079)
+    assert layout.clamp(-500, 1500) == (-500, 1500)
+    assert layout.clamp(5000, -10) == (1919, 0)
+
+
+def test_monitor_index_is_cached_until_checked():
+    clock = FakeClock()
+    calls = []
+    pending = []
+
+    def source():
+        calls.append(clock.now)
+        return [PRIMARY] if len(calls) < 3 else [PRIMARY, PORTRAIT]
+
+    index = MonitorIndex(source, check_interval=2.0, clock=clock, spawn=pending.append)
+    first = index.layout()
+    clock.now = 1.0
+    assert index.layout() is first
+    assert len(calls) == 1
+
+    # Past the interval the lookup still answers at once and leaves the re-check queued
+    clock.now = 2.5
+    assert index.layout() is first
+    assert index.layout() is first
+    assert len(calls) == 1
+    assert len(pending) == 1
+    # Same geometry on re-check: the cached layout is kept
+    pending.pop()()
+    assert index.layout() is first
+
+    # A monitor was plugged in
+    index.invalidate()
+    assert index.layout() is first
+    pending.pop()()
+    assert index.layout().monitors == [PRIMARY, PORTRAIT]
+    assert len(calls) == 3
+    assert pending == []
+
+
+def test_monitor_index_refresh_is_synchronous():
+    monitors = [PRIMARY]
+    index = MonitorIndex(lambda: list(monitors), spawn=lambda check: None)
+    assert index.layout().monitors == [PRIMARY]
+
+    monitors.append(PORTRAIT)
+    assert index.refresh().monitors == [PRIMARY, PORTRAIT]
+    assert index.layout().monitors == [PRIMARY, PORTRAIT]
+
+
+def test_relative_motion_queries_position_once():
+    backend = FakeBackend()
+    clock = FakeClock()
+    cursor = tracker(clock, backend)
+
+    for _ in range(50):
+        clock.now += 0.008
+        cursor.moveRel(2, 1)
+
+    assert backend.queries == 1
+    assert backend.moves[-1] == (200, 150)
+    assert cursor.position == (200, 150)
+
+
+def test_relative_motion_resyncs_after_idle():
+    backend = FakeBackend()
+    clock = FakeClock()
+    cursor = tracker(clock, backend)
+    cursor.moveRel(10, 0)
+
+    # The desktop's own mouse moved it during a pause
+    backend.real_position = (500, 500)
+    clock.now += 1.0
+    cursor.moveRel(10, 0)
+    assert backend.queries == 2
+    assert cursor.position == (510, 500)
+
+
+def test_relative_motion_stops_at_screen_edge():
+    backend = FakeBackend(position=(1910, 10))
+    cursor = tracker(backend=backend)
+    cursor.moveRel(50, 0)
+    cursor.moveRel(-5, 0)
+    assert backend.moves == [(1919, 10), (1914, 10)]
+
+
+def test_tracker_moves_through_platform_module():
+    class PlatformModule:
+        moves = []
+
+        @staticmethod
+        def _moveTo(x, y):  # noqa: N802
+            PlatformModule.moves.append((x, y))
+
+    backend = FakeBackend()
+    backend.platformModule = PlatformModule
+    cursor = tracker(backend=backend)
+    cursor.move_to(30, 40)
+    assert PlatformModule.moves == [(30, 40)]
+    assert backend.moves == []
+
+
+def test_absolute_frames_map_to_chosen_monitor():
+    backend = FakeBackend()
+    pointer = AbsolutePointer(tracker(backend=backend))
+
+    pointer.handle(frame(1, ABS_SCALE, ABS_SCALE))
+    pointer.handle(frame(2, 0, ABS_SCALE // 2))
+    pointer.handle(frame(0, 0, 0))
+
+    assert backend.moves == [(1919, 1079), (-1080, 959), (-1080, 0)]
+    assert backend.queries == 0
+
+
+def test_absolute_malformed_frame():
+    before = metrics.malformed_frames_total
+    AbsolutePointer(tracker()).handle(bytes([OP_MOVE_ABS, 1, 0]))
+    assert metrics.malformed_frames_total == before + 1
+
+
+def test_monitors_api_and_absolute_frames(client):
+    backend = FakeBackend()
+    cursor = CursorTracker(MonitorIndex(lambda: [PORTRAIT, PRIMARY]), backend)
+    with patch("server.services.web.cursor", cursor):
+        client.app.state.pointer = AbsolutePointer(cursor)
+
+        response = client.get("/api/monitors")
+        assert response.status_code == 200
+        monitors = response.json()["monitors"]
+        assert [m["index"] for m in monitors] == [1, 2]
+        assert monitors[0]["primary"] is True
+        assert monitors[1]["width"] == 1080
+
+        with client.websocket_connect("/ws") as ws:
+            ws.receive_json()
+            ws.send_bytes(frame(2, ABS_SCALE, 0))
+            ws.send_bytes(bytes([0x07]))
+            ws.receive_bytes()
+
+    assert backend.moves == [(-1, 0)]
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from server.core.backend import pyautogui
+from server.core.pairing import PairingManager, PairingStore
+from server.core.runtime import OnDemand
+from server.services.web import create_app
+
+
+class Counter:
+    def __init__(self):
+        self.starts = 0
+        self.stops = 0
+
+    def start(self):
+        self.starts += 1
+
+    def stop(self):
+        self.stops += 1
+
+
+def test_starts_once_for_overlapping_users():
+    counter = Counter()
+
+    async def scenario():
+        services = OnDemand(counter.start, counter.stop, idle_timeout=10)
+        services.acquire()
+        services.acquire()
+        services.release()
+        services.release()
+        return services.active
+
+    assert asyncio.run(scenario()) is True
+    assert counter.starts == 1
+    assert counter.stops == 0
+
+
+def test_releases_after_idle_timeout():
+    counter = Counter()
+
+    async def scenario():
+        services = OnDemand(counter.start, counter.stop, idle_timeout=0.01)
+        services.acquire()
+        services.release()
+        await asyncio.sleep(0.05)
+        return services.active
+
+    assert asyncio.run(scenario()) is False
+    assert counter.stops == 1
+
+
+def test_returning_user_cancels_release():
+    counter = Counter()
+
+    async def scenario():
+        services = OnDemand(counter.start, counter.stop, idle_timeout=0.02)
+        services.acquire()
+        services.release()
+        services.acquire()
+        await asyncio.sleep(0.05)
+        return services.active
+
+    assert asyncio.run(scenario()) is True
+    assert (counter.starts, counter.stops) == (1, 0)
+
+
+def test_without_timeout_runs_until_closed():
+    counter = Counter()
+
+    async def scenario():
+        services = OnDemand(counter.start, counter.stop)
+        services.acquire()
+        services.release()
+        await asyncio.sleep(0.01)
+        active = services.active
+        services.close()
+        services.close()
+        return active
+
+    assert asyncio.run(scenario()) is True
+    assert (counter.starts, counter.stops) == (1, 1)
+
+
+def test_lazy_app_starts_input_on_first_connection(tmp_path):
+    pairing = PairingManager(PairingStore(tmp_path / "devices.json"), required=False)
+    app = create_app(pairing, lazy=True, idle_timeout=0.01)
+    services = app.state.input_services
+
+    with TestClient(app) as client:
+        assert services.active is False
+        with client.websocket_connect("/ws") as websocket:
+            websocket.receive_json()
+            assert services.active is True
+
+        deadline = time.monotonic() + 2
+        while services.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert services.active is False
+
+
+def test_web_service_does_not_import_tray_or_backend():
+    code = (
+        "import sys\n"
+        "import server.services.manager\n"
+        "loaded = [m for m in ('pystray', 'pyautogui', 'server.ui.tray_icon')\n"
+        "          if m in sys.modules]\n"
+        "print(','.join(loaded))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_backend_load_failure_is_logged(tmp_path, monkeypatch):
+    def load():
+        raise RuntimeError("no display")
+
+    monkeypatch.setattr(pyautogui, "load", load)
+    pairing = PairingManager(PairingStore(tmp_path / "devices.json"), required=False)
+    app = create_app(pairing, lazy=True)
+    services = app.state.input_services
+    messages = []
+    handler = logger.add(messages.append, level="ERROR", format="{message}")
+
+    async def scenario():
+        services.acquire()
+        deadline = time.monotonic() + 2
+        while not messages and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        services.close()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        logger.remove(handler)
+    assert any("Failed to load the input backend: no display" in m for m in messages)
@@ -0,0 +1,130 @@
+import asyncio
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+
+import numpy as np
+
+from server.core.screen import (
+    FLAG_KEYFRAME,
+    FRAME_HEADER,
+    OP_SCREEN_FRAME,
+    TILE_HEADER,
+    ScreenStreamer,
+    TileDiffer,
+    encode_tile,
+    pack_frame,
+)
+
+
+def make_frame(height=128, width=192, value=0):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_first_frame_marks_every_tile():
+    differ = TileDiffer(tile_size=64)
+    changed = differ.diff(make_frame())
+    assert len(changed) == 2 * 3
+
+
+def test_static_frame_has_no_changes():
+    differ = TileDiffer(tile_size=64)
+    differ.diff(make_frame())
+    assert len(differ.diff(make_frame())) == 0
+
+
+def test_single_pixel_change_marks_one_tile():
+    differ = TileDiffer(tile_size=64)
+    differ.diff(make_frame())
+
+    frame = make_frame()
+    frame[70, 130] = (255, 0, 0)
+
+    assert differ.diff(frame).tolist() == [[1, 2]]
+
+
+def test_partial_edge_tiles_are_diffed():
+    differ = TileDiffer(tile_size=64)
+    differ.diff(make_frame(100, 100))
+
+    frame = make_frame(100, 100)
+    frame[99, 99] = (1, 1, 1)
+
+    assert differ.diff(frame).tolist() == [[1, 1]]
+
+
+def test_resolution_change_resends_everything():
+    differ = TileDiffer(tile_size=64)
+    differ.diff(make_frame(64, 64))
+    assert len(differ.diff(make_frame(128, 128))) == 4
+
+
+def test_encode_tile_produces_jpeg():
+    payload = encode_tile(make_frame(value=128), 0, 0, tile_size=64)
+    assert payload[:2] == b"\xff\xd8"
+
+
+def test_pack_frame_layout():
+    message = pack_frame(192, 128, 64, [(1, 2, b"abc")], FLAG_KEYFRAME)
+
+    opcode, flags, width, height, tile_size, count = FRAME_HEADER.unpack_from(message)
+    assert (opcode, flags, width, height, tile_size, count) == (
+        OP_SCREEN_FRAME,
+        FLAG_KEYFRAME,
+        192,
+        128,
+        64,
+        1,
+    )
+    col, row, length = TILE_HEADER.unpack_from(message, FRAME_HEADER.size)
+    assert (col, row, length) == (2, 1, 3)
+    assert message[FRAME_HEADER.size + TILE_HEADER.size :] == b"abc"
+
+
+def test_streamer_sends_only_changed_tiles():
+    frames = [make_frame(), make_frame()]
+    frames[1][0, 0] = (255, 255, 255)
+
+    async def send(message):
+        pass
+
+    async def scenario():
+        streamer = ScreenStreamer(send, capture=lambda: frames.pop(0))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = await streamer.next_frame(executor)
+            second = await streamer.next_frame(executor)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+
+    assert struct.unpack_from(">H", first, FRAME_HEADER.size - 2)[0] == 6
+    assert first[1] & FLAG_KEYFRAME
+    assert struct.unpack_from(">H", second, FRAME_HEADER.size - 2)[0] == 1
+    assert not second[1] & FLAG_KEYFRAME
+
+
+def test_streamer_caps_frame_rate():
+    counter = {"value": 0}
+
+    def capture():
+        # Every frame differs, so the streamer should run at its cap
+        counter["value"] += 1
+        return make_frame(64, 64, counter["value"] % 256)
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        streamer = ScreenStreamer(send, capture=capture, max_fps=5)
+        task = asyncio.create_task(streamer.run())
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+
+    # 5 fps for 0.5s => about 3 frames, never the ~hundreds an uncapped loop would send
+    assert 1 <= len(sent) <= 4
@@ -0,0 +1,95 @@
+import os
+
+from server.core.metrics import metrics
+from server.core.scroll import (
+    EV_REL,
+    EV_SYN,
+    INPUT_EVENT,
+    OP_SCROLL_HIRES,
+    REL_HWHEEL_HI_RES,
+    REL_WHEEL,
+    REL_WHEEL_HI_RES,
+    SCROLL_HIRES,
+    UNITS_PER_STEP,
+    HiResScroll,
+    QuantizedWheel,
+    UinputWheel,
+)
+
+
+class FakeBackend:
+    """Records wheel steps instead of touching the desktop."""
+
+    def __init__(self):
+        self.calls = []
+
+    def scroll(self, clicks):
+        self.calls.append(("scroll", clicks))
+
+    def hscroll(self, clicks):
+        self.calls.append(("hscroll", clicks))
+
+
+def frame(units_x: int, units_y: int) -> bytes:
+    return bytes([OP_SCROLL_HIRES]) + SCROLL_HIRES.pack(units_x, units_y)
+
+
+def test_slow_scroll_carries_sub_step_motion():
+    backend = FakeBackend()
+    scroll = HiResScroll(QuantizedWheel(backend))
+
+    # A slow two-finger scroll: a quarter step per frame
+    outputs = []
+    for _ in range(16):
+        scroll.handle(frame(0, UNITS_PER_STEP // 4))
+        outputs.append(len(backend.calls))
+
+    assert backend.calls == [("scroll", 1)] * 4
+    # Steps come out evenly, one every four frames
+    assert outputs == [0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4]
+
+
+def test_fast_scroll_is_one_frame_per_batch():
+    backend = FakeBackend()
+    scroll = HiResScroll(QuantizedWheel(backend))
+
+    # Nine steps of motion in one coalesced frame instead of nine one-step packets
+    scroll.handle(frame(-UNITS_PER_STEP * 2, UNITS_PER_STEP * 9 + 30))
+
+    assert backend.calls == [("scroll", 9), ("hscroll", -2)]
+
+
+def test_direction_change_drops_remainder():
+    wheel = QuantizedWheel(FakeBackend())
+    wheel.scroll(0, 100)
+    wheel.scroll(0, -30)
+    assert wheel.rest_y == -30
+
+
+def test_malformed_frame():
+    before = metrics.malformed_frames_total
+    HiResScroll(QuantizedWheel(FakeBackend())).handle(bytes([OP_SCROLL_HIRES, 0, 1]))
+    assert metrics.malformed_frames_total == before + 1
+
+
+def test_uinput_wheel_events():
+    read_fd, write_fd = os.pipe()
+    try:
+        wheel = UinputWheel(write_fd)
+        wheel.scroll(0, 80)
+        wheel.scroll(60, 80)
+        data = os.read(read_fd, 4096)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+    events = [INPUT_EVENT.unpack_from(data, i)[2:] for i in range(0, len(data), INPUT_EVENT.size)]
+    assert events == [
+        (EV_REL, REL_WHEEL_HI_RES, 80),
+        (EV_SYN, 0, 0),
+        # 160 hi-res units in total: the first legacy notch goes out with the second frame
+        (EV_REL, REL_WHEEL_HI_RES, 80),
+        (EV_REL, REL_WHEEL, 1),
+        (EV_REL, REL_HWHEEL_HI_RES, 60),
+        (EV_SYN, 0, 0),
+    ]
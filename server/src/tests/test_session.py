@@ -0,0 +1,94 @@
+import asyncio
+
+from server.core.session import HeldInput, SessionManager
+
+
+def test_attach_issues_new_token():
+    manager = SessionManager(release_callback=lambda held: None)
+
+    first, resumed = manager.attach()
+    second, _ = manager.attach()
+
+    assert resumed is False
+    assert first.token != second.token
+    assert first.token in manager.sessions
+
+
+def test_unknown_token_starts_new_session():
+    manager = SessionManager(release_callback=lambda held: None)
+
+    session, resumed = manager.attach("does-not-exist")
+
+    assert resumed is False
+    assert session.token != "does-not-exist"
+
+
+def test_resume_within_grace_keeps_held_input():
+    released = []
+
+    async def scenario():
+        manager = SessionManager(release_callback=released.append, grace_period=0.05)
+        session, _ = manager.attach()
+        session.held.buttons.add("left")
+
+        manager.detach(session, session.generation)
+        resumed_session, resumed = manager.attach(session.token)
+        await asyncio.sleep(0.1)
+        return session, resumed_session, resumed
+
+    session, resumed_session, resumed = asyncio.run(scenario())
+
+    assert resumed is True
+    assert resumed_session is session
+    assert session.held.buttons == {"left"}
+    assert released == []
+
+
+def test_grace_expiry_releases_held_input():
+    released = []
+
+    async def scenario():
+        manager = SessionManager(release_callback=released.append, grace_period=0.01)
+        session, _ = manager.attach()
+        session.held.buttons.add("left")
+        manager.detach(session, session.generation)
+        await asyncio.sleep(0.05)
+        return manager, session
+
+    manager, session = asyncio.run(scenario())
+
+    assert released == [session.held]
+    assert session.token not in manager.sessions
+
+
+def test_stale_connection_does_not_detach_resumed_session():
+    released = []
+
+    async def scenario():
+        manager = SessionManager(release_callback=released.append, grace_period=0.01)
+        session, _ = manager.attach()
+        session.held.buttons.add("left")
+        stale_generation = session.generation
+
+        # New connection takes over before the old one notices it is dead
+        manager.attach(session.token)
+        manager.detach(session, stale_generation)
+        await asyncio.sleep(0.05)
+        return manager, session
+
+    manager, session = asyncio.run(scenario())
+
+    assert released == []
+    assert session.token in manager.sessions
+
+
+def test_expire_all_without_held_input_skips_release():
+    released = []
+    manager = SessionManager(release_callback=released.append)
+    manager.attach()
+
+    manager.expire_all()
+
+    assert released == []
+    assert manager.sessions == {}
+    assert not HeldInput()
@@ -1,5 +1,10 @@
+import threading
+import time
+
 import pytest
 from unittest.mock import MagicMock
+from server.config import APP_NAME, TRAY_RENDER_DEBOUNCE
+from server.core.events import TOPIC_ADDRESS, TOPIC_SESSIONS, EventBus
 from server.ui.tray_icon import TrayIcon
 
 
@@ -127,3 +132,112 @@ def test_run_constructs_ui_correctly(mock_tray_deps):
     # 3. Verify Icon creation and running
     mock_deps["pystray"].Icon.assert_called_once()
     mock_deps["icon_instance"].run.assert_called_once()
+
+
+def test_on_pair_shows_code():
+    tray = TrayIcon(
+        port=8000,
+        ip_address="127.0.0.1",
+        on_exit_callback=lambda: None,
+        restart_callback=lambda: None,
+        on_log_toggle_callback=lambda _: None,
+        on_pair_callback=lambda: "123456",
+    )
+    mock_icon = MagicMock()
+    assert tray._pair_label() == "Pair Device"
+
+    tray._on_pair(mock_icon, None)
+
+    assert tray._pair_label() == "Pairing Code: 123456"
+    mock_icon.update_menu.assert_called_once()
+    mock_icon.notify.assert_called_once()
+
+
+class FakeIcon:
+    """Counts redraws instead of talking to the desktop."""
+
+    def __init__(self):
+        self.title = APP_NAME
+        self.titles = []
+        self.images = 0
+        self.menu_updates = 0
+
+    def __setattr__(self, name, value):
+        if name == "title" and hasattr(self, "titles"):
+            self.titles.append(value)
+        if name == "icon":
+            self.images += 1
+        super().__setattr__(name, value)
+
+    def update_menu(self):
+        self.menu_updates += 1
+
+
+def make_tray(bus: EventBus):
+    tray = TrayIcon(
+        port=8000,
+        ip_address="127.0.0.1",
+        on_exit_callback=lambda: None,
+        restart_callback=lambda: None,
+        on_log_toggle_callback=lambda _: None,
+        event_bus=bus,
+    )
+    tray.icon = FakeIcon()
+    return tray
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_renderer_has_no_idle_wakeups(mock_tray_deps):
+    bus = EventBus()
+    tray = make_tray(bus)
+    tray.start_renderer()
+    try:
+        # The initial draw needs no wakeup, and nothing after it changes
+        time.sleep(TRAY_RENDER_DEBOUNCE + 0.5)
+        assert tray.wakeups == 0
+
+        bus.publish(TOPIC_SESSIONS, 1)
+        wait_until(lambda: tray.icon.titles == [f"{APP_NAME} (1 connected)"])
+        assert tray.wakeups == 1
+    finally:
+        tray.stop_renderer()
+
+
+def test_renderer_debounces_bursts(mock_tray_deps):
+    bus = EventBus()
+    tray = make_tray(bus)
+    tray.start_renderer()
+    try:
+        time.sleep(TRAY_RENDER_DEBOUNCE + 0.1)
+        for sessions in range(1, 6):
+            bus.publish(TOPIC_SESSIONS, sessions)
+        bus.publish(TOPIC_ADDRESS, "10.0.0.7")
+        wait_until(lambda: tray.icon.menu_updates == 1)
+        time.sleep(TRAY_RENDER_DEBOUNCE)
+
+        assert tray.icon.titles == [f"{APP_NAME} (5 connected)"]
+        assert tray.ip_address == "10.0.0.7"
+    finally:
+        tray.stop_renderer()
+
+
+def test_show_rate_toggles_share_one_renderer(mock_tray_deps):
+    tray = make_tray(EventBus())
+    tray.start_renderer()
+    try:
+        for _ in range(5):
+            tray.set_show_rate(True)
+            tray.set_show_rate(False)
+        tray.start_renderer()
+
+        renderers = [t for t in threading.enumerate() if t.name == "tray-render"]
+        assert renderers == [tray._render_thread]
+    finally:
+        tray.stop_renderer()
+    assert not any(t.name == "tray-render" for t in threading.enumerate())
@@ -13,3 +13,68 @@ def test_websocket_endpoint_connect(client):
     with client.websocket_connect("/ws") as websocket:
         # Just test connection establishment
         assert websocket
+
+
+def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/openmetrics-text")
+    assert response.text.endswith("# EOF\n")
+
+
+def test_websocket_issues_and_resumes_session(client):
+    with client.websocket_connect("/ws") as websocket:
+        hello = websocket.receive_json()
+        assert hello["type"] == "session"
+        assert hello["resumed"] is False
+        token = hello["token"]
+
+    with client.websocket_connect(f"/ws?session={token}") as websocket:
+        hello = websocket.receive_json()
+        assert hello["token"] == token
+        assert hello["resumed"] is True
+
+
+def test_websocket_echoes_ping(client):
+    with client.websocket_connect("/ws") as websocket:
+        websocket.receive_json()
+        websocket.send_bytes(b"\x07\x2a")
+        assert websocket.receive_bytes() == b"\x07\x2a"
+
+
+def test_tray_rate_toggle_is_published(client):
+    from server.core.events import TOPIC_SHOW_RATE, bus
+
+    response = client.post("/api/settings/tray/rate", params={"enabled": True})
+    assert response.status_code == 200
+    assert bus.latest(TOPIC_SHOW_RATE) is True
+
+
+def test_malformed_frames_are_not_counted_as_processed(client):
+    from server.core.metrics import metrics
+
+    frames_before = metrics.frames_total[0x02]
+    malformed_before = metrics.malformed_frames_total
+    with client.websocket_connect("/ws") as websocket:
+        websocket.receive_json()
+        # A click frame without its button byte, then a ping to wait for the server
+        websocket.send_bytes(bytes([0x02]))
+        websocket.send_bytes(bytes([0x07]))
+        websocket.receive_bytes()
+    assert metrics.malformed_frames_total == malformed_before + 1
+    assert metrics.frames_total[0x02] == frames_before
+
+
+def test_cors_only_on_cross_origin_routes(client):
+    preflight = {
+        "Origin": "http://192.168.1.20:8000",
+        "Access-Control-Request-Method": "POST",
+        "Access-Control-Request-Headers": "Content-Type",
+    }
+    assert client.options("/api/pairing", headers=preflight).status_code == 200
+    response = client.get("/api/monitors", headers={"Origin": preflight["Origin"]})
+    assert response.headers["access-control-allow-origin"] == "*"
+
+    for path in ("/api/peers", "/api/debug/threads", "/metrics"):
+        response = client.get(path, headers={"Origin": preflight["Origin"]})
+        assert "access-control-allow-origin" not in response.headers
@@ -0,0 +1,46 @@
+import { ABS_SCALE, ALL_MONITORS, OP_MOVE_ABS } from './protocol';
+
+const clampUnit = (value: number) => Math.max(0, Math.min(1, value));
+
+/**
+ * Tablet mode: the touchpad stands for a monitor, and a touch puts the pointer on the
+ * matching spot. Only the latest position matters, so at most one OP_MOVE_ABS frame
+ * goes out per animation frame.
+ */
+export class AbsolutePointer {
+    public monitor = ALL_MONITORS;
+    private send: (data: ArrayBuffer) => void;
+    private schedule: (callback: () => void) => void;
+    private pending: [number, number] | null = null;
+
+    constructor(
+        send: (data: ArrayBuffer) => void,
+        schedule: (callback: () => void) => void = (callback) => requestAnimationFrame(() => callback())
+    ) {
+        this.send = send;
+        this.schedule = schedule;
+    }
+
+    // (x, y) from 0 to 1 across the touchpad
+    public moveTo(x: number, y: number) {
+        if (this.pending === null) {
+            this.schedule(() => this.flush());
+        }
+        this.pending = [clampUnit(x), clampUnit(y)];
+    }
+
+    public flush() {
+        if (this.pending === null) return;
+        const [x, y] = this.pending;
+        this.pending = null;
+
+        // [OpCode] [Monitor u8] [x u16] [y u16]
+        const buffer = new ArrayBuffer(6);
+        const view = new DataView(buffer);
+        view.setUint8(0, OP_MOVE_ABS);
+        view.setUint8(1, this.monitor);
+        view.setUint16(2, Math.round(x * ABS_SCALE), false);
+        view.setUint16(4, Math.round(y * ABS_SCALE), false);
+        this.send(buffer);
+    }
+}
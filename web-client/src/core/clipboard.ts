@@ -0,0 +1,232 @@
+import { OP_CLIPBOARD } from './protocol';
+
+// [OpCode] [Kind] ...
+const KIND_SUBSCRIBE = 0x00; // [Enabled u8]
+const KIND_BEGIN = 0x01;     // [Transfer u32] [Size u32] [CRC32 u32]
+const KIND_CHUNK = 0x02;     // [Transfer u32] [Seq u32] [Payload]
+const KIND_ACK = 0x03;       // [Transfer u32] [Seq u32]
+const KIND_ABORT = 0x04;     // [Transfer u32]
+
+const BEGIN_SIZE = 14;
+const CHUNK_HEADER_SIZE = 10;
+
+const MAX_BYTES = 8 * 1024 * 1024;
+const CHUNK_SIZE = 32 * 1024;
+const WINDOW = 4;
+const ACK_TIMEOUT = 5000;
+
+const CRC_TABLE = (() => {
+    const table = new Uint32Array(256);
+    for (let n = 0; n < 256; n++) {
+        let c = n;
+        for (let k = 0; k < 8; k++) {
+            c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+        }
+        table[n] = c >>> 0;
+    }
+    return table;
+})();
+
+// Same checksum as Python's zlib.crc32, incremental via `crc`
+export function crc32(data: Uint8Array, crc = 0): number {
+    crc = crc ^ 0xFFFFFFFF;
+    for (let i = 0; i < data.length; i++) {
+        crc = CRC_TABLE[(crc ^ data[i]) & 0xFF] ^ (crc >>> 8);
+    }
+    return (crc ^ 0xFFFFFFFF) >>> 0;
+}
+
+interface ClipboardCallbacks {
+    onRemoteText: (text: string) => void;
+}
+
+interface IncomingTransfer {
+    id: number;
+    size: number;
+    crc: number;
+    buffer: Uint8Array;
+    received: number;
+    nextSeq: number;
+    runningCrc: number;
+}
+
+/**
+ * Chunked clipboard sync over the main socket.
+ * Mirrors server.core.clipboard: content is announced with (size, crc32), sent in
+ * sequence-numbered chunks with at most WINDOW unacknowledged, and never resent when
+ * it matches the last synced digest.
+ */
+export class ClipboardSync {
+    private send: (data: Uint8Array) => void;
+    private callbacks: ClipboardCallbacks;
+    private encoder = new TextEncoder();
+    private decoder = new TextDecoder();
+
+    private lastDigest: string | null = null;
+    private incoming: IncomingTransfer | null = null;
+    private nextTransferId = 1;
+    private outgoingId: number | null = null;
+    private acked = -1;
+    private ackWaiter: (() => void) | null = null;
+
+    constructor(send: (data: Uint8Array) => void, callbacks: ClipboardCallbacks) {
+        this.send = send;
+        this.callbacks = callbacks;
+    }
+
+    public setEnabled(enabled: boolean) {
+        this.send(new Uint8Array([OP_CLIPBOARD, KIND_SUBSCRIBE, enabled ? 1 : 0]));
+    }
+
+    public handle(buffer: ArrayBuffer) {
+        if (buffer.byteLength < 2) return;
+        const view = new DataView(buffer);
+        const kind = view.getUint8(1);
+
+        if (kind === KIND_BEGIN && buffer.byteLength >= BEGIN_SIZE) {
+            const id = view.getUint32(2, false);
+            const size = view.getUint32(6, false);
+            const crc = view.getUint32(10, false);
+            if (size > MAX_BYTES || this.digest(size, crc) === this.lastDigest) {
+                this.incoming = null;
+                this.sendAbort(id);
+                return;
+            }
+            this.incoming = {
+                id, size, crc,
+                buffer: new Uint8Array(size),
+                received: 0,
+                nextSeq: 0,
+                runningCrc: 0
+            };
+            if (size === 0) this.finishIncoming();
+        } else if (kind === KIND_CHUNK && buffer.byteLength >= CHUNK_HEADER_SIZE) {
+            const id = view.getUint32(2, false);
+            const seq = view.getUint32(6, false);
+            const transfer = this.incoming;
+            if (!transfer || transfer.id !== id) return;
+
+            const payload = new Uint8Array(buffer, CHUNK_HEADER_SIZE);
+            if (seq !== transfer.nextSeq || transfer.received + payload.length > transfer.size) {
+                this.incoming = null;
+                this.sendAbort(id);
+                return;
+            }
+            transfer.buffer.set(payload, transfer.received);
+            transfer.received += payload.length;
+            transfer.runningCrc = crc32(payload, transfer.runningCrc);
+            transfer.nextSeq++;
+            this.sendAck(id, seq);
+
+            if (transfer.received === transfer.size) this.finishIncoming();
+        } else if (kind === KIND_ACK && buffer.byteLength >= CHUNK_HEADER_SIZE) {
+            const id = view.getUint32(2, false);
+            if (id === this.outgoingId) {
+                this.acked = Math.max(this.acked, view.getUint32(6, false));
+                this.wakeSender();
+            }
+        } else if (kind === KIND_ABORT && buffer.byteLength >= 6) {
+            const id = view.getUint32(2, false);
+            if (id === this.outgoingId) {
+                this.outgoingId = null;
+                this.wakeSender();
+            }
+            if (this.incoming && this.incoming.id === id) {
+                this.incoming = null;
+            }
+        }
+    }
+
+    public async push(text: string): Promise<boolean> {
+        const data = this.encoder.encode(text);
+        const crc = crc32(data);
+        const digest = this.digest(data.length, crc);
+        if (digest === this.lastDigest) return true;
+        if (data.length > MAX_BYTES) return false;
+
+        const id = this.nextTransferId;
+        this.nextTransferId = (this.nextTransferId + 1) >>> 0 || 1;
+        this.outgoingId = id;
+        this.acked = -1;
+        this.lastDigest = digest;
+
+        const begin = new DataView(new ArrayBuffer(BEGIN_SIZE));
+        begin.setUint8(0, OP_CLIPBOARD);
+        begin.setUint8(1, KIND_BEGIN);
+        begin.setUint32(2, id, false);
+        begin.setUint32(6, data.length, false);
+        begin.setUint32(10, crc, false);
+        this.send(new Uint8Array(begin.buffer));
+
+        for (let seq = 0, offset = 0; offset < data.length; seq++, offset += CHUNK_SIZE) {
+            // Backpressure: never more than WINDOW chunks in flight
+            while (this.outgoingId === id && seq - this.acked > WINDOW) {
+                if (!(await this.waitForAck())) this.outgoingId = null;
+            }
+            if (this.outgoingId !== id) {
+                this.lastDigest = null;
+                return false;
+            }
+
+            const payload = data.subarray(offset, offset + CHUNK_SIZE);
+            const frame = new Uint8Array(CHUNK_HEADER_SIZE + payload.length);
+            const view = new DataView(frame.buffer);
+            view.setUint8(0, OP_CLIPBOARD);
+            view.setUint8(1, KIND_CHUNK);
+            view.setUint32(2, id, false);
+            view.setUint32(6, seq, false);
+            frame.set(payload, CHUNK_HEADER_SIZE);
+            this.send(frame);
+        }
+        return true;
+    }
+
+    private finishIncoming() {
+        const transfer = this.incoming;
+        this.incoming = null;
+        if (!transfer || transfer.runningCrc !== transfer.crc) return;
+
+        this.lastDigest = this.digest(transfer.size, transfer.crc);
+        this.callbacks.onRemoteText(this.decoder.decode(transfer.buffer));
+    }
+
+    private waitForAck(): Promise<boolean> {
+        return new Promise(resolve => {
+            const timer = setTimeout(() => {
+                this.ackWaiter = null;
+                resolve(false);
+            }, ACK_TIMEOUT);
+            this.ackWaiter = () => {
+                clearTimeout(timer);
+                resolve(true);
+            };
+        });
+    }
+
+    private wakeSender() {
+        const waiter = this.ackWaiter;
+        this.ackWaiter = null;
+        if (waiter) waiter();
+    }
+
+    private sendAck(id: number, seq: number) {
+        const view = new DataView(new ArrayBuffer(CHUNK_HEADER_SIZE));
+        view.setUint8(0, OP_CLIPBOARD);
+        view.setUint8(1, KIND_ACK);
+        view.setUint32(2, id, false);
+        view.setUint32(6, seq, false);
+        this.send(new Uint8Array(view.buffer));
+    }
+
+    private sendAbort(id: number) {
+        const view = new DataView(new ArrayBuffer(6));
+        view.setUint8(0, OP_CLIPBOARD);
+        view.setUint8(1, KIND_ABORT);
+        view.setUint32(2, id, false);
+        this.send(new Uint8Array(view.buffer));
+    }
+
+    private digest(size: number, crc: number) {
+        return `${size}:${crc}`;
+    }
+}
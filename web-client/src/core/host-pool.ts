@@ -0,0 +1,126 @@
+import { ConnectionStatus } from './protocol';
+import type { TransportOptions } from './transport';
+import { SocketWorker, type WorkerTransport } from './worker-transport';
+
+// Sockets kept open to recently used desktops, the active one included
+const MAX_WARM_HOSTS = 3;
+const RECENT_HOSTS_KEY = 'remote-mouse-recent-hosts';
+
+interface HostPoolCallbacks {
+    // State and messages of the active host only
+    onStateChange: (state: ConnectionStatus, statusText: string) => void;
+    onMessage: (data: ArrayBuffer) => void;
+    onUnauthorized: (host: string) => void;
+}
+
+export function socketUrl(host: string): string {
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    return `${protocol}//${host}/ws`;
+}
+
+export function loadRecentHosts(): string[] {
+    try {
+        const saved = JSON.parse(localStorage.getItem(RECENT_HOSTS_KEY) ?? '[]');
+        return Array.isArray(saved) ? saved.filter(host => typeof host === 'string') : [];
+    } catch (e) {
+        return [];
+    }
+}
+
+/**
+ * One authenticated input socket per recently used desktop. Inactive sockets stay
+ * connected with their heartbeat running, so switching desktops only changes which
+ * socket frames go to: no page load, no handshake. Once more than MAX_WARM_HOSTS are
+ * open, the least recently used socket is closed.
+ */
+export class HostPool {
+    private callbacks: HostPoolCallbacks;
+    private createTransport: (options: TransportOptions) => WorkerTransport;
+    // Least recently used first
+    private transports = new Map<string, WorkerTransport>();
+    private activeHost: string | null = null;
+
+    constructor(
+        callbacks: HostPoolCallbacks,
+        createTransport?: (options: TransportOptions) => WorkerTransport
+    ) {
+        this.callbacks = callbacks;
+        if (!createTransport) {
+            // Every socket lives in the one transport worker
+            const sockets = new SocketWorker();
+            createTransport = (options) => sockets.create(options);
+        }
+        this.createTransport = createTransport;
+    }
+
+    public get host(): string | null {
+        return this.activeHost;
+    }
+
+    public activate(host: string): WorkerTransport {
+        const transport = this.transports.get(host) ?? this.open(host);
+        this.transports.delete(host);
+        this.transports.set(host, transport);
+        this.activeHost = host;
+        this.evict();
+        this.saveRecent();
+
+        const [state, text] = transport.getState();
+        this.callbacks.onStateChange(state, text);
+        return transport;
+    }
+
+    // Open sockets to `hosts` in the background without switching to them
+    public prewarm(hosts: string[]) {
+        for (const host of hosts) {
+            if (this.transports.size >= MAX_WARM_HOSTS) break;
+            if (!this.transports.has(host)) {
+                this.transports = new Map([[host, this.open(host)], ...this.transports]);
+            }
+        }
+    }
+
+    public get(host: string): WorkerTransport | undefined {
+        return this.transports.get(host);
+    }
+
+    public reconnect(host: string) {
+        this.transports.get(host)?.connect(socketUrl(host));
+    }
+
+    private open(host: string): WorkerTransport {
+        const transport = this.createTransport({
+            onStateChange: (state, text) => {
+                if (host === this.activeHost) this.callbacks.onStateChange(state, text);
+            },
+            onMessage: (data) => {
+                if (host === this.activeHost) this.callbacks.onMessage(data);
+            },
+            onUnauthorized: () => {
+                if (host === this.activeHost) {
+                    this.callbacks.onUnauthorized(host);
+                } else {
+                    // Not worth a warm socket until the user pairs with it
+                    this.transports.delete(host);
+                }
+            }
+        });
+        transport.connect(socketUrl(host));
+        return transport;
+    }
+
+    private evict() {
+        for (const [host, transport] of this.transports) {
+            if (this.transports.size <= MAX_WARM_HOSTS) break;
+            // The page's own desktop also serves uploads and the preview, so it stays
+            if (host === this.activeHost || host === window.location.host) continue;
+            transport.disconnect();
+            this.transports.delete(host);
+        }
+    }
+
+    private saveRecent() {
+        const recent = [...this.transports.keys()].reverse();
+        localStorage.setItem(RECENT_HOSTS_KEY, JSON.stringify(recent));
+    }
+}
@@ -0,0 +1,70 @@
+// One motion sample: [dx f64] [dy f64], in screen pixels after sensitivity
+export const SAMPLE_FIELDS = 2;
+// Samples per slab; far more than a display frame ever holds, a full slab is sent early
+export const SLAB_SAMPLES = 256;
+// Slabs kept for reuse once the worker hands them back
+const MAX_FREE_SLABS = 4;
+
+/**
+ * Pointer samples on their way to the transport worker. The UI thread only writes two
+ * numbers per sample into the current slab; once per animation frame the slab is
+ * transferred (not copied) to the worker, which encodes it and transfers it back.
+ * Slabs go round between the two threads, so steady motion allocates nothing.
+ *
+ * A SharedArrayBuffer would avoid the hand-over, but needs a cross-origin isolated
+ * page, which a desktop serving plain http on the LAN can't offer.
+ */
+export class InputRing {
+    private flushSlab: (slab: ArrayBuffer, count: number) => void;
+    private schedule: (callback: () => void) => void;
+    private free: ArrayBuffer[] = [];
+    private samples: Float64Array | null = null;
+    private count = 0;
+    private scheduled = false;
+
+    constructor(
+        flush: (slab: ArrayBuffer, count: number) => void,
+        schedule: (callback: () => void) => void = (callback) => requestAnimationFrame(() => callback())
+    ) {
+        this.flushSlab = flush;
+        this.schedule = schedule;
+    }
+
+    public push(dx: number, dy: number) {
+        if (this.samples === null) {
+            const slab = this.free.pop() ?? new ArrayBuffer(SLAB_SAMPLES * SAMPLE_FIELDS * 8);
+            this.samples = new Float64Array(slab);
+        }
+        const offset = this.count * SAMPLE_FIELDS;
+        this.samples[offset] = dx;
+        this.samples[offset + 1] = dy;
+        this.count++;
+
+        if (this.count === SLAB_SAMPLES) {
+            this.flush();
+        } else if (!this.scheduled) {
+            this.scheduled = true;
+            this.schedule(() => {
+                this.scheduled = false;
+                this.flush();
+            });
+        }
+    }
+
+    // Hand the samples written so far to the worker
+    public flush() {
+        if (this.samples === null || this.count === 0) return;
+        const slab = this.samples.buffer as ArrayBuffer;
+        const count = this.count;
+        this.samples = null;
+        this.count = 0;
+        this.flushSlab(slab, count);
+    }
+
+    // A slab the worker has finished with
+    public recycle(slab: ArrayBuffer) {
+        if (this.free.length < MAX_FREE_SLABS && slab.byteLength === SLAB_SAMPLES * SAMPLE_FIELDS * 8) {
+            this.free.push(slab);
+        }
+    }
+}
@@ -0,0 +1,120 @@
+import { MacroCommand, OP_MACRO } from './protocol';
+
+// Steps as the server stores them (server.core.macro.parse_step)
+export type MacroStep =
+    | { key: string; modifiers?: string[] }
+    | { text: string }
+    | { click: 'left' | 'right' | 'middle'; count?: number }
+    | { delay: number };
+
+export interface Macro {
+    name: string;
+    steps: MacroStep[];
+}
+
+const CLICK_BUTTONS = ['left', 'right', 'middle'];
+
+export function encodeMacroCommand(command: number, name = ''): ArrayBuffer {
+    const nameBytes = new TextEncoder().encode(name);
+    const buffer = new Uint8Array(2 + nameBytes.length);
+    buffer[0] = OP_MACRO;
+    buffer[1] = command;
+    buffer.set(nameBytes, 2);
+    return buffer.buffer;
+}
+
+export const playMacro = (name: string) => encodeMacroCommand(MacroCommand.Play, name);
+export const cancelMacro = () => encodeMacroCommand(MacroCommand.Cancel);
+
+/**
+ * Macros are edited as one step per line, which is easier to type on a phone than JSON:
+ *
+ *     text Best regards,
+ *     key enter
+ *     key ctrl+shift+t
+ *     click left 2
+ *     wait 250
+ *
+ * `wait` is in milliseconds. Throws with the offending line number on anything else.
+ */
+export function parseMacroScript(script: string): MacroStep[] {
+    const steps: MacroStep[] = [];
+    script.split('\n').forEach((raw, index) => {
+        const line = raw.replace(/\r$/, '');
+        if (!line.trim()) return;
+        const space = line.indexOf(' ');
+        const verb = (space < 0 ? line : line.slice(0, space)).toLowerCase();
+        const rest = space < 0 ? '' : line.slice(space + 1);
+        const args = rest.trim().split(/\s+/).filter(Boolean);
+
+        if (verb === 'text' && rest) {
+            steps.push({ text: rest });
+        } else if (verb === 'key' && args.length === 1) {
+            const keys = args[0].toLowerCase().split('+').filter(Boolean);
+            const key = keys.pop();
+            if (key) steps.push(keys.length ? { key, modifiers: keys } : { key });
+            else throw new Error(`Line ${index + 1}: ${line}`);
+        } else if (verb === 'click' && args.length <= 2) {
+            const button = (args[0] ?? 'left').toLowerCase();
+            const count = args.length === 2 ? Number(args[1]) : 1;
+            if (!CLICK_BUTTONS.includes(button) || !Number.isInteger(count) || count < 1) {
+                throw new Error(`Line ${index + 1}: ${line}`);
+            }
+            const click = button as 'left' | 'right' | 'middle';
+            steps.push(count === 1 ? { click } : { click, count });
+        } else if (verb === 'wait' && args.length === 1 && Number(args[0]) >= 0) {
+            steps.push({ delay: Number(args[0]) / 1000 });
+        } else {
+            throw new Error(`Line ${index + 1}: ${line}`);
+        }
+    });
+    return steps;
+}
+
+export function formatMacroScript(steps: MacroStep[]): string {
+    return steps.map(step => {
+        if ('text' in step) return `text ${step.text}`;
+        if ('key' in step) return `key ${[...(step.modifiers ?? []), step.key].join('+')}`;
+        if ('click' in step) return step.count ? `click ${step.click} ${step.count}` : `click ${step.click}`;
+        return `wait ${Math.round(step.delay * 1000)}`;
+    }).join('\n');
+}
+
+/** The macro API of one desktop; management needs the session of its input socket. */
+export class MacroClient {
+    private base: string;
+    private token: string | null;
+
+    constructor(host: string = window.location.host, token: string | null = null) {
+        this.base = host === window.location.host ? '' : `${window.location.protocol}//${host}`;
+        this.token = token;
+    }
+
+    public async list(): Promise<Macro[]> {
+        const body = await this.request('GET', '');
+        return Array.isArray(body.macros) ? body.macros : [];
+    }
+
+    public async save(name: string, steps: MacroStep[]): Promise<Macro> {
+        return this.request('PUT', name, { steps });
+    }
+
+    public async remove(name: string): Promise<void> {
+        await this.request('DELETE', name);
+    }
+
+    private async request(method: string, name: string, body?: unknown) {
+        const headers = new Headers();
+        if (this.token) headers.set('X-Session-Token', this.token);
+        if (body !== undefined) headers.set('Content-Type', 'application/json');
+        const url = `${this.base}/api/macros${name ? `/${encodeURIComponent(name)}` : ''}`;
+        const response = await fetch(url, {
+            method,
+            headers,
+            body: body === undefined ? undefined : JSON.stringify(body)
+        });
+        const result = await response.json();
+        if (!response.ok) throw new Error(result.detail ?? `Macro request failed with ${response.status}`);
+        return result;
+    }
+}
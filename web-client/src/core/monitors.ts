@@ -0,0 +1,17 @@
+// Monitors of a desktop as the server numbers them (server.core.monitors.DisplayLayout)
+export interface MonitorInfo {
+    index: number;
+    x: number;
+    y: number;
+    width: number;
+    height: number;
+    primary: boolean;
+}
+
+export async function fetchMonitors(host: string = window.location.host): Promise<MonitorInfo[]> {
+    const base = host === window.location.host ? '' : `${window.location.protocol}//${host}`;
+    const response = await fetch(`${base}/api/monitors`);
+    if (!response.ok) return [];
+    const body = await response.json();
+    return Array.isArray(body.monitors) ? body.monitors : [];
+}
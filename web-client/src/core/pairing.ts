@@ -0,0 +1,78 @@
+import { hmacSha256, fromHex, toHex } from './hmac';
+
+// Close code the server uses when the handshake fails (see server.core.pairing)
+export const WS_CLOSE_UNAUTHORIZED = 4401;
+
+// Credentials per host ("address:port"): each desktop pairs the phone separately
+const STORAGE_KEY = 'remote-mouse-devices';
+// Before hosts were paired separately: one entry, for the host that served the page
+const LEGACY_STORAGE_KEY = 'remote-mouse-device';
+
+export interface DeviceCredentials {
+    device: string;
+    key: string;
+}
+
+function migrateLegacy(): void {
+    const legacy = localStorage.getItem(LEGACY_STORAGE_KEY);
+    if (legacy === null) return;
+    localStorage.removeItem(LEGACY_STORAGE_KEY);
+    if (localStorage.getItem(STORAGE_KEY) !== null) return;
+    try {
+        const saved = JSON.parse(legacy);
+        if (saved && typeof saved === 'object') {
+            localStorage.setItem(STORAGE_KEY, JSON.stringify({ [window.location.host]: saved }));
+        }
+    } catch (e) {
+        console.error('Invalid saved pairing', e);
+    }
+}
+
+function loadAll(): Record<string, DeviceCredentials> {
+    migrateLegacy();
+    try {
+        const saved = JSON.parse(localStorage.getItem(STORAGE_KEY) ?? '{}');
+        if (saved && typeof saved === 'object') return saved;
+    } catch (e) {
+        console.error('Invalid saved pairing', e);
+    }
+    return {};
+}
+
+export function loadCredentials(host: string = window.location.host): DeviceCredentials | null {
+    const saved = loadAll()[host];
+    if (saved && typeof saved.device === 'string' && typeof saved.key === 'string') {
+        return saved;
+    }
+    return null;
+}
+
+/**
+ * Answer to the server's one-time challenge. Without credentials the reply is still
+ * sent so the server closes the socket right away instead of timing out.
+ */
+export function authReply(
+    nonce: string,
+    host: string = window.location.host,
+    credentials: DeviceCredentials | null = loadCredentials(host)
+): string {
+    const mac = credentials
+        ? toHex(hmacSha256(fromHex(credentials.key), new TextEncoder().encode(nonce)))
+        : '';
+    return JSON.stringify({ type: 'auth', device: credentials?.device ?? '', mac });
+}
+
+// Redeem the code shown in the desktop tray for a long-lived device key
+export async function pairDevice(code: string, name: string, host: string = window.location.host): Promise<boolean> {
+    const base = host === window.location.host ? '' : `${window.location.protocol}//${host}`;
+    const response = await fetch(`${base}/api/pairing`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ code, name })
+    });
+    if (!response.ok) return false;
+
+    const credentials: DeviceCredentials = await response.json();
+    localStorage.setItem(STORAGE_KEY, JSON.stringify({ ...loadAll(), [host]: credentials }));
+    return true;
+}
@@ -0,0 +1,20 @@
+// Other desktops the server found over mDNS (server.services.mdns.PeerCache)
+export interface Peer {
+    name: string;
+    host: string;
+    addresses: string[];
+    port: number;
+    last_seen: number;
+}
+
+export async function fetchPeers(): Promise<Peer[]> {
+    const response = await fetch('/api/peers');
+    if (!response.ok) return [];
+    const body = await response.json();
+    return Array.isArray(body.peers) ? body.peers : [];
+}
+
+// "address:port" to reach a peer from the phone, which may not resolve .local names
+export function peerHost(peer: Peer): string | null {
+    return peer.addresses.length ? `${peer.addresses[0]}:${peer.port}` : null;
+}
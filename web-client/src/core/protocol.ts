@@ -4,6 +4,46 @@ export const OP_SCROLL = 0x03;
 export const OP_DRAG = 0x04;
 export const OP_TEXT = 0x05;
 export const OP_KEY_ACTION = 0x06;
+export const OP_PING = 0x07;
+export const OP_SCREEN_FRAME = 0x08;
+export const OP_CLIPBOARD = 0x09;
+export const OP_GESTURE = 0x0A;
+export const OP_SCROLL_HIRES = 0x0B;
+export const OP_MOVE_ABS = 0x0C;
+export const OP_MACRO = 0x0D;
+
+// [OpCode] [Kind] [Phase] [Fingers] [Magnitude i32]
+export const GestureKind = {
+    Pinch: 0x00, // Magnitude: scale since Begin, in thousandths
+    SwipeLeft: 0x01, // Swipes, magnitude: distance since Begin, in CSS pixels
+    SwipeRight: 0x02,
+    SwipeUp: 0x03,
+    SwipeDown: 0x04,
+} as const;
+
+export const GesturePhase = {
+    Begin: 0x00,
+    Update: 0x01,
+    End: 0x02,
+    Cancel: 0x03,
+} as const;
+
+export const PINCH_SCALE = 1000;
+
+// OP_SCROLL_HIRES carries scroll motion in 1/120 of an OP_SCROLL step
+export const SCROLL_UNITS_PER_STEP = 120;
+
+// OP_MOVE_ABS (tablet mode): [OpCode] [Monitor u8] [x u16] [y u16], x and y spanning the
+// monitor from 0 to ABS_SCALE
+export const ABS_SCALE = 0xFFFF;
+// Monitor number meaning the whole desktop; monitors themselves are numbered from 1
+export const ALL_MONITORS = 0;
+
+// OP_MACRO: [OpCode] [Command] [Name: UTF8]; macros themselves are stored on the desktop
+export const MacroCommand = {
+    Play: 0x00,
+    Cancel: 0x01, // Stops the running macro and drops queued ones
+} as const;
 
 export const ConnectionStatus = {
     Connected: 'connected',
@@ -0,0 +1,60 @@
+import { OP_SCROLL_HIRES, SCROLL_UNITS_PER_STEP } from './protocol';
+
+const INT16_MAX = 0x7FFF;
+
+const clampInt16 = (value: number) => Math.max(-INT16_MAX, Math.min(INT16_MAX, value));
+
+/**
+ * Collects precise scroll deltas and sends them as at most one OP_SCROLL_HIRES frame per
+ * animation frame. Deltas are in OP_SCROLL steps and go out in 1/SCROLL_UNITS_PER_STEP
+ * units; only what doesn't fit a whole unit waits for the next frame, so slow scrolls
+ * are no longer rounded away and fast ones no longer flood the socket.
+ */
+export class ScrollCoalescer {
+    private send: (data: ArrayBuffer) => void;
+    private schedule: (callback: () => void) => void;
+    private pendingX = 0;
+    private pendingY = 0;
+    private scheduled = false;
+
+    constructor(
+        send: (data: ArrayBuffer) => void,
+        schedule: (callback: () => void) => void = (callback) => requestAnimationFrame(() => callback())
+    ) {
+        this.send = send;
+        this.schedule = schedule;
+    }
+
+    public add(sx: number, sy: number) {
+        this.pendingX += sx * SCROLL_UNITS_PER_STEP;
+        this.pendingY += sy * SCROLL_UNITS_PER_STEP;
+        if (!this.scheduled) {
+            this.scheduled = true;
+            this.schedule(() => this.flush());
+        }
+    }
+
+    public flush() {
+        this.scheduled = false;
+        const unitsX = clampInt16(Math.trunc(this.pendingX));
+        const unitsY = clampInt16(Math.trunc(this.pendingY));
+        if (unitsX === 0 && unitsY === 0) return;
+
+        this.pendingX -= unitsX;
+        this.pendingY -= unitsY;
+
+        // [OpCode] [sx i16] [sy i16]
+        const buffer = new ArrayBuffer(5);
+        const view = new DataView(buffer);
+        view.setUint8(0, OP_SCROLL_HIRES);
+        view.setInt16(1, unitsX, false);
+        view.setInt16(3, unitsY, false);
+        this.send(buffer);
+
+        // A flick too fast for one frame continues in the next
+        if (Math.abs(this.pendingX) >= 1 || Math.abs(this.pendingY) >= 1) {
+            this.scheduled = true;
+            this.schedule(() => this.flush());
+        }
+    }
+}
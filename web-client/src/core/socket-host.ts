@@ -0,0 +1,113 @@
+import { ConnectionStatus, OP_MOVE } from './protocol';
+import { SAMPLE_FIELDS } from './input-ring';
+import { Transport } from './transport';
+import type { DeviceCredentials } from './pairing';
+
+// Messages from the UI thread to the transport worker
+export type SocketCommand =
+    | { type: 'connect'; id: number; url: string; credentials: DeviceCredentials | null }
+    | { type: 'disconnect'; id: number }
+    | { type: 'send'; id: number; data: ArrayBuffer | Uint8Array }
+    | { type: 'motion'; id: number; slab: ArrayBuffer; count: number }
+    | { type: 'metrics'; id: number };
+
+// Messages from the transport worker back to the UI thread
+export type SocketEvent =
+    | { type: 'state'; id: number; state: ConnectionStatus; text: string }
+    | { type: 'message'; id: number; data: ArrayBuffer }
+    | { type: 'unauthorized'; id: number }
+    | { type: 'session'; id: number; token: string }
+    | { type: 'metrics'; id: number; packetsSent: number; bytesSent: number }
+    | { type: 'slab'; id: number; slab: ArrayBuffer };
+
+const INT16_MAX = 0x7FFF;
+
+const clampInt16 = (value: number) => Math.max(-INT16_MAX, Math.min(INT16_MAX, value));
+
+interface Socket {
+    transport: Transport;
+    // Sub-pixel motion not sent yet
+    accumulatorX: number;
+    accumulatorY: number;
+}
+
+/**
+ * The transport worker's side: owns one Transport per desktop and turns slabs of
+ * pointer samples into OP_MOVE frames, one per slab. Runs in-process where Web Workers
+ * are unavailable.
+ */
+export class SocketHost {
+    private post: (event: SocketEvent, transfer?: Transferable[]) => void;
+    private sockets = new Map<number, Socket>();
+    private moveBuffer = new ArrayBuffer(5);
+    private moveView = new DataView(this.moveBuffer);
+
+    constructor(post: (event: SocketEvent, transfer?: Transferable[]) => void) {
+        this.post = post;
+    }
+
+    public handle(command: SocketCommand) {
+        switch (command.type) {
+            case 'connect':
+                this.socket(command.id).transport.connect(command.url, command.credentials);
+                break;
+            case 'disconnect':
+                this.sockets.get(command.id)?.transport.disconnect();
+                this.sockets.delete(command.id);
+                break;
+            case 'send':
+                this.sockets.get(command.id)?.transport.send(command.data);
+                break;
+            case 'motion':
+                this.sendMotion(command.id, command.slab, command.count);
+                this.post({ type: 'slab', id: command.id, slab: command.slab }, [command.slab]);
+                break;
+            case 'metrics': {
+                const socket = this.sockets.get(command.id);
+                if (socket) {
+                    this.post({ type: 'metrics', id: command.id, ...socket.transport.getMetrics() });
+                }
+                break;
+            }
+        }
+    }
+
+    private socket(id: number): Socket {
+        let socket = this.sockets.get(id);
+        if (!socket) {
+            const transport = new Transport({
+                onStateChange: (state, text) => this.post({ type: 'state', id, state, text }),
+                onMessage: (data) => this.post({ type: 'message', id, data }, [data]),
+                onUnauthorized: () => this.post({ type: 'unauthorized', id }),
+                onSession: (token) => this.post({ type: 'session', id, token })
+            });
+            socket = { transport, accumulatorX: 0, accumulatorY: 0 };
+            this.sockets.set(id, socket);
+        }
+        return socket;
+    }
+
+    private sendMotion(id: number, slab: ArrayBuffer, count: number) {
+        const socket = this.sockets.get(id);
+        if (!socket) return;
+
+        const samples = new Float64Array(slab, 0, count * SAMPLE_FIELDS);
+        for (let i = 0; i < samples.length; i += SAMPLE_FIELDS) {
+            socket.accumulatorX += samples[i];
+            socket.accumulatorY += samples[i + 1];
+        }
+
+        // Whole pixels go out; the remainder waits for the next frame
+        const stepX = clampInt16(Math.trunc(socket.accumulatorX));
+        const stepY = clampInt16(Math.trunc(socket.accumulatorY));
+        if (stepX === 0 && stepY === 0) return;
+        socket.accumulatorX -= stepX;
+        socket.accumulatorY -= stepY;
+
+        // [OpCode] [dx i16] [dy i16]
+        this.moveView.setUint8(0, OP_MOVE);
+        this.moveView.setInt16(1, stepX, false);
+        this.moveView.setInt16(3, stepY, false);
+        socket.transport.send(this.moveBuffer);
+    }
+}
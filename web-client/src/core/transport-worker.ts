@@ -0,0 +1,6 @@
+import { SocketHost, type SocketCommand, type SocketEvent } from './socket-host';
+
+const host = new SocketHost((event: SocketEvent, transfer: Transferable[] = []) => self.postMessage(event, { transfer }));
+
+// Sockets, heartbeats and frame encoding live here so a busy UI thread never delays input
+self.onmessage = (event: MessageEvent<SocketCommand>) => host.handle(event.data);
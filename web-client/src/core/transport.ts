@@ -1,14 +1,37 @@
-import { ConnectionStatus } from './protocol';
+import { ConnectionStatus, OP_PING } from './protocol';
+import { WS_CLOSE_UNAUTHORIZED, authReply, type DeviceCredentials } from './pairing';
 
-interface TransportOptions {
+export interface TransportOptions {
     onStateChange?: (state: ConnectionStatus, statusText: string) => void;
+    onMessage?: (data: ArrayBuffer) => void;
+    // The server refused this device; reconnecting is pointless until it is paired
+    onUnauthorized?: () => void;
+    onSession?: (token: string) => void;
 }
 
+// Reconnect backoff: 100ms, 200ms, 400ms ... capped at 3s
+const RECONNECT_BASE_DELAY = 100;
+const RECONNECT_MAX_DELAY = 3000;
+
+// Heartbeat: a half-open connection is detected within HEARTBEAT_TIMEOUT
+const HEARTBEAT_INTERVAL = 250;
+const HEARTBEAT_TIMEOUT = 700;
+
 export class Transport {
     private ws: WebSocket | null = null;
     private options: TransportOptions;
-    private reconnectTimer: number | null = null;
+    private reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    private heartbeatTimer: ReturnType<typeof setInterval> | null = null;
     private isExplicitlyClosed = false;
+    private reconnectAttempts = 0;
+    private lastPongAt = 0;
+    private sessionToken: string | null = null;
+    private host = '';
+    // Passed in where localStorage is out of reach (the transport worker)
+    private credentials: DeviceCredentials | null | undefined = undefined;
+    private state: ConnectionStatus = ConnectionStatus.Disconnected;
+    private statusText = 'status.disconnected';
+    private pingFrame = new Uint8Array([OP_PING]);
 
     private metrics = {
         packetsSent: 0,
@@ -26,25 +49,45 @@ export class Transport {
         return result;
     }
 
-    public connect(url: string) {
+    public getState(): [ConnectionStatus, string] {
+        return [this.state, this.statusText];
+    }
+
+    public connect(url: string, credentials?: DeviceCredentials | null) {
         this.isExplicitlyClosed = false;
+        this.host = new URL(url).host;
+        if (credentials !== undefined) this.credentials = credentials;
         this.updateState(ConnectionStatus.Connecting, 'status.connecting');
 
         try {
-            this.ws = new WebSocket(url);
-            this.ws.binaryType = 'arraybuffer';
-
-            this.ws.onopen = () => {
+            const ws = new WebSocket(this.withSession(url));
+            ws.binaryType = 'arraybuffer';
+            this.ws = ws;
+
+            ws.onopen = () => {
+                this.reconnectAttempts = 0;
+                this.lastPongAt = Date.now();
+                this.startHeartbeat(url);
                 this.updateState(ConnectionStatus.Connected, 'status.connected');
                 console.log('WebSocket opened');
             };
 
-            this.ws.onclose = () => {
-                this.updateState(ConnectionStatus.Disconnected, 'status.disconnected');
-                this.scheduleReconnect(url);
+            ws.onmessage = (event: MessageEvent) => {
+                this.handleMessage(event.data);
+            };
+
+            ws.onclose = (event: CloseEvent) => {
+                if (event.code === WS_CLOSE_UNAUTHORIZED) {
+                    this.stopHeartbeat();
+                    this.ws = null;
+                    this.updateState(ConnectionStatus.Disconnected, 'status.unauthorized');
+                    this.options.onUnauthorized?.();
+                    return;
+                }
+                this.handleClosed(url);
             };
 
-            this.ws.onerror = (error) => {
+            ws.onerror = (error) => {
                 console.error('WebSocket error:', error);
                 this.updateState(ConnectionStatus.Disconnected, 'status.error');
                 // onerror usually is followed by onclose, so we let onclose handle reconnect
@@ -59,6 +102,7 @@ export class Transport {
 
     public disconnect() {
         this.isExplicitlyClosed = true;
+        this.stopHeartbeat();
         if (this.reconnectTimer) {
             clearTimeout(this.reconnectTimer);
             this.reconnectTimer = null;
@@ -69,6 +113,10 @@ export class Transport {
         }
     }
 
+    public getSessionToken(): string | null {
+        return this.sessionToken;
+    }
+
     public send(data: ArrayBuffer | Uint8Array) {
         if (this.ws && this.ws.readyState === WebSocket.OPEN) {
             this.ws.send(data);
@@ -77,21 +125,94 @@ export class Transport {
         }
     }
 
+    private withSession(url: string) {
+        if (!this.sessionToken) return url;
+        const separator = url.includes('?') ? '&' : '?';
+        return `${url}${separator}session=${encodeURIComponent(this.sessionToken)}`;
+    }
+
+    private handleMessage(data: unknown) {
+        if (data instanceof ArrayBuffer) {
+            if (data.byteLength > 0 && new Uint8Array(data)[0] === OP_PING) {
+                this.lastPongAt = Date.now();
+            } else if (this.options.onMessage) {
+                this.options.onMessage(data);
+            }
+            return;
+        }
+
+        if (typeof data === 'string') {
+            try {
+                const message = JSON.parse(data);
+                if (message.type === 'challenge') {
+                    this.ws?.send(authReply(message.nonce, this.host, this.credentials));
+                } else if (message.type === 'session') {
+                    this.sessionToken = message.token;
+                    this.options.onSession?.(message.token);
+                }
+            } catch (e) {
+                console.error('Invalid server message', e);
+            }
+        }
+    }
+
+    private handleClosed(url: string) {
+        this.stopHeartbeat();
+        this.ws = null;
+        this.updateState(ConnectionStatus.Disconnected, 'status.disconnected');
+        this.scheduleReconnect(url);
+    }
+
+    private startHeartbeat(url: string) {
+        this.stopHeartbeat();
+        this.heartbeatTimer = setInterval(() => {
+            const ws = this.ws;
+            if (!ws || ws.readyState !== WebSocket.OPEN) return;
+
+            if (Date.now() - this.lastPongAt > HEARTBEAT_TIMEOUT) {
+                // Half-open connection: the browser may take minutes to fire onclose, so
+                // abandon the socket now and resume the session on a fresh one
+                console.warn('Heartbeat timed out, reconnecting');
+                ws.onclose = null;
+                ws.onmessage = null;
+                ws.onerror = null;
+                ws.close();
+                this.handleClosed(url);
+                return;
+            }
+
+            ws.send(this.pingFrame);
+        }, HEARTBEAT_INTERVAL);
+    }
+
+    private stopHeartbeat() {
+        if (this.heartbeatTimer !== null) {
+            clearInterval(this.heartbeatTimer);
+            this.heartbeatTimer = null;
+        }
+    }
+
     private scheduleReconnect(url: string) {
         if (this.isExplicitlyClosed) return;
 
         if (this.reconnectTimer === null) {
-            this.reconnectTimer = window.setTimeout(() => {
+            const delay = Math.min(
+                RECONNECT_BASE_DELAY * 2 ** this.reconnectAttempts,
+                RECONNECT_MAX_DELAY
+            );
+            this.reconnectAttempts++;
+            this.reconnectTimer = setTimeout(() => {
                 this.reconnectTimer = null;
                 this.connect(url);
-            }, 3000);
+            }, delay);
         }
     }
 
     private updateState(state: ConnectionStatus, text: string) {
+        this.state = state;
+        this.statusText = text;
         if (this.options.onStateChange) {
             this.options.onStateChange(state, text);
         }
     }
 }
-
@@ -0,0 +1,31 @@
+import { uploadFile } from './upload';
+
+export interface UploadRequest {
+    file: File;
+    resumeId: string | null;
+    sessionToken: string | null;
+}
+
+export type UploadEvent =
+    | { type: 'created'; id: string }
+    | { type: 'progress'; sent: number; total: number }
+    | { type: 'done' }
+    | { type: 'error'; message: string };
+
+const post = (event: UploadEvent) => self.postMessage(event);
+
+// Reading, checksumming and sending happen here so large files never stall the touchpad
+self.onmessage = async (event: MessageEvent<UploadRequest>) => {
+    const { file, resumeId, sessionToken } = event.data;
+    try {
+        await uploadFile(file, {
+            resumeId,
+            sessionToken,
+            onCreated: (id) => post({ type: 'created', id }),
+            onProgress: (sent, total) => post({ type: 'progress', sent, total })
+        });
+        post({ type: 'done' });
+    } catch (e) {
+        post({ type: 'error', message: String(e) });
+    }
+};
@@ -0,0 +1,126 @@
+import { crc32 } from './clipboard';
+
+const UPLOADS_URL = '/api/inbox/uploads';
+
+// Each PATCH carries one slice; only one slice is ever held in memory
+const CHUNK_SIZE = 4 * 1024 * 1024;
+const MAX_RETRIES = 5;
+const RETRY_DELAY = 1000;
+
+export interface UploadState {
+    id: string;
+    name: string;
+    size: number;
+    offset: number;
+    crc32: number;
+}
+
+export interface UploadOptions {
+    resumeId?: string | null;
+    // Token of the authenticated socket session; the inbox only accepts paired devices
+    sessionToken?: string | null;
+    onCreated?: (id: string) => void;
+    onProgress?: (sent: number, total: number) => void;
+}
+
+class UploadRejected extends Error {
+    public status: number;
+
+    constructor(status: number) {
+        super(`Upload rejected with status ${status}`);
+        this.status = status;
+    }
+}
+
+async function readSlice(file: Blob, start: number, end: number): Promise<Uint8Array> {
+    return new Uint8Array(await file.slice(start, end).arrayBuffer());
+}
+
+// CRC32 of the first `length` bytes of `file`, read slice by slice
+export async function crc32OfPrefix(file: Blob, length: number): Promise<number> {
+    let crc = 0;
+    for (let offset = 0; offset < length; offset += CHUNK_SIZE) {
+        crc = crc32(await readSlice(file, offset, Math.min(offset + CHUNK_SIZE, length)), crc);
+    }
+    return crc;
+}
+
+async function request(
+    url: string,
+    token: string | null | undefined,
+    init: RequestInit = {}
+): Promise<UploadState & { complete?: boolean }> {
+    const headers = new Headers(init.headers);
+    if (token) headers.set('X-Session-Token', token);
+    const response = await fetch(url, { ...init, headers });
+    if (!response.ok) throw new UploadRejected(response.status);
+    return response.json();
+}
+
+/**
+ * Find where to continue: the server's offset, but only if the bytes it already has
+ * match our file. Returns null when the upload has to start over.
+ */
+async function resume(file: File, id: string, token?: string | null): Promise<UploadState | null> {
+    try {
+        const state = await request(`${UPLOADS_URL}/${id}`, token);
+        if (state.size !== file.size) return null;
+        if (await crc32OfPrefix(file, state.offset) !== state.crc32) return null;
+        return state;
+    } catch (e) {
+        if (e instanceof UploadRejected && e.status === 404) return null;
+        throw e;
+    }
+}
+
+/**
+ * Streams `file` to the desktop inbox in CHUNK_SIZE slices, each tagged with its offset
+ * and the CRC32 of everything sent so far, so the server verifies the file as it grows.
+ * After a dropped connection the upload continues from the server's offset.
+ */
+export async function uploadFile(file: File, options: UploadOptions = {}): Promise<void> {
+    const token = options.sessionToken;
+    let state = options.resumeId ? await resume(file, options.resumeId, token) : null;
+    if (!state) {
+        const params = new URLSearchParams({ name: file.name, size: file.size.toString() });
+        state = await request(`${UPLOADS_URL}?${params}`, token, { method: 'POST' });
+        options.onCreated?.(state.id);
+    }
+
+    let { offset, crc32: crc } = state;
+    let retries = 0;
+    options.onProgress?.(offset, file.size);
+
+    // An empty file still needs one (empty) PATCH to complete
+    do {
+        const end = Math.min(offset + CHUNK_SIZE, file.size);
+        const slice = await readSlice(file, offset, end);
+        const sliceCrc = crc32(slice, crc);
+
+        try {
+            await request(`${UPLOADS_URL}/${state.id}`, token, {
+                method: 'PATCH',
+                headers: {
+                    'Upload-Offset': offset.toString(),
+                    'Upload-CRC32': sliceCrc.toString()
+                },
+                body: slice as BodyInit
+            });
+        } catch (e) {
+            if (e instanceof UploadRejected && e.status !== 409) throw e;
+            if (++retries > MAX_RETRIES) throw e;
+
+            // Network error or offset conflict: ask the server what it actually has
+            await new Promise(resolve => setTimeout(resolve, RETRY_DELAY));
+            const resumed = await resume(file, state.id, token);
+            if (!resumed) throw e;
+            ({ offset, crc32: crc } = resumed);
+            continue;
+        }
+
+        offset = end;
+        crc = sliceCrc;
+        retries = 0;
+        options.onProgress?.(offset, file.size);
+    } while (offset < file.size);
+}
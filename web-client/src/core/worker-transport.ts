@@ -0,0 +1,136 @@
+import { ConnectionStatus } from './protocol';
+import { InputRing } from './input-ring';
+import { loadCredentials } from './pairing';
+import { SocketHost, type SocketCommand, type SocketEvent } from './socket-host';
+import type { TransportOptions } from './transport';
+
+/**
+ * The UI thread's end of the transport worker. All sockets share one worker; each
+ * WorkerTransport is addressed by id.
+ */
+export class SocketWorker {
+    private postCommand: (command: SocketCommand, transfer?: Transferable[]) => void;
+    private transports = new Map<number, WorkerTransport>();
+    private nextId = 1;
+
+    constructor(post?: (command: SocketCommand, transfer?: Transferable[]) => void) {
+        if (post) {
+            this.postCommand = post;
+        } else if (typeof Worker !== 'undefined') {
+            const worker = new Worker(new URL('./transport-worker.ts', import.meta.url), { type: 'module' });
+            worker.onmessage = (event: MessageEvent<SocketEvent>) => this.dispatch(event.data);
+            this.postCommand = (command, transfer = []) => worker.postMessage(command, { transfer });
+        } else {
+            // No workers (old browsers, tests): same pipeline, on this thread
+            const host = new SocketHost((event) => this.dispatch(event));
+            this.postCommand = (command) => host.handle(command);
+        }
+    }
+
+    public create(options: TransportOptions, schedule?: (callback: () => void) => void): WorkerTransport {
+        const id = this.nextId++;
+        const transport = new WorkerTransport(id, options, (command, transfer) => {
+            if (command.type === 'disconnect') this.transports.delete(id);
+            this.postCommand(command, transfer);
+        }, schedule);
+        this.transports.set(id, transport);
+        return transport;
+    }
+
+    public dispatch(event: SocketEvent) {
+        this.transports.get(event.id)?.handleEvent(event);
+    }
+}
+
+/**
+ * Stands in for a Transport living in the worker. Pointer motion is collected in an
+ * InputRing and flushed once per animation frame; every other frame is posted as is,
+ * after any motion still pending so a click lands where the pointer went.
+ */
+export class WorkerTransport {
+    public readonly id: number;
+    private options: TransportOptions;
+    private post: (command: SocketCommand, transfer?: Transferable[]) => void;
+    private ring: InputRing;
+    private state: ConnectionStatus = ConnectionStatus.Disconnected;
+    private statusText = 'status.disconnected';
+    private sessionToken: string | null = null;
+    private metrics = { packetsSent: 0, bytesSent: 0 };
+
+    constructor(
+        id: number,
+        options: TransportOptions,
+        post: (command: SocketCommand, transfer?: Transferable[]) => void,
+        schedule?: (callback: () => void) => void
+    ) {
+        this.id = id;
+        this.options = options;
+        this.post = post;
+        this.ring = new InputRing(
+            (slab, count) => this.post({ type: 'motion', id, slab, count }, [slab]),
+            schedule
+        );
+    }
+
+    public connect(url: string) {
+        this.state = ConnectionStatus.Connecting;
+        this.statusText = 'status.connecting';
+        // Read here: the worker has no localStorage, and a new pairing must apply on reconnect
+        const credentials = loadCredentials(new URL(url).host);
+        this.post({ type: 'connect', id: this.id, url, credentials });
+    }
+
+    public disconnect() {
+        this.ring.flush();
+        this.post({ type: 'disconnect', id: this.id });
+    }
+
+    public move(dx: number, dy: number) {
+        this.ring.push(dx, dy);
+    }
+
+    public send(data: ArrayBuffer | Uint8Array) {
+        this.ring.flush();
+        this.post({ type: 'send', id: this.id, data });
+    }
+
+    public getState(): [ConnectionStatus, string] {
+        return [this.state, this.statusText];
+    }
+
+    public getSessionToken(): string | null {
+        return this.sessionToken;
+    }
+
+    // Counters live in the worker; this returns the last report and asks for the next
+    public getMetrics() {
+        this.post({ type: 'metrics', id: this.id });
+        return { ...this.metrics };
+    }
+
+    public handleEvent(event: SocketEvent) {
+        switch (event.type) {
+            case 'state':
+                this.state = event.state;
+                this.statusText = event.text;
+                this.options.onStateChange?.(event.state, event.text);
+                break;
+            case 'message':
+                this.options.onMessage?.(event.data);
+                break;
+            case 'unauthorized':
+                this.options.onUnauthorized?.();
+                break;
+            case 'session':
+                this.sessionToken = event.token;
+                this.options.onSession?.(event.token);
+                break;
+            case 'metrics':
+                this.metrics = { packetsSent: event.packetsSent, bytesSent: event.bytesSent };
+                break;
+            case 'slab':
+                this.ring.recycle(event.slab);
+                break;
+        }
+    }
+}
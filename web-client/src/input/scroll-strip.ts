@@ -9,7 +9,6 @@ export class ScrollStripHandler {
     // State
     private activePointerId: number | null = null;
     private lastY: number = 0;
-    private accumulatorY = 0;
 
     // Config
     public sensitivity = 1;
@@ -50,7 +49,6 @@ export class ScrollStripHandler {
 
         this.activePointerId = e.pointerId;
         this.lastY = e.clientY;
-        this.accumulatorY = 0;
 
         this.element.classList.add('active');
 
@@ -67,15 +65,9 @@ export class ScrollStripHandler {
         const rawDy = e.clientY - this.lastY;
         this.lastY = e.clientY;
 
-        // Accumulate movement
-        this.accumulatorY += rawDy * this.sensitivity;
-
-        const stepY = Math.trunc(this.accumulatorY);
-
-        if (stepY !== 0) {
-            this.accumulatorY -= stepY;
-            // Send scroll event (0 for X, stepY for Y)
-            this.callbacks.onScroll(0, stepY);
+        // Fractional steps are kept; the sender batches and quantizes them
+        if (rawDy !== 0) {
+            this.callbacks.onScroll(0, rawDy * this.sensitivity);
         }
     }
 
@@ -1,25 +1,58 @@
+import { GestureKind, GesturePhase, PINCH_SCALE } from '../core/protocol';
+
 interface TouchpadCallbacks {
     onMove: (dx: number, dy: number) => void;
     onClick: (button: number) => void;
     onScroll: (sx: number, sy: number) => void;
     onDrag: (active: boolean) => void;
+    onGesture?: (kind: number, phase: number, fingers: number, magnitude: number) => void;
+    // Tablet mode: where a single finger is, from 0 to 1 across the touchpad
+    onPosition?: (x: number, y: number) => void;
 }
 
+// Two fingers spreading or closing by this many pixels is a pinch rather than a scroll
+const PINCH_THRESHOLD = 30;
+// Scale change (in thousandths) needed before another pinch update is sent
+const PINCH_UPDATE_STEP = 20;
+// Four fingers travelling this many pixels together are a swipe
+const SWIPE_THRESHOLD = 40;
+// Distance change (in pixels) needed before another swipe update is sent
+const SWIPE_UPDATE_STEP = 10;
+// Three resting fingers start a drag after this long, unless they move first or a fourth
+// finger lands and turns them into a swipe
+const DRAG_START_DELAY = 150;
+
 export class TouchpadHandler {
     private element: HTMLElement;
     private callbacks: TouchpadCallbacks;
 
     // State
     private pointers = new Map<number, {x: number, y: number}>();
+    // Where each finger touched down; a tap is judged on the distance travelled since
+    private downAt = new Map<number, {x: number, y: number}>();
     private isDragging = false;
     private hasMoved = false;
     private lastRightClickTime = 0;
+    // Most fingers down at once during the current touch
+    private maxPointers = 0;
+
+    // Tablet mode; the touchpad's bounds are read once per touch, not per sample
+    private absolute = false;
+    private bounds: DOMRect | null = null;
+
+    // Pinch
+    private isPinching = false;
+    private pinchStartDistance = 0;
+    private lastPinchScale = PINCH_SCALE;
 
-    // Movement optimization
-    private accumulatorX = 0;
-    private accumulatorY = 0;
-    private scrollAccumulatorX = 0;
-    private scrollAccumulatorY = 0;
+    // Three finger drag waiting to start
+    private dragTimer: ReturnType<typeof setTimeout> | null = null;
+
+    // Four finger swipe; the kind is only known once the fingers have travelled
+    private isSwiping = false;
+    private swipeStart = { x: 0, y: 0 };
+    private swipeKind: number | null = null;
+    private lastSwipeDistance = 0;
 
     // Config
     public sensitivity = 2;
@@ -39,6 +72,10 @@ export class TouchpadHandler {
         this.scrollSensitivity = val;
     }
 
+    public setAbsolute(enabled: boolean) {
+        this.absolute = enabled;
+    }
+
     private initListeners() {
         // Prevent all default touch actions to stop iOS gestures (text selection, magnifying glass, undo/redo menu)
         const preventAll = (e: Event) => {
@@ -76,13 +113,13 @@ export class TouchpadHandler {
     }
 
     private resetState() {
+        this.cancelPendingDrag();
+        this.endSwipe(GesturePhase.Cancel);
         this.pointers.clear();
+        this.downAt.clear();
         this.isDragging = false;
         this.hasMoved = false;
-        this.accumulatorX = 0;
-        this.accumulatorY = 0;
-        this.scrollAccumulatorX = 0;
-        this.scrollAccumulatorY = 0;
+        this.isPinching = false;
         if (this.isDragging) {
              this.callbacks.onDrag(false);
         }
@@ -93,13 +130,17 @@ export class TouchpadHandler {
 
         if (this.pointers.size === 0) {
             this.hasMoved = false;
+            this.maxPointers = 0;
         }
 
         this.pointers.set(e.pointerId, { x: e.clientX, y: e.clientY });
-        this.accumulatorX = 0;
-        this.accumulatorY = 0;
-        this.scrollAccumulatorX = 0;
-        this.scrollAccumulatorY = 0;
+        this.downAt.set(e.pointerId, { x: e.clientX, y: e.clientY });
+        this.maxPointers = Math.max(this.maxPointers, this.pointers.size);
+
+        if (this.pointers.size === 1 && this.isAbsolute()) {
+            this.bounds = this.element.getBoundingClientRect();
+            this.sendPosition(e.clientX, e.clientY);
+        }
 
         try {
             this.element.setPointerCapture(e.pointerId);
@@ -107,65 +148,72 @@ export class TouchpadHandler {
             // Ignore in tests or if capture fails
         }
 
+        if (this.pointers.size === 2) {
+            this.pinchStartDistance = Math.max(1, this.pointerDistance());
+        }
+
         if (this.pointers.size === 3) {
-            this.isDragging = true;
-            this.callbacks.onDrag(true);
+            this.endPinch(GesturePhase.Cancel);
+            this.dragTimer = setTimeout(() => this.startDrag(), DRAG_START_DELAY);
+        }
+
+        if (this.pointers.size === 4 && !this.isDragging && this.callbacks.onGesture) {
+            this.cancelPendingDrag();
+            this.isSwiping = true;
+            this.swipeStart = this.centroid();
+            this.swipeKind = null;
         }
     }
 
     private handlePointerMove(e: PointerEvent) {
         if (!this.pointers.has(e.pointerId)) return;
 
-        const prev = this.pointers.get(e.pointerId)!;
-        const rawDx = e.clientX - prev.x;
-        const rawDy = e.clientY - prev.y;
+        // The browser folds the samples between two frames into one event; the path in
+        // between is kept in its coalesced events
+        const coalesced = e.getCoalescedEvents?.() ?? [];
+        const samples = coalesced.length > 0 ? coalesced : [e];
+        for (const sample of samples) {
+            this.handleSample(e.pointerId, sample.clientX, sample.clientY);
+        }
+    }
 
-        if (Math.abs(rawDx) > 1 || Math.abs(rawDy) > 1) {
+    private handleSample(pointerId: number, x: number, y: number) {
+        const prev = this.pointers.get(pointerId)!;
+        const rawDx = x - prev.x;
+        const rawDy = y - prev.y;
+
+        // Coalesced samples can each be under a pixel, so compare with the touch point
+        const start = this.downAt.get(pointerId)!;
+        if (Math.abs(x - start.x) > 1 || Math.abs(y - start.y) > 1) {
             this.hasMoved = true;
         }
 
-        this.pointers.set(e.pointerId, { x: e.clientX, y: e.clientY });
-
-        if (this.pointers.size === 1) {
-            // Single finger move
-            this.accumulatorX += rawDx * this.sensitivity;
-            this.accumulatorY += rawDy * this.sensitivity;
+        this.pointers.set(pointerId, { x, y });
 
-            const stepX = Math.trunc(this.accumulatorX);
-            const stepY = Math.trunc(this.accumulatorY);
+        if (this.maxPointers > 3) {
+            // Four finger swipe; fingers left down after it do nothing until all are lifted
+            if (this.isSwiping) this.trackSwipe();
+            return;
+        }
 
-            if (stepX !== 0 || stepY !== 0) {
-                this.accumulatorX -= stepX;
-                this.accumulatorY -= stepY;
-                this.callbacks.onMove(stepX, stepY);
+        if (this.pointers.size === 1 && this.isAbsolute()) {
+            this.sendPosition(x, y);
+        } else if (this.pointers.size === 1 || this.pointers.size === 3) {
+            if (this.pointers.size === 3 && !this.isDragging && (rawDx !== 0 || rawDy !== 0)) {
+                this.startDrag();
             }
-        } else if (this.pointers.size === 2) {
-            // Two finger scroll - only trigger for the first pointer to avoid double events
-            if (e.pointerId === Array.from(this.pointers.keys())[0]) {
-                this.scrollAccumulatorX += rawDx * this.scrollSensitivity;
-                this.scrollAccumulatorY += rawDy * this.scrollSensitivity;
-
-                const stepX = Math.trunc(this.scrollAccumulatorX);
-                const stepY = Math.trunc(this.scrollAccumulatorY);
-
-                if (stepX !== 0 || stepY !== 0) {
-                    this.scrollAccumulatorX -= stepX;
-                    this.scrollAccumulatorY -= stepY;
-                    this.callbacks.onScroll(stepX, stepY);
-                }
+            // Single finger move, or three finger drag move. Deltas stay fractional; the
+            // transport worker accumulates them into whole pixels once per frame
+            if (rawDx !== 0 || rawDy !== 0) {
+                this.callbacks.onMove(rawDx * this.sensitivity, rawDy * this.sensitivity);
             }
-        } else if (this.pointers.size === 3) {
-            // Three finger drag move
-            this.accumulatorX += rawDx * this.sensitivity;
-            this.accumulatorY += rawDy * this.sensitivity;
-
-            const stepX = Math.trunc(this.accumulatorX);
-            const stepY = Math.trunc(this.accumulatorY);
-
-            if (stepX !== 0 || stepY !== 0) {
-                this.accumulatorX -= stepX;
-                this.accumulatorY -= stepY;
-                this.callbacks.onMove(stepX, stepY);
+        } else if (this.pointers.size === 2) {
+            if (this.trackPinch()) return;
+
+            // Two finger scroll - only trigger for the first pointer to avoid double events.
+            // Deltas stay fractional; ScrollCoalescer batches and quantizes them
+            if (pointerId === Array.from(this.pointers.keys())[0] && (rawDx !== 0 || rawDy !== 0)) {
+                this.callbacks.onScroll(rawDx * this.scrollSensitivity, rawDy * this.scrollSensitivity);
             }
         }
     }
@@ -176,7 +224,7 @@ export class TouchpadHandler {
         const now = Date.now();
 
         // Fix: Do not trigger clicks on pointercancel (e.g. lock screen, system interruption)
-        if (e.type !== 'pointercancel') {
+        if (e.type !== 'pointercancel' && this.maxPointers <= 3) {
             if (this.pointers.size === 1) {
                 // Tap (Left Click)
                 // Logic: Not moved, Not in drag mode, Time since last right click > 300ms
@@ -192,6 +240,10 @@ export class TouchpadHandler {
             }
         }
 
+        this.endPinch(e.type === 'pointercancel' ? GesturePhase.Cancel : GesturePhase.End);
+        this.endSwipe(e.type === 'pointercancel' ? GesturePhase.Cancel : GesturePhase.End);
+        this.cancelPendingDrag();
+
         if (this.isDragging && this.pointers.size <= 3) {
             this.isDragging = false;
             this.callbacks.onDrag(false);
@@ -203,5 +255,112 @@ export class TouchpadHandler {
             // ignore
         }
         this.pointers.delete(e.pointerId);
+        this.downAt.delete(e.pointerId);
+    }
+
+    private isAbsolute(): boolean {
+        return this.absolute && this.callbacks.onPosition !== undefined;
+    }
+
+    private sendPosition(x: number, y: number) {
+        const bounds = this.bounds ?? this.element.getBoundingClientRect();
+        this.callbacks.onPosition!(
+            bounds.width > 0 ? (x - bounds.left) / bounds.width : 0,
+            bounds.height > 0 ? (y - bounds.top) / bounds.height : 0
+        );
+    }
+
+    private pointerDistance(): number {
+        const [a, b] = Array.from(this.pointers.values());
+        return Math.hypot(a.x - b.x, a.y - b.y);
+    }
+
+    // Returns true while the two fingers are pinching, so they don't also scroll
+    private trackPinch(): boolean {
+        if (!this.callbacks.onGesture) return false;
+
+        const distance = this.pointerDistance();
+        if (!this.isPinching) {
+            if (Math.abs(distance - this.pinchStartDistance) <= PINCH_THRESHOLD) return false;
+            this.isPinching = true;
+            this.lastPinchScale = PINCH_SCALE;
+            this.callbacks.onGesture(GestureKind.Pinch, GesturePhase.Begin, 2, PINCH_SCALE);
+        }
+
+        // One message per noticeable change; the server turns it into smooth zoom steps
+        const scale = Math.round(distance / this.pinchStartDistance * PINCH_SCALE);
+        if (Math.abs(scale - this.lastPinchScale) >= PINCH_UPDATE_STEP) {
+            this.lastPinchScale = scale;
+            this.callbacks.onGesture(GestureKind.Pinch, GesturePhase.Update, 2, scale);
+        }
+        return true;
+    }
+
+    private endPinch(phase: number) {
+        if (!this.isPinching) return;
+        this.isPinching = false;
+        this.callbacks.onGesture?.(GestureKind.Pinch, phase, 2, this.lastPinchScale);
+    }
+
+    private startDrag() {
+        this.cancelPendingDrag();
+        if (this.isDragging) return;
+        this.isDragging = true;
+        this.callbacks.onDrag(true);
+    }
+
+    private cancelPendingDrag() {
+        if (this.dragTimer === null) return;
+        clearTimeout(this.dragTimer);
+        this.dragTimer = null;
+    }
+
+    private centroid(): { x: number, y: number } {
+        const points = Array.from(this.pointers.values());
+        return {
+            x: points.reduce((sum, p) => sum + p.x, 0) / points.length,
+            y: points.reduce((sum, p) => sum + p.y, 0) / points.length,
+        };
+    }
+
+    // The direction is fixed by the axis the fingers first travel along
+    private trackSwipe() {
+        const center = this.centroid();
+        const dx = center.x - this.swipeStart.x;
+        const dy = center.y - this.swipeStart.y;
+
+        if (this.swipeKind === null) {
+            if (Math.hypot(dx, dy) < SWIPE_THRESHOLD) return;
+            if (Math.abs(dx) > Math.abs(dy)) {
+                this.swipeKind = dx < 0 ? GestureKind.SwipeLeft : GestureKind.SwipeRight;
+            } else {
+                this.swipeKind = dy < 0 ? GestureKind.SwipeUp : GestureKind.SwipeDown;
+            }
+            this.lastSwipeDistance = 0;
+            this.callbacks.onGesture!(this.swipeKind, GesturePhase.Begin, 4, 0);
+        }
+
+        const distance = Math.max(0, Math.round(this.swipeDistance(dx, dy)));
+        if (Math.abs(distance - this.lastSwipeDistance) >= SWIPE_UPDATE_STEP) {
+            this.lastSwipeDistance = distance;
+            this.callbacks.onGesture!(this.swipeKind, GesturePhase.Update, 4, distance);
+        }
+    }
+
+    private swipeDistance(dx: number, dy: number): number {
+        switch (this.swipeKind) {
+            case GestureKind.SwipeLeft: return -dx;
+            case GestureKind.SwipeRight: return dx;
+            case GestureKind.SwipeUp: return -dy;
+            default: return dy;
+        }
+    }
+
+    private endSwipe(phase: number) {
+        if (!this.isSwiping) return;
+        this.isSwiping = false;
+        if (this.swipeKind !== null) {
+            this.callbacks.onGesture?.(this.swipeKind, phase, 4, this.lastSwipeDistance);
+        }
     }
 }
@@ -7,6 +7,7 @@ export const en: TranslationKeys = {
         disconnected: 'Disconnected',
         error: 'Connection Error',
         failed: 'Connection Failed',
+        unauthorized: 'Not Paired',
     },
     settings: {
         title: 'Settings',
@@ -15,8 +16,33 @@ export const en: TranslationKeys = {
         light_mode: 'Light Mode',
         scroll_bar_right: 'Scroll Bar Right',
         rate_monitor: 'Rate Monitor',
+        screen_preview: 'Screen Preview',
+        clipboard_sync: 'Clipboard Sync',
+        clipboard_paste_hint: "This page can't read the phone clipboard over plain HTTP. Paste here to send it to the computer:",
+        send_file: 'Send File',
+        send_file_done: 'sent',
+        send_file_failed: 'failed',
+        computer: 'Computer',
+        this_computer: 'This Computer',
+        pointer: 'Pointer',
+        pointer_touchpad: 'Touchpad',
+        pointer_desktop: 'Tablet: Whole Desktop',
+        pointer_monitor: 'Tablet: Monitor',
+        macros: 'Macros',
+        macro_play: 'Play',
+        macro_stop: 'Stop',
+        macro_save: 'Save',
+        macro_delete: 'Delete',
+        macro_saved: 'saved',
+        macro_empty: 'No macros yet',
         language: 'Language',
     },
+    pairing: {
+        title: 'Pair Device',
+        hint: 'Click "Pair Device" in the tray menu on your computer and enter the code it shows',
+        submit: 'Pair',
+        failed: 'Invalid or expired code',
+    },
     ui: {
         close: 'Close',
     }
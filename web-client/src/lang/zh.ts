@@ -5,6 +5,7 @@ export const zh = {
         disconnected: '连接断开',
         error: '连接错误',
         failed: '连接失败',
+        unauthorized: '未配对',
     },
     settings: {
         title: '设置',
@@ -13,8 +14,33 @@ export const zh = {
         light_mode: '亮色模式',
         scroll_bar_right: '滚动条居右',
         rate_monitor: '速率监控器',
+        screen_preview: '屏幕预览',
+        clipboard_sync: '剪贴板同步',
+        clipboard_paste_hint: '通过普通 HTTP 访问时页面无法读取手机剪贴板。在此粘贴即可发送到电脑：',
+        send_file: '发送文件',
+        send_file_done: '已发送',
+        send_file_failed: '发送失败',
+        computer: '电脑',
+        this_computer: '本机',
+        pointer: '指针',
+        pointer_touchpad: '触控板',
+        pointer_desktop: '数位板：整个桌面',
+        pointer_monitor: '数位板：显示器',
+        macros: '宏',
+        macro_play: '运行',
+        macro_stop: '停止',
+        macro_save: '保存',
+        macro_delete: '删除',
+        macro_saved: '已保存',
+        macro_empty: '还没有宏',
         language: '语言',
     },
+    pairing: {
+        title: '配对设备',
+        hint: '在电脑托盘菜单中点击“Pair Device”，然后输入显示的配对码',
+        submit: '配对',
+        failed: '配对码无效或已过期',
+    },
     ui: {
         close: '关闭',
     }
@@ -1,24 +1,47 @@
 import {
-    OP_MOVE, OP_CLICK, OP_SCROLL, OP_DRAG, OP_TEXT, OP_KEY_ACTION
+    OP_CLICK, OP_DRAG, OP_TEXT, OP_KEY_ACTION, OP_CLIPBOARD, OP_GESTURE,
+    ConnectionStatus
 } from './core/protocol';
-import { Transport } from './core/transport';
+import { ClipboardSync } from './core/clipboard';
+import { ScrollCoalescer } from './core/scroll';
+import { AbsolutePointer } from './core/absolute';
+import type { WorkerTransport } from './core/worker-transport';
+import { HostPool, loadRecentHosts } from './core/host-pool';
 import { TouchpadHandler } from './input/touchpad';
 import { ScrollStripHandler } from './input/scroll-strip';
 import { KeyboardHandler } from './input/keyboard';
 import { StatusBar } from './ui/status-bar';
 import { SettingsManager } from './ui/settings';
+import { ScreenPreview } from './ui/screen-preview';
+import { FileDrop } from './ui/file-drop';
+import { PairingDialog } from './ui/pairing-dialog';
+import { HostPicker } from './ui/host-picker';
+import { PointerModePicker } from './ui/pointer-mode';
+import { MacroPanel } from './ui/macro-panel';
+import { MacroClient } from './core/macros';
 import { WebHaptics } from 'web-haptics';
 
 class RemoteMouseApp {
-    private transport: Transport;
+    // Input socket of the desktop being controlled; the pool keeps the others warm
+    private transport: WorkerTransport;
+    private hosts: HostPool;
     private touchpad: TouchpadHandler;
     private scrollStrip: ScrollStripHandler;
     private keyboard: KeyboardHandler;
     private statusBar: StatusBar;
+    private screenPreview: ScreenPreview;
+    private clipboard: ClipboardSync;
+    private scroll: ScrollCoalescer;
+    private absolute: AbsolutePointer;
+    private clipboardSyncEnabled = false;
+    private pendingPhoneClipboard: string | null = null;
+    // Only secure contexts (HTTPS, localhost) get to read the clipboard; LAN pages over
+    // plain HTTP fall back to a paste target in the settings
+    private canReadPhoneClipboard = typeof navigator.clipboard?.readText === 'function';
+    private clipboardReadWarned = false;
     private haptics = new WebHaptics();
-    private moveBuffer = new ArrayBuffer(5);
-    private moveView = new DataView(this.moveBuffer);
     private rateMonitorTimer: number | null = null;
+    private macros: MacroPanel;
 
     constructor() {
         if (window.visualViewport) {
@@ -46,22 +69,55 @@ class RemoteMouseApp {
 
         // 2. Transport
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-        const url = `${protocol}//${window.location.host}/ws`;
 
-        this.transport = new Transport({
+        const pairingDialog = new PairingDialog(
+            document.getElementById('pairing-modal')!,
+            document.getElementById('pairing-code')! as HTMLInputElement,
+            document.getElementById('btn-pair')! as HTMLButtonElement,
+            document.getElementById('pairing-error')!,
+            (host) => this.hosts.reconnect(host)
+        );
+
+        this.hosts = new HostPool({
+            onUnauthorized: (host) => pairingDialog.open(host),
             onStateChange: (state, text) => {
                 this.statusBar.update(text, state);
+                // Subscriptions are per socket, so renew them after every reconnect
+                if (state === ConnectionStatus.Connected && this.clipboardSyncEnabled) {
+                    this.clipboard.setEnabled(true);
+                }
+            },
+            onMessage: (data) => {
+                if (new Uint8Array(data)[0] === OP_CLIPBOARD) {
+                    this.clipboard.handle(data);
+                }
             }
         });
 
+        this.scroll = new ScrollCoalescer((data) => this.transport.send(data));
+        this.absolute = new AbsolutePointer((data) => this.transport.send(data));
+
+        this.clipboard = new ClipboardSync(
+            (data) => this.transport.send(data),
+            { onRemoteText: (text) => this.copyToPhone(text) }
+        );
+
+        // Screen preview uses its own socket so tiles never queue in front of input frames
+        this.screenPreview = new ScreenPreview(
+            document.getElementById('screen-preview')! as HTMLCanvasElement,
+            `${protocol}//${window.location.host}/ws/screen`
+        );
+
         // 3. Touchpad
         this.touchpad = new TouchpadHandler(
             document.getElementById('touchpad')!,
             {
                 onMove: (dx, dy) => this.sendMove(dx, dy),
+                onPosition: (x, y) => this.absolute.moveTo(x, y),
                 onClick: (button) => this.sendClick(button), // Button is already 1 or 2 from Handler
                 onScroll: (sx, sy) => this.sendScroll(sx, sy),
-                onDrag: (active) => this.sendDrag(active ? 1 : 0)
+                onDrag: (active) => this.sendDrag(active ? 1 : 0),
+                onGesture: (kind, phase, fingers, magnitude) => this.sendGesture(kind, phase, fingers, magnitude)
             }
         );
 
@@ -101,6 +157,8 @@ class RemoteMouseApp {
             document.getElementById('theme-toggle')! as HTMLInputElement,
             document.getElementById('scroll-pos-toggle')! as HTMLInputElement,
             document.getElementById('rate-monitor-toggle')! as HTMLInputElement,
+            document.getElementById('screen-preview-toggle')! as HTMLInputElement,
+            document.getElementById('clipboard-sync-toggle')! as HTMLInputElement,
             document.getElementById('lang-select')! as HTMLSelectElement,
             (val) => this.touchpad.setSensitivity(val),
             (val) => {
@@ -130,11 +188,69 @@ class RemoteMouseApp {
                 fetch(`/api/settings/tray/rate?enabled=${enabled ? 'true' : 'false'}`, {
                     method: 'POST'
                 }).catch(e => console.error('Failed to update server tray rate', e));
+            },
+            (enabled) => this.screenPreview.setEnabled(enabled),
+            (enabled) => {
+                this.clipboardSyncEnabled = enabled;
+                this.clipboard.setEnabled(enabled);
+                document.getElementById('clipboard-paste')!.hidden = !enabled || this.canReadPhoneClipboard;
+                if (enabled) this.pushPhoneClipboard();
             }
         );
 
-        // Connect
-        this.transport.connect(url);
+        // Phone -> desktop without clipboard access: whatever is pasted here is sent
+        const pasteTarget = document.getElementById('clipboard-paste-target')! as HTMLTextAreaElement;
+        pasteTarget.addEventListener('paste', (e) => {
+            e.preventDefault();
+            const text = e.clipboardData?.getData('text/plain');
+            if (text && this.clipboardSyncEnabled) this.clipboard.push(text);
+            pasteTarget.blur();
+        });
+
+        new FileDrop(
+            document.getElementById('send-file-input')! as HTMLInputElement,
+            document.getElementById('send-file-status')!,
+            // Uploads always go to the desktop that served this page
+            () => this.hosts.get(window.location.host)?.getSessionToken() ?? null
+        );
+
+        // Phone -> desktop: pick up the phone clipboard whenever the user comes back to the app
+        document.addEventListener('visibilitychange', () => {
+            if (!document.hidden) this.pushPhoneClipboard();
+        });
+
+        new HostPicker(
+            document.getElementById('host-select')! as HTMLSelectElement,
+            (host) => this.switchHost(host)
+        );
+
+        new PointerModePicker(
+            document.getElementById('pointer-mode-select')! as HTMLSelectElement,
+            () => this.hosts.host,
+            (monitor) => {
+                this.touchpad.setAbsolute(monitor !== null);
+                if (monitor !== null) this.absolute.monitor = monitor;
+            }
+        );
+
+        // Macros are stored on, and managed through, the desktop being controlled
+        this.macros = new MacroPanel(
+            {
+                list: document.getElementById('macro-list')!,
+                name: document.getElementById('macro-name')! as HTMLInputElement,
+                script: document.getElementById('macro-script')! as HTMLTextAreaElement,
+                save: document.getElementById('btn-save-macro')! as HTMLButtonElement,
+                stop: document.getElementById('btn-stop-macro')! as HTMLButtonElement,
+                status: document.getElementById('macro-status')!
+            },
+            () => new MacroClient(this.hosts.host ?? undefined, this.transport.getSessionToken()),
+            (data) => this.transport.send(data)
+        );
+        document.getElementById('btn-settings')!.addEventListener('click', () => this.macros.refresh());
+
+        // Connect: this desktop first, then keep the ones used recently warm
+        this.transport = this.hosts.activate(window.location.host);
+        this.hosts.prewarm(loadRecentHosts().filter(host => host !== window.location.host));
 
         // Handle touchpad/keyboard interaction
         document.getElementById('touchpad')!.addEventListener('pointerdown', () => {
@@ -145,6 +261,8 @@ class RemoteMouseApp {
 
         // Global haptic feedback for buttons and interactive inputs
         document.addEventListener('click', (e) => {
+            this.flushPhoneClipboard();
+
             const target = e.target as HTMLElement;
             if (target.closest('button') || target.closest('input[type="checkbox"]') || target.closest('input[type="range"]')) {
                 this.haptics.trigger('light');
@@ -152,6 +270,62 @@ class RemoteMouseApp {
         });
     }
 
+    private switchHost(host: string) {
+        if (host === this.hosts.host) return;
+        // Clipboard subscriptions are per socket, so move it along with the input
+        if (this.clipboardSyncEnabled) this.clipboard.setEnabled(false);
+        this.transport = this.hosts.activate(host);
+        if (this.clipboardSyncEnabled) this.clipboard.setEnabled(true);
+        this.macros.refresh();
+    }
+
+    private copyToPhone(text: string) {
+        if (navigator.clipboard && navigator.clipboard.writeText) {
+            navigator.clipboard.writeText(text).catch(() => {
+                this.pendingPhoneClipboard = text;
+            });
+        } else {
+            // Insecure context (plain http on the LAN): copy on the next user gesture
+            this.pendingPhoneClipboard = text;
+        }
+    }
+
+    private flushPhoneClipboard() {
+        const text = this.pendingPhoneClipboard;
+        if (text === null) return;
+        this.pendingPhoneClipboard = null;
+
+        const textarea = document.createElement('textarea');
+        textarea.value = text;
+        textarea.setAttribute('readonly', '');
+        textarea.style.position = 'fixed';
+        textarea.style.opacity = '0';
+        document.body.appendChild(textarea);
+        textarea.select();
+        try {
+            document.execCommand('copy');
+        } catch (e) {
+            console.error('Failed to copy to phone clipboard', e);
+        }
+        document.body.removeChild(textarea);
+    }
+
+    private pushPhoneClipboard() {
+        if (!this.clipboardSyncEnabled) return;
+        if (!this.canReadPhoneClipboard) {
+            if (!this.clipboardReadWarned) {
+                this.clipboardReadWarned = true;
+                console.warn('Clipboard API unavailable (page is not a secure context); use the paste box in settings');
+            }
+            return;
+        }
+        navigator.clipboard.readText()
+            .then(text => {
+                if (text) return this.clipboard.push(text);
+            })
+            .catch(e => console.error('Failed to read phone clipboard', e));
+    }
+
     private formatBytes(bytes: number): string {
         if (bytes === 0) return '0 B';
         const k = 1024;
@@ -164,14 +338,14 @@ class RemoteMouseApp {
     // --- Encoding Helpers ---
 
     private sendMove(dx: number, dy: number) {
-        this.moveView.setUint8(0, OP_MOVE);
-        this.moveView.setInt16(1, dx, false);
-        this.moveView.setInt16(3, dy, false);
-        this.transport.send(this.moveBuffer);
+        // Buffered and encoded off the UI thread, one OP_MOVE per animation frame
+        this.transport.move(dx, dy);
     }
 
     private sendClick(button: number) {
         this.haptics.trigger('medium');
+        // Tablet mode: the tap that clicks has also just placed the pointer
+        this.absolute.flush();
         // [OpCode] [Button] [ModifierMask]
         const mask = this.keyboard.getActiveModifiers();
         const buffer = new ArrayBuffer(3);
@@ -187,15 +361,11 @@ class RemoteMouseApp {
     }
 
     private sendScroll(sx: number, sy: number) {
-        const buffer = new ArrayBuffer(5);
-        const view = new DataView(buffer);
-        view.setUint8(0, OP_SCROLL);
-        view.setInt16(1, sx, false);
-        view.setInt16(3, sy, false);
-        this.transport.send(buffer);
+        this.scroll.add(sx, sy);
     }
 
     private sendDrag(state: number) {
+        this.absolute.flush();
         const buffer = new ArrayBuffer(2);
         const view = new DataView(buffer);
         view.setUint8(0, OP_DRAG);
@@ -203,6 +373,18 @@ class RemoteMouseApp {
         this.transport.send(buffer);
     }
 
+    private sendGesture(kind: number, phase: number, fingers: number, magnitude: number) {
+        // [OpCode] [Kind] [Phase] [Fingers] [Magnitude i32]
+        const buffer = new ArrayBuffer(8);
+        const view = new DataView(buffer);
+        view.setUint8(0, OP_GESTURE);
+        view.setUint8(1, kind);
+        view.setUint8(2, phase);
+        view.setUint8(3, fingers);
+        view.setInt32(4, magnitude, false);
+        this.transport.send(buffer);
+    }
+
     private sendText(text: string) {
         if (!text) return;
         const encoder = new TextEncoder();
@@ -0,0 +1,66 @@
+import { i18n } from '../core/i18n';
+import type { UploadEvent } from '../core/upload-worker';
+
+/**
+ * "Send File" setting: uploads picked files to the desktop inbox, one at a time, in a
+ * worker. Upload ids are remembered per file so picking the same file again after an
+ * interruption resumes instead of starting over.
+ */
+export class FileDrop {
+    private input: HTMLInputElement;
+    private status: HTMLElement;
+    private getSessionToken: () => string | null;
+
+    constructor(input: HTMLInputElement, status: HTMLElement, getSessionToken: () => string | null) {
+        this.input = input;
+        this.status = status;
+        this.getSessionToken = getSessionToken;
+
+        this.input.addEventListener('change', () => {
+            const files = Array.from(this.input.files ?? []);
+            this.input.value = '';
+            this.sendAll(files);
+        });
+    }
+
+    private async sendAll(files: File[]) {
+        this.input.disabled = true;
+        for (const file of files) {
+            const ok = await this.send(file);
+            if (!ok) break;
+        }
+        this.input.disabled = false;
+    }
+
+    private send(file: File): Promise<boolean> {
+        const key = `remote-mouse-upload:${file.name}:${file.size}:${file.lastModified}`;
+        const worker = new Worker(new URL('../core/upload-worker.ts', import.meta.url), { type: 'module' });
+
+        return new Promise(resolve => {
+            worker.onmessage = (event: MessageEvent<UploadEvent>) => {
+                const message = event.data;
+                if (message.type === 'created') {
+                    localStorage.setItem(key, message.id);
+                } else if (message.type === 'progress') {
+                    const percent = message.total ? Math.floor(message.sent / message.total * 100) : 100;
+                    this.status.textContent = `${file.name} ${percent}%`;
+                } else {
+                    worker.terminate();
+                    if (message.type === 'done') {
+                        localStorage.removeItem(key);
+                        this.status.textContent = `${file.name} ${i18n.t('settings.send_file_done')}`;
+                    } else {
+                        console.error('File upload failed', message.message);
+                        this.status.textContent = `${file.name} ${i18n.t('settings.send_file_failed')}`;
+                    }
+                    resolve(message.type === 'done');
+                }
+            };
+            worker.postMessage({
+                file,
+                resumeId: localStorage.getItem(key),
+                sessionToken: this.getSessionToken()
+            });
+        });
+    }
+}
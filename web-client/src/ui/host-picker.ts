@@ -0,0 +1,50 @@
+import { i18n } from '../core/i18n';
+import { fetchPeers, peerHost } from '../core/peers';
+
+/**
+ * "Computer" setting: this desktop plus the peers it has discovered. The list is
+ * refreshed whenever the picker is opened.
+ */
+export class HostPicker {
+    private select: HTMLSelectElement;
+    private current = window.location.host;
+
+    constructor(select: HTMLSelectElement, onSelect: (host: string) => void) {
+        this.select = select;
+
+        this.select.addEventListener('focus', () => this.refresh());
+        this.select.addEventListener('change', () => {
+            this.current = this.select.value;
+            onSelect(this.current);
+        });
+        this.render([]);
+    }
+
+    public async refresh() {
+        try {
+            const peers = await fetchPeers();
+            this.render(peers.flatMap(peer => {
+                const host = peerHost(peer);
+                return host ? [{ host, label: peer.name }] : [];
+            }));
+        } catch (e) {
+            console.error('Failed to list peers', e);
+        }
+    }
+
+    private render(peers: { host: string; label: string }[]) {
+        const options = [{ host: window.location.host, label: i18n.t('settings.this_computer') }, ...peers];
+        // Keep a host that dropped off the list selectable while it is in use
+        if (!options.some(option => option.host === this.current)) {
+            options.push({ host: this.current, label: this.current });
+        }
+
+        this.select.replaceChildren(...options.map(({ host, label }) => {
+            const option = document.createElement('option');
+            option.value = host;
+            option.textContent = label;
+            return option;
+        }));
+        this.select.value = this.current;
+    }
+}
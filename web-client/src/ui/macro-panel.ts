@@ -0,0 +1,94 @@
+import { i18n } from '../core/i18n';
+import {
+    MacroClient, cancelMacro, formatMacroScript, parseMacroScript, playMacro, type Macro
+} from '../core/macros';
+
+export interface MacroPanelElements {
+    list: HTMLElement;
+    name: HTMLInputElement;
+    script: HTMLTextAreaElement;
+    save: HTMLButtonElement;
+    stop: HTMLButtonElement;
+    status: HTMLElement;
+}
+
+/**
+ * "Macros" setting: the macros stored on the desktop being controlled, each with a play
+ * button, plus an editor. Tapping a macro's name loads it into the editor; saving under
+ * an existing name replaces it. Playback itself is a single frame on the input socket.
+ */
+export class MacroPanel {
+    private elements: MacroPanelElements;
+    private getClient: () => MacroClient;
+    private send: (data: ArrayBuffer) => void;
+
+    constructor(elements: MacroPanelElements, getClient: () => MacroClient, send: (data: ArrayBuffer) => void) {
+        this.elements = elements;
+        this.getClient = getClient;
+        this.send = send;
+
+        elements.stop.addEventListener('click', () => this.send(cancelMacro()));
+        elements.save.addEventListener('click', () => this.save());
+    }
+
+    public async refresh() {
+        try {
+            this.render(await this.getClient().list());
+        } catch (e) {
+            console.error('Failed to list macros', e);
+            this.render([]);
+        }
+    }
+
+    private async save() {
+        const name = this.elements.name.value.trim();
+        if (!name) return;
+        try {
+            const steps = parseMacroScript(this.elements.script.value);
+            await this.getClient().save(name, steps);
+            this.elements.status.textContent = `${name} ${i18n.t('settings.macro_saved')}`;
+            await this.refresh();
+        } catch (e) {
+            this.elements.status.textContent = e instanceof Error ? e.message : String(e);
+        }
+    }
+
+    private async remove(name: string) {
+        try {
+            await this.getClient().remove(name);
+            await this.refresh();
+        } catch (e) {
+            console.error('Failed to delete macro', e);
+        }
+    }
+
+    private render(macros: Macro[]) {
+        this.elements.list.replaceChildren(...macros.map(macro => {
+            const row = document.createElement('div');
+            row.className = 'macro-row';
+
+            const name = document.createElement('span');
+            name.textContent = macro.name;
+            name.addEventListener('click', () => {
+                this.elements.name.value = macro.name;
+                this.elements.script.value = formatMacroScript(macro.steps);
+            });
+
+            const play = document.createElement('button');
+            play.className = 'pair-btn';
+            play.textContent = i18n.t('settings.macro_play');
+            play.addEventListener('click', () => this.send(playMacro(macro.name)));
+
+            const remove = document.createElement('button');
+            remove.className = 'macro-delete';
+            remove.textContent = i18n.t('settings.macro_delete');
+            remove.addEventListener('click', () => this.remove(macro.name));
+
+            row.append(name, play, remove);
+            return row;
+        }));
+        if (!macros.length) {
+            this.elements.list.textContent = i18n.t('settings.macro_empty');
+        }
+    }
+}
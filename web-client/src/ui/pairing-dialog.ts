@@ -0,0 +1,61 @@
+import { i18n } from '../core/i18n';
+import { pairDevice } from '../core/pairing';
+
+/**
+ * Asks for the code shown under "Pair Device" in the desktop tray. Opened when a
+ * server refuses the connection; a successful pairing reconnects to that server.
+ */
+export class PairingDialog {
+    private modal: HTMLElement;
+    private input: HTMLInputElement;
+    private submitBtn: HTMLButtonElement;
+    private errorEl: HTMLElement;
+    private onPaired: (host: string) => void;
+    private host = window.location.host;
+
+    constructor(
+        modal: HTMLElement,
+        input: HTMLInputElement,
+        submitBtn: HTMLButtonElement,
+        errorEl: HTMLElement,
+        onPaired: (host: string) => void
+    ) {
+        this.modal = modal;
+        this.input = input;
+        this.submitBtn = submitBtn;
+        this.errorEl = errorEl;
+        this.onPaired = onPaired;
+
+        this.submitBtn.addEventListener('click', () => this.submit());
+        this.input.addEventListener('keydown', (e) => {
+            if (e.key === 'Enter') this.submit();
+        });
+    }
+
+    public open(host: string = window.location.host) {
+        this.host = host;
+        this.errorEl.textContent = '';
+        this.input.value = '';
+        this.modal.classList.remove('hidden');
+    }
+
+    private async submit() {
+        const code = this.input.value.trim();
+        if (!code) return;
+
+        this.submitBtn.disabled = true;
+        try {
+            if (await pairDevice(code, navigator.userAgent, this.host)) {
+                this.modal.classList.add('hidden');
+                this.onPaired(this.host);
+            } else {
+                this.errorEl.textContent = i18n.t('pairing.failed');
+            }
+        } catch (e) {
+            console.error('Pairing failed', e);
+            this.errorEl.textContent = i18n.t('pairing.failed');
+        } finally {
+            this.submitBtn.disabled = false;
+        }
+    }
+}
@@ -0,0 +1,68 @@
+import { i18n } from '../core/i18n';
+import { fetchMonitors, type MonitorInfo } from '../core/monitors';
+import { ALL_MONITORS } from '../core/protocol';
+
+const STORAGE_KEY = 'remote-mouse-pointer-mode';
+const RELATIVE = 'relative';
+
+/**
+ * "Pointer" setting: touchpad (relative) or tablet mode on the whole desktop or one
+ * monitor. Monitors are listed from the desktop being controlled whenever the picker
+ * is opened, since the layout may have changed.
+ */
+export class PointerModePicker {
+    private select: HTMLSelectElement;
+    private getHost: () => string | null;
+    private current: string;
+
+    // onChange gets the monitor to map the touchpad to, or null for relative motion
+    constructor(select: HTMLSelectElement, getHost: () => string | null, onChange: (monitor: number | null) => void) {
+        this.select = select;
+        this.getHost = getHost;
+        this.current = localStorage.getItem(STORAGE_KEY) ?? RELATIVE;
+
+        this.select.addEventListener('focus', () => this.refresh());
+        this.select.addEventListener('change', () => {
+            this.current = this.select.value;
+            localStorage.setItem(STORAGE_KEY, this.current);
+            onChange(this.monitor());
+        });
+        this.render([]);
+        onChange(this.monitor());
+    }
+
+    public async refresh() {
+        try {
+            this.render(await fetchMonitors(this.getHost() ?? undefined));
+        } catch (e) {
+            console.error('Failed to list monitors', e);
+        }
+    }
+
+    private monitor(): number | null {
+        return this.current === RELATIVE ? null : parseInt(this.current, 10) || ALL_MONITORS;
+    }
+
+    private render(monitors: MonitorInfo[]) {
+        const options = [
+            { value: RELATIVE, label: i18n.t('settings.pointer_touchpad') },
+            { value: String(ALL_MONITORS), label: i18n.t('settings.pointer_desktop') },
+            ...monitors.map(monitor => ({
+                value: String(monitor.index),
+                label: `${i18n.t('settings.pointer_monitor')} ${monitor.index} (${monitor.width}×${monitor.height})`
+            }))
+        ];
+        // Keep a monitor that isn't listed (yet) selectable while it is in use
+        if (!options.some(option => option.value === this.current)) {
+            options.push({ value: this.current, label: `${i18n.t('settings.pointer_monitor')} ${this.current}` });
+        }
+
+        this.select.replaceChildren(...options.map(({ value, label }) => {
+            const option = document.createElement('option');
+            option.value = value;
+            option.textContent = label;
+            return option;
+        }));
+        this.select.value = this.current;
+    }
+}
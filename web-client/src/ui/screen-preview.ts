@@ -0,0 +1,135 @@
+import { OP_SCREEN_FRAME } from '../core/protocol';
+import { authReply } from '../core/pairing';
+
+const FLAG_WEBP = 0x02;
+
+// [OpCode] [Flags] [Width] [Height] [TileSize] [TileCount]
+const FRAME_HEADER_SIZE = 10;
+// [Column] [Row] [Length]
+const TILE_HEADER_SIZE = 8;
+
+export interface ScreenTile {
+    col: number;
+    row: number;
+    data: Uint8Array;
+}
+
+export interface ScreenFrame {
+    flags: number;
+    width: number;
+    height: number;
+    tileSize: number;
+    tiles: ScreenTile[];
+}
+
+export function parseScreenFrame(buffer: ArrayBuffer): ScreenFrame | null {
+    if (buffer.byteLength < FRAME_HEADER_SIZE) return null;
+
+    const view = new DataView(buffer);
+    if (view.getUint8(0) !== OP_SCREEN_FRAME) return null;
+
+    const frame: ScreenFrame = {
+        flags: view.getUint8(1),
+        width: view.getUint16(2, false),
+        height: view.getUint16(4, false),
+        tileSize: view.getUint16(6, false),
+        tiles: []
+    };
+    const count = view.getUint16(8, false);
+
+    let offset = FRAME_HEADER_SIZE;
+    for (let i = 0; i < count; i++) {
+        if (offset + TILE_HEADER_SIZE > buffer.byteLength) return null;
+        const col = view.getUint16(offset, false);
+        const row = view.getUint16(offset + 2, false);
+        const length = view.getUint32(offset + 4, false);
+        offset += TILE_HEADER_SIZE;
+
+        if (offset + length > buffer.byteLength) return null;
+        frame.tiles.push({ col, row, data: new Uint8Array(buffer, offset, length) });
+        offset += length;
+    }
+
+    return frame;
+}
+
+export class ScreenPreview {
+    private canvas: HTMLCanvasElement;
+    private ctx: CanvasRenderingContext2D | null;
+    private ws: WebSocket | null = null;
+    private url: string;
+    private drawChain: Promise<void> = Promise.resolve();
+
+    constructor(canvas: HTMLCanvasElement, url: string) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext('2d');
+        this.url = url;
+    }
+
+    public setEnabled(enabled: boolean) {
+        if (enabled) {
+            this.start();
+        } else {
+            this.stop();
+        }
+    }
+
+    private start() {
+        if (this.ws) return;
+
+        this.canvas.classList.remove('hidden');
+        const ws = new WebSocket(this.url);
+        ws.binaryType = 'arraybuffer';
+        ws.onmessage = (event: MessageEvent) => {
+            if (event.data instanceof ArrayBuffer) {
+                this.handleFrame(event.data);
+            } else if (typeof event.data === 'string') {
+                const message = JSON.parse(event.data);
+                if (message.type === 'challenge') ws.send(authReply(message.nonce));
+            }
+        };
+        ws.onclose = () => {
+            if (this.ws === ws) {
+                this.ws = null;
+                this.canvas.classList.add('hidden');
+            }
+        };
+        this.ws = ws;
+    }
+
+    private stop() {
+        if (this.ws) {
+            const ws = this.ws;
+            this.ws = null;
+            ws.close();
+        }
+        this.canvas.classList.add('hidden');
+    }
+
+    private handleFrame(buffer: ArrayBuffer) {
+        const frame = parseScreenFrame(buffer);
+        if (!frame || !this.ctx) return;
+
+        if (this.canvas.width !== frame.width || this.canvas.height !== frame.height) {
+            this.canvas.width = frame.width;
+            this.canvas.height = frame.height;
+        }
+
+        const type = frame.flags & FLAG_WEBP ? 'image/webp' : 'image/jpeg';
+        const decoded = Promise.all(
+            frame.tiles.map(tile => createImageBitmap(new Blob([tile.data as BlobPart], { type })))
+        );
+
+        // Decode in parallel, but draw frames strictly in arrival order: tiles are deltas
+        this.drawChain = this.drawChain
+            .then(() => decoded)
+            .then(bitmaps => {
+                bitmaps.forEach((bitmap, i) => {
+                    const tile = frame.tiles[i];
+                    this.ctx!.drawImage(bitmap, tile.col * frame.tileSize, tile.row * frame.tileSize);
+                    bitmap.close();
+                });
+            })
+            .catch(e => console.error('Failed to draw screen frame', e));
+    }
+}
@@ -11,11 +11,15 @@ export class SettingsManager {
     private themeToggle: HTMLInputElement;
     private scrollPosToggle: HTMLInputElement;
     private rateMonitorToggle: HTMLInputElement;
+    private screenPreviewToggle: HTMLInputElement;
+    private clipboardSyncToggle: HTMLInputElement;
     private langSelect: HTMLSelectElement;
 
     private onSensitivityChange: (val: number) => void;
     private onScrollSensitivityChange: (val: number) => void;
     private onRateMonitorChange: (enabled: boolean) => void;
+    private onScreenPreviewChange: (enabled: boolean) => void;
+    private onClipboardSyncChange: (enabled: boolean) => void;
 
     constructor(
         modal: HTMLElement,
@@ -28,10 +32,14 @@ export class SettingsManager {
         themeToggle: HTMLInputElement,
         scrollPosToggle: HTMLInputElement,
         rateMonitorToggle: HTMLInputElement,
+        screenPreviewToggle: HTMLInputElement,
+        clipboardSyncToggle: HTMLInputElement,
         langSelect: HTMLSelectElement,
         onSensitivityChange: (val: number) => void,
         onScrollSensitivityChange: (val: number) => void,
-        onRateMonitorChange: (enabled: boolean) => void
+        onRateMonitorChange: (enabled: boolean) => void,
+        onScreenPreviewChange: (enabled: boolean) => void,
+        onClipboardSyncChange: (enabled: boolean) => void
     ) {
         this.modal = modal;
         this.openBtn = openBtn;
@@ -43,10 +51,14 @@ export class SettingsManager {
         this.themeToggle = themeToggle;
         this.scrollPosToggle = scrollPosToggle;
         this.rateMonitorToggle = rateMonitorToggle;
+        this.screenPreviewToggle = screenPreviewToggle;
+        this.clipboardSyncToggle = clipboardSyncToggle;
         this.langSelect = langSelect;
         this.onSensitivityChange = onSensitivityChange;
         this.onScrollSensitivityChange = onScrollSensitivityChange;
         this.onRateMonitorChange = onRateMonitorChange;
+        this.onScreenPreviewChange = onScreenPreviewChange;
+        this.onClipboardSyncChange = onClipboardSyncChange;
 
         this.init();
     }
@@ -97,6 +109,20 @@ export class SettingsManager {
             this.onRateMonitorChange(true);
         }
 
+        // Load saved screen preview
+        const savedScreenPreview = localStorage.getItem('remote-mouse-screen-preview');
+        if (savedScreenPreview === 'true') {
+            this.screenPreviewToggle.checked = true;
+            this.onScreenPreviewChange(true);
+        }
+
+        // Load saved clipboard sync
+        const savedClipboardSync = localStorage.getItem('remote-mouse-clipboard-sync');
+        if (savedClipboardSync === 'true') {
+            this.clipboardSyncToggle.checked = true;
+            this.onClipboardSyncChange(true);
+        }
+
         // Events
         this.openBtn.addEventListener('click', () => {
             this.modal.classList.remove('hidden');
@@ -160,6 +186,18 @@ export class SettingsManager {
             this.onRateMonitorChange(enabled);
         });
 
+        this.screenPreviewToggle.addEventListener('change', () => {
+            const enabled = this.screenPreviewToggle.checked;
+            localStorage.setItem('remote-mouse-screen-preview', enabled.toString());
+            this.onScreenPreviewChange(enabled);
+        });
+
+        this.clipboardSyncToggle.addEventListener('change', () => {
+            const enabled = this.clipboardSyncToggle.checked;
+            localStorage.setItem('remote-mouse-clipboard-sync', enabled.toString());
+            this.onClipboardSyncChange(enabled);
+        });
+
         this.langSelect.addEventListener('change', () => {
             i18n.setLanguage(this.langSelect.value as 'zh' | 'en');
         });
@@ -0,0 +1,54 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { AbsolutePointer } from '../src/core/absolute';
+import { ABS_SCALE, ALL_MONITORS, OP_MOVE_ABS } from '../src/core/protocol';
+
+describe('AbsolutePointer', () => {
+    let frames: ArrayBuffer[];
+    let callbacks: (() => void)[];
+    let pointer: AbsolutePointer;
+
+    const nextFrame = () => {
+        const due = callbacks;
+        callbacks = [];
+        due.forEach(callback => callback());
+    };
+
+    const decode = (frame: ArrayBuffer) => {
+        const view = new DataView(frame);
+        return [view.getUint8(0), view.getUint8(1), view.getUint16(2, false), view.getUint16(4, false)];
+    };
+
+    beforeEach(() => {
+        frames = [];
+        callbacks = [];
+        pointer = new AbsolutePointer((data) => frames.push(data), (callback) => callbacks.push(callback));
+    });
+
+    it('sends only the latest position per animation frame', () => {
+        pointer.moveTo(0.1, 0.1);
+        pointer.moveTo(0.2, 0.3);
+        pointer.moveTo(0.5, 1);
+        expect(frames).toHaveLength(0);
+        expect(callbacks).toHaveLength(1);
+
+        nextFrame();
+        expect(frames.map(decode)).toEqual([[OP_MOVE_ABS, ALL_MONITORS, Math.round(0.5 * ABS_SCALE), ABS_SCALE]]);
+    });
+
+    it('addresses the chosen monitor and stays on it', () => {
+        pointer.monitor = 2;
+        pointer.moveTo(-0.2, 1.4);
+        nextFrame();
+        expect(frames.map(decode)).toEqual([[OP_MOVE_ABS, 2, 0, ABS_SCALE]]);
+    });
+
+    it('sends at once when flushed before a click', () => {
+        pointer.moveTo(1, 0);
+        pointer.flush();
+        expect(frames).toHaveLength(1);
+
+        // The scheduled frame finds nothing left to send
+        nextFrame();
+        expect(frames).toHaveLength(1);
+    });
+});
@@ -0,0 +1,108 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { ClipboardSync, crc32 } from '../src/core/clipboard';
+import { OP_CLIPBOARD } from '../src/core/protocol';
+
+const KIND_BEGIN = 0x01;
+const KIND_CHUNK = 0x02;
+const KIND_ACK = 0x03;
+const KIND_ABORT = 0x04;
+
+const begin = (id: number, data: Uint8Array) => {
+    const view = new DataView(new ArrayBuffer(14));
+    view.setUint8(0, OP_CLIPBOARD);
+    view.setUint8(1, KIND_BEGIN);
+    view.setUint32(2, id, false);
+    view.setUint32(6, data.length, false);
+    view.setUint32(10, crc32(data), false);
+    return view.buffer;
+};
+
+const chunk = (id: number, seq: number, payload: Uint8Array) => {
+    const frame = new Uint8Array(10 + payload.length);
+    const view = new DataView(frame.buffer);
+    view.setUint8(0, OP_CLIPBOARD);
+    view.setUint8(1, KIND_CHUNK);
+    view.setUint32(2, id, false);
+    view.setUint32(6, seq, false);
+    frame.set(payload, 10);
+    return frame.buffer;
+};
+
+const ack = (id: number, seq: number) => {
+    const view = new DataView(new ArrayBuffer(10));
+    view.setUint8(0, OP_CLIPBOARD);
+    view.setUint8(1, KIND_ACK);
+    view.setUint32(2, id, false);
+    view.setUint32(6, seq, false);
+    return view.buffer;
+};
+
+describe('crc32', () => {
+    it('should match zlib.crc32', () => {
+        expect(crc32(new TextEncoder().encode('123456789'))).toBe(0xCBF43926);
+    });
+
+    it('should support incremental updates', () => {
+        const data = new TextEncoder().encode('hello world');
+        expect(crc32(data.subarray(5), crc32(data.subarray(0, 5)))).toBe(crc32(data));
+    });
+});
+
+describe('ClipboardSync', () => {
+    let sent: Uint8Array[];
+    let onRemoteText: any;
+    let sync: ClipboardSync;
+
+    beforeEach(() => {
+        sent = [];
+        onRemoteText = vi.fn();
+        sync = new ClipboardSync((data) => sent.push(data), { onRemoteText });
+    });
+
+    it('should assemble chunks from the desktop and ack each one', () => {
+        const data = new TextEncoder().encode('你好, desktop');
+        sync.handle(begin(5, data));
+        sync.handle(chunk(5, 0, data.subarray(0, 4)));
+        sync.handle(chunk(5, 1, data.subarray(4)));
+
+        expect(onRemoteText).toHaveBeenCalledWith('你好, desktop');
+        expect(sent.map(frame => frame[1])).toEqual([KIND_ACK, KIND_ACK]);
+    });
+
+    it('should abort on out-of-order chunks', () => {
+        const data = new TextEncoder().encode('abcdef');
+        sync.handle(begin(2, data));
+        sync.handle(chunk(2, 1, data.subarray(3)));
+
+        expect(onRemoteText).not.toHaveBeenCalled();
+        expect(sent[0][1]).toBe(KIND_ABORT);
+    });
+
+    it('should not send content back that just arrived from the desktop', async () => {
+        const data = new TextEncoder().encode('same');
+        sync.handle(begin(1, data));
+        sync.handle(chunk(1, 0, data));
+        sent = [];
+
+        expect(await sync.push('same')).toBe(true);
+        expect(sent).toEqual([]);
+    });
+
+    it('should keep at most four chunks in flight', async () => {
+        const text = 'x'.repeat(32 * 1024 * 6);
+        const pushed = sync.push(text);
+        await Promise.resolve();
+
+        // BEGIN + 4 chunks, then waits for acks
+        expect(sent.map(frame => frame[1])).toEqual([KIND_BEGIN, KIND_CHUNK, KIND_CHUNK, KIND_CHUNK, KIND_CHUNK]);
+
+        const id = new DataView(sent[0].buffer).getUint32(2, false);
+        for (let seq = 0; seq < 6; seq++) {
+            sync.handle(ack(id, seq));
+            await Promise.resolve();
+        }
+
+        expect(await pushed).toBe(true);
+        expect(sent.filter(frame => frame[1] === KIND_CHUNK).length).toBe(6);
+    });
+});
@@ -0,0 +1,24 @@
+import { describe, it, expect } from 'vitest';
+import { sha256, hmacSha256, toHex, fromHex } from '../src/core/hmac';
+
+const text = (value: string) => new TextEncoder().encode(value);
+
+// Expected values from Python's hashlib / hmac
+describe('sha256', () => {
+    it('matches known digests', () => {
+        expect(toHex(sha256(text('')))).toBe('e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855');
+        expect(toHex(sha256(text('a'.repeat(1000))))).toBe('41edece42d63e8d9bf515a9ba6932e1c20cbc9f5a5d134645adb5db1b9737ea3');
+    });
+});
+
+describe('hmacSha256', () => {
+    it('matches the server challenge MAC', () => {
+        const key = fromHex('00112233445566778899aabbccddeeff00112233445566778899aabbccddeeff');
+        expect(toHex(hmacSha256(key, text('deadbeef')))).toBe('608e6d53a451b3d6183ee62baf3a7c1d83fc8373bb5a2a1685a209e561ca84b8');
+    });
+
+    it('hashes keys longer than a block', () => {
+        const key = new Uint8Array(100).fill(7);
+        expect(toHex(hmacSha256(key, text('x'.repeat(70))))).toBe('f772c72d2869758fc8fa798612808494a65c1a10fdbe9307cb75a8649ac26217');
+    });
+});
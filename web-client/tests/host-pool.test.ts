@@ -0,0 +1,108 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { HostPool, loadRecentHosts } from '../src/core/host-pool';
+import { ConnectionStatus } from '../src/core/protocol';
+import type { TransportOptions } from '../src/core/transport';
+import type { WorkerTransport } from '../src/core/worker-transport';
+
+// Stands in for Transport: records connects and lets tests drive its callbacks
+class FakeTransport {
+    connect = vi.fn();
+    disconnect = vi.fn();
+    state: [ConnectionStatus, string] = [ConnectionStatus.Connecting, 'status.connecting'];
+
+    constructor(public options: TransportOptions) {}
+
+    getState() {
+        return this.state;
+    }
+}
+
+describe('HostPool', () => {
+    const self = window.location.host;
+    let created: FakeTransport[];
+    let callbacks: { onStateChange: any; onMessage: any; onUnauthorized: any };
+    let pool: HostPool;
+
+    beforeEach(() => {
+        localStorage.clear();
+        created = [];
+        callbacks = { onStateChange: vi.fn(), onMessage: vi.fn(), onUnauthorized: vi.fn() };
+        pool = new HostPool(callbacks, (options) => {
+            const transport = new FakeTransport(options);
+            created.push(transport);
+            return transport as unknown as WorkerTransport;
+        });
+    });
+
+    it('switches back to a warm socket without reconnecting', () => {
+        const home = pool.activate(self);
+        pool.activate('10.0.0.2:9997');
+        expect(created).toHaveLength(2);
+        expect(created[1].connect).toHaveBeenCalledWith('ws://10.0.0.2:9997/ws');
+
+        expect(pool.activate(self)).toBe(home);
+        expect(created).toHaveLength(2);
+        expect(created[0].connect).toHaveBeenCalledTimes(1);
+        expect(pool.host).toBe(self);
+    });
+
+    it('reports the state of the host switched to', () => {
+        pool.activate(self);
+        pool.activate('10.0.0.2:9997');
+        created[0].state = [ConnectionStatus.Connected, 'status.connected'];
+
+        pool.activate(self);
+        expect(callbacks.onStateChange).toHaveBeenLastCalledWith(ConnectionStatus.Connected, 'status.connected');
+    });
+
+    it('forwards only the active host', () => {
+        pool.activate(self);
+        pool.activate('10.0.0.2:9997');
+        const data = new ArrayBuffer(1);
+
+        created[0].options.onMessage!(data);
+        created[0].options.onStateChange!(ConnectionStatus.Disconnected, 'status.disconnected');
+        expect(callbacks.onMessage).not.toHaveBeenCalled();
+        expect(callbacks.onStateChange).not.toHaveBeenCalledWith(ConnectionStatus.Disconnected, 'status.disconnected');
+
+        created[1].options.onMessage!(data);
+        expect(callbacks.onMessage).toHaveBeenCalledWith(data);
+    });
+
+    it('closes the least recently used socket but keeps this desktop', () => {
+        pool.activate(self);
+        pool.activate('10.0.0.2:9997');
+        pool.activate('10.0.0.3:9997');
+        pool.activate('10.0.0.4:9997');
+
+        expect(created[0].disconnect).not.toHaveBeenCalled();
+        expect(created[1].disconnect).toHaveBeenCalled();
+        expect(pool.get('10.0.0.2:9997')).toBeUndefined();
+    });
+
+    it('remembers recent hosts and prewarms them', () => {
+        pool.activate(self);
+        pool.activate('10.0.0.2:9997');
+        expect(loadRecentHosts()).toEqual(['10.0.0.2:9997', self]);
+
+        const next = new HostPool(callbacks, (options) => new FakeTransport(options) as unknown as WorkerTransport);
+        next.activate(self);
+        next.prewarm(loadRecentHosts().filter(host => host !== self));
+
+        const warm = next.get('10.0.0.2:9997') as unknown as FakeTransport;
+        expect(warm.connect).toHaveBeenCalled();
+        expect(next.host).toBe(self);
+    });
+
+    it('asks for pairing only for the active host', () => {
+        pool.activate('10.0.0.2:9997');
+        pool.prewarm(['10.0.0.3:9997']);
+
+        created[1].options.onUnauthorized!();
+        expect(callbacks.onUnauthorized).not.toHaveBeenCalled();
+        expect(pool.get('10.0.0.3:9997')).toBeUndefined();
+
+        created[0].options.onUnauthorized!();
+        expect(callbacks.onUnauthorized).toHaveBeenCalledWith('10.0.0.2:9997');
+    });
+});
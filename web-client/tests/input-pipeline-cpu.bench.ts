@@ -0,0 +1,106 @@
+import { bench, describe, vi } from 'vitest';
+import { TouchpadHandler } from '../src/input/touchpad';
+import { OP_MOVE } from '../src/core/protocol';
+import { InputRing } from '../src/core/input-ring';
+import { SocketWorker } from '../src/core/worker-transport';
+
+/**
+ * CPU time per display frame of the pointer pipeline: the work done from a frame's worth
+ * of pointer events reaching the touchpad to the last byte handed to the socket, with the
+ * frame flush run synchronously. It does not include the wait for the next animation
+ * frame, so it is not event-to-send latency. Run with `npm run bench`. A touch screen sampling at 240 Hz delivers four samples per
+ * 60 Hz frame; browsers that coalesce them fire one event carrying all four.
+ */
+
+const SAMPLES_PER_FRAME = 4;
+
+class SinkWebSocket {
+    static OPEN = 1;
+    readyState = 1;
+    binaryType = 'arraybuffer';
+    onopen: (() => void) | null = null;
+    onclose: (() => void) | null = null;
+    onerror: (() => void) | null = null;
+    onmessage: (() => void) | null = null;
+    bytes = 0;
+
+    send(data: ArrayBuffer) {
+        this.bytes += data.byteLength;
+    }
+
+    close() {}
+}
+
+vi.stubGlobal('WebSocket', SinkWebSocket);
+
+function touchpad(onMove: (dx: number, dy: number) => void) {
+    const element = document.createElement('div');
+    element.setPointerCapture = () => {};
+    element.releasePointerCapture = () => {};
+    new TouchpadHandler(element, { onMove, onClick: () => {}, onScroll: () => {}, onDrag: () => {} });
+    element.dispatchEvent(new PointerEvent('pointerdown', { pointerId: 1, clientX: 0, clientY: 0 }));
+    return element;
+}
+
+let x = 0;
+
+// One frame of motion: four separate events, or one event carrying them as coalesced samples
+function frameEvents(coalesce: boolean): PointerEvent[] {
+    const samples = [];
+    for (let i = 0; i < SAMPLES_PER_FRAME; i++) {
+        x += 1.5;
+        samples.push(new PointerEvent('pointermove', { pointerId: 1, clientX: x, clientY: x / 2 }));
+    }
+    if (!coalesce) return samples;
+    const event = samples[samples.length - 1];
+    Object.defineProperty(event, 'getCoalescedEvents', { value: () => samples });
+    return [event];
+}
+
+describe('pointer pipeline CPU time per frame', () => {
+    // Before: accumulate, encode and send on the UI thread for every event
+    const legacySocket = new SinkWebSocket();
+    const moveBuffer = new ArrayBuffer(5);
+    const moveView = new DataView(moveBuffer);
+    let accumulatorX = 0;
+    let accumulatorY = 0;
+    const legacy = touchpad((dx, dy) => {
+        accumulatorX += dx;
+        accumulatorY += dy;
+        const stepX = Math.trunc(accumulatorX);
+        const stepY = Math.trunc(accumulatorY);
+        if (stepX === 0 && stepY === 0) return;
+        accumulatorX -= stepX;
+        accumulatorY -= stepY;
+        moveView.setUint8(0, OP_MOVE);
+        moveView.setInt16(1, stepX, false);
+        moveView.setInt16(3, stepY, false);
+        legacySocket.send(moveBuffer);
+    });
+
+    bench('per-event encode and send on the UI thread', () => {
+        for (const event of frameEvents(false)) legacy.dispatchEvent(event);
+    });
+
+    // After: samples go into the ring; one slab per frame is encoded by the socket host.
+    // In the browser that half runs in the worker, in parallel with the UI thread
+    let flushFrame: (() => void) | null = null;
+    const transport = new SocketWorker().create({}, (callback) => { flushFrame = callback; });
+    transport.connect('ws://localhost/ws');
+    const pipeline = touchpad((dx, dy) => transport.move(dx, dy));
+
+    bench('coalesced samples through the ring, flushed per frame', () => {
+        for (const event of frameEvents(true)) pipeline.dispatchEvent(event);
+        flushFrame?.();
+        flushFrame = null;
+    });
+
+    // The share of the above that stays on the UI thread
+    const ring: InputRing = new InputRing((slab) => ring.recycle(slab), () => {});
+    const uiThread = touchpad((dx, dy) => ring.push(dx, dy));
+
+    bench('coalesced samples into the ring only (UI thread share)', () => {
+        for (const event of frameEvents(true)) uiThread.dispatchEvent(event);
+        ring.flush();
+    });
+});
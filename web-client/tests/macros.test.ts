@@ -0,0 +1,46 @@
+import { describe, it, expect } from 'vitest';
+import { cancelMacro, formatMacroScript, parseMacroScript, playMacro } from '../src/core/macros';
+import { MacroCommand, OP_MACRO } from '../src/core/protocol';
+
+describe('macro scripts', () => {
+    const script = [
+        'text Best regards,',
+        'key enter',
+        'key ctrl+shift+t',
+        'click left 2',
+        'click right',
+        'wait 250'
+    ].join('\n');
+
+    it('parses one step per line', () => {
+        expect(parseMacroScript(script + '\n\n')).toEqual([
+            { text: 'Best regards,' },
+            { key: 'enter' },
+            { key: 't', modifiers: ['ctrl', 'shift'] },
+            { click: 'left', count: 2 },
+            { click: 'right' },
+            { delay: 0.25 }
+        ]);
+    });
+
+    it('formats steps back into the same script', () => {
+        expect(formatMacroScript(parseMacroScript(script))).toBe(script);
+    });
+
+    it('keeps text exactly as typed', () => {
+        expect(parseMacroScript('text   two  spaces ')).toEqual([{ text: '  two  spaces ' }]);
+    });
+
+    it('reports the offending line', () => {
+        expect(() => parseMacroScript('key enter\nclick sideways')).toThrow('Line 2');
+        expect(() => parseMacroScript('wait soon')).toThrow('Line 1');
+        expect(() => parseMacroScript('jump')).toThrow('Line 1');
+    });
+});
+
+describe('macro frames', () => {
+    it('encodes play with the name and cancel without', () => {
+        expect(Array.from(new Uint8Array(playMacro('hé')))).toEqual([OP_MACRO, MacroCommand.Play, 0x68, 0xC3, 0xA9]);
+        expect(Array.from(new Uint8Array(cancelMacro()))).toEqual([OP_MACRO, MacroCommand.Cancel]);
+    });
+});
@@ -0,0 +1,29 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { loadCredentials } from '../src/core/pairing';
+
+describe('pairing storage', () => {
+    const self = window.location.host;
+
+    beforeEach(() => {
+        localStorage.clear();
+    });
+
+    it('should move a pairing saved by an older client to the serving host', () => {
+        localStorage.setItem('remote-mouse-device', JSON.stringify({ device: 'phone', key: 'ab' }));
+
+        expect(loadCredentials()).toEqual({ device: 'phone', key: 'ab' });
+        expect(loadCredentials('10.0.0.7:9997')).toBeNull();
+        expect(localStorage.getItem('remote-mouse-device')).toBeNull();
+        expect(JSON.parse(localStorage.getItem('remote-mouse-devices')!)).toEqual({
+            [self]: { device: 'phone', key: 'ab' }
+        });
+    });
+
+    it('should keep existing per-host pairings over the old entry', () => {
+        localStorage.setItem('remote-mouse-device', JSON.stringify({ device: 'old', key: 'ab' }));
+        localStorage.setItem('remote-mouse-devices', JSON.stringify({ [self]: { device: 'new', key: 'cd' } }));
+
+        expect(loadCredentials()?.device).toBe('new');
+        expect(localStorage.getItem('remote-mouse-device')).toBeNull();
+    });
+});
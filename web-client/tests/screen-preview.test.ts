@@ -0,0 +1,58 @@
+import { describe, it, expect } from 'vitest';
+import { parseScreenFrame } from '../src/ui/screen-preview';
+import { OP_SCREEN_FRAME } from '../src/core/protocol';
+
+// Build a frame the same way the server's pack_frame does
+const packFrame = (tiles: { col: number, row: number, data: number[] }[], flags = 0) => {
+    const size = 10 + tiles.reduce((sum, t) => sum + 8 + t.data.length, 0);
+    const buffer = new ArrayBuffer(size);
+    const view = new DataView(buffer);
+    view.setUint8(0, OP_SCREEN_FRAME);
+    view.setUint8(1, flags);
+    view.setUint16(2, 192, false);
+    view.setUint16(4, 128, false);
+    view.setUint16(6, 64, false);
+    view.setUint16(8, tiles.length, false);
+
+    let offset = 10;
+    for (const tile of tiles) {
+        view.setUint16(offset, tile.col, false);
+        view.setUint16(offset + 2, tile.row, false);
+        view.setUint32(offset + 4, tile.data.length, false);
+        new Uint8Array(buffer, offset + 8, tile.data.length).set(tile.data);
+        offset += 8 + tile.data.length;
+    }
+    return buffer;
+};
+
+describe('parseScreenFrame', () => {
+    it('should parse header and tiles', () => {
+        const frame = parseScreenFrame(packFrame([
+            { col: 2, row: 1, data: [1, 2, 3] },
+            { col: 0, row: 0, data: [4] }
+        ], 1));
+
+        expect(frame).not.toBeNull();
+        expect(frame!.flags).toBe(1);
+        expect(frame!.width).toBe(192);
+        expect(frame!.height).toBe(128);
+        expect(frame!.tileSize).toBe(64);
+        expect(frame!.tiles.length).toBe(2);
+        expect(frame!.tiles[0].col).toBe(2);
+        expect(frame!.tiles[0].row).toBe(1);
+        expect(Array.from(frame!.tiles[0].data)).toEqual([1, 2, 3]);
+        expect(Array.from(frame!.tiles[1].data)).toEqual([4]);
+    });
+
+    it('should reject truncated frames', () => {
+        const buffer = packFrame([{ col: 0, row: 0, data: [1, 2, 3] }]);
+        expect(parseScreenFrame(buffer.slice(0, buffer.byteLength - 1))).toBeNull();
+        expect(parseScreenFrame(buffer.slice(0, 4))).toBeNull();
+    });
+
+    it('should reject other opcodes', () => {
+        const buffer = packFrame([]);
+        new DataView(buffer).setUint8(0, 0x01);
+        expect(parseScreenFrame(buffer)).toBeNull();
+    });
+});
@@ -63,19 +63,15 @@ describe('ScrollStripHandler', () => {
         expect(onScroll).toHaveBeenCalledWith(0, 10);
     });
 
-    it('should accumulate small movements based on sensitivity', () => {
+    it('should send sub-step movements based on sensitivity', () => {
         handler.setSensitivity(0.5);
 
         // Down
         element.dispatchEvent(new PointerEvent('pointerdown', { pointerId: 1, clientY: 100 }));
 
-        // Move 1px -> 0.5 scroll units (truncates to 0, no event)
+        // Move 1px -> 0.5 scroll units, no longer truncated away
         element.dispatchEvent(new PointerEvent('pointermove', { pointerId: 1, clientY: 101 }));
-        expect(onScroll).not.toHaveBeenCalled();
-
-        // Move another 1px -> total 2px -> 1.0 scroll units
-        element.dispatchEvent(new PointerEvent('pointermove', { pointerId: 1, clientY: 102 }));
-        expect(onScroll).toHaveBeenCalledWith(0, 1);
+        expect(onScroll).toHaveBeenCalledWith(0, 0.5);
     });
 
     it('should handle negative scrolling (upwards)', () => {
@@ -0,0 +1,89 @@
+import { describe, it, expect, beforeEach } from 'vitest';
+import { ScrollCoalescer } from '../src/core/scroll';
+import { OP_SCROLL_HIRES, SCROLL_UNITS_PER_STEP } from '../src/core/protocol';
+
+describe('ScrollCoalescer', () => {
+    let frames: ArrayBuffer[];
+    let callbacks: (() => void)[];
+    let scroll: ScrollCoalescer;
+
+    // Runs the callbacks scheduled for the next animation frame
+    const nextFrame = () => {
+        const due = callbacks;
+        callbacks = [];
+        due.forEach(callback => callback());
+    };
+
+    const decode = (frame: ArrayBuffer) => {
+        const view = new DataView(frame);
+        return [view.getUint8(0), view.getInt16(1, false), view.getInt16(3, false)];
+    };
+
+    beforeEach(() => {
+        frames = [];
+        callbacks = [];
+        scroll = new ScrollCoalescer((data) => frames.push(data), (callback) => callbacks.push(callback));
+    });
+
+    it('sends one frame per animation frame', () => {
+        // Four pointer events within one display frame
+        scroll.add(0, 3);
+        scroll.add(0, 3);
+        scroll.add(1, 3);
+        scroll.add(0, 3);
+        expect(frames).toHaveLength(0);
+
+        nextFrame();
+        expect(frames.map(decode)).toEqual([[OP_SCROLL_HIRES, SCROLL_UNITS_PER_STEP, 12 * SCROLL_UNITS_PER_STEP]]);
+        expect(callbacks).toHaveLength(0);
+    });
+
+    it('keeps sub-step motion instead of rounding it away', () => {
+        // A slow scroll: 0.25 step per pointer event, one event per display frame
+        for (let i = 0; i < 8; i++) {
+            scroll.add(0, 0.25);
+            nextFrame();
+        }
+
+        const units = frames.map(frame => decode(frame)[2]);
+        // Evenly spaced output, one frame per display frame, nothing lost
+        expect(units).toEqual(Array(8).fill(SCROLL_UNITS_PER_STEP / 4));
+    });
+
+    it('needs fewer packets than one per integer step', () => {
+        // The same two-finger gesture: 60 pointer events of 2.5px, four per display frame
+        const deltas = Array(60).fill(2.5);
+
+        // Previous behaviour: truncate per event, one OP_SCROLL packet per non-zero step
+        let accumulator = 0;
+        let legacyPackets = 0;
+        for (const dy of deltas) {
+            accumulator += dy;
+            const step = Math.trunc(accumulator);
+            if (step !== 0) {
+                accumulator -= step;
+                legacyPackets++;
+            }
+        }
+
+        deltas.forEach((dy, i) => {
+            scroll.add(0, dy);
+            if (i % 4 === 3) nextFrame();
+        });
+        nextFrame();
+
+        const total = frames.reduce((sum, frame) => sum + decode(frame)[2], 0);
+        expect(total).toBe(60 * 2.5 * SCROLL_UNITS_PER_STEP);
+        expect(frames.length).toBe(15);
+        expect(frames.length).toBeLessThan(legacyPackets);
+    });
+
+    it('splits a flick larger than one frame can carry', () => {
+        scroll.add(0, 300);
+        nextFrame();
+        nextFrame();
+
+        const units = frames.map(frame => decode(frame)[2]);
+        expect(units).toEqual([0x7FFF, 300 * SCROLL_UNITS_PER_STEP - 0x7FFF]);
+    });
+});
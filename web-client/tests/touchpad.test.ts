@@ -1,5 +1,6 @@
 import { describe, it, expect, vi, beforeEach } from 'vitest';
 import { TouchpadHandler } from '../src/input/touchpad';
+import { GestureKind, GesturePhase } from '../src/core/protocol';
 
 describe('TouchpadHandler', () => {
     let element: HTMLElement;
@@ -47,7 +48,7 @@ describe('TouchpadHandler', () => {
         element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
 
         // Small move (ignored by hasMoved check > 1, but might accumulate?)
-        // The code: abs(rawDx) > 1 sets hasMoved=true.
+        // More than 1px from the touch point sets hasMoved=true.
         // Let's move 10px
         element.dispatchEvent(createEvent('pointermove', 1, 110, 100));
 
@@ -60,6 +61,65 @@ describe('TouchpadHandler', () => {
         expect(callbacks.onClick).not.toHaveBeenCalled();
     });
 
+    it('should follow the coalesced samples of a move', () => {
+        handler.setSensitivity(1);
+        element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
+
+        // Out and back within one frame: the final position alone shows no motion
+        const event = createEvent('pointermove', 1, 100, 100);
+        const samples = [createEvent('pointermove', 1, 110, 100), createEvent('pointermove', 1, 100, 100)];
+        Object.defineProperty(event, 'getCoalescedEvents', { value: () => samples });
+        element.dispatchEvent(event);
+
+        expect(callbacks.onMove.mock.calls).toEqual([[10, 0], [-10, 0]]);
+
+        element.dispatchEvent(createEvent('pointerup', 1, 100, 100));
+        expect(callbacks.onClick).not.toHaveBeenCalled();
+    });
+
+    it('should not tap after a slow drag made of sub-pixel samples', () => {
+        // Twenty half-pixel steps down per frame, over three frames
+        const slowMove = (id: number, x: number) => {
+            for (let frame = 1; frame <= 3; frame++) {
+                const samples = Array.from({ length: 20 }, (_, i) =>
+                    createEvent('pointermove', id, x, 100 + (frame - 1) * 10 + (i + 1) * 0.5));
+                const event = createEvent('pointermove', id, x, 100 + frame * 10);
+                Object.defineProperty(event, 'getCoalescedEvents', { value: () => samples });
+                element.dispatchEvent(event);
+            }
+        };
+
+        element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
+        slowMove(1, 100);
+        element.dispatchEvent(createEvent('pointerup', 1, 100, 130));
+
+        expect(callbacks.onMove).toHaveBeenCalledTimes(60);
+        expect(callbacks.onClick).not.toHaveBeenCalled();
+
+        // The same slow motion with two fingers is a scroll, not a right click
+        element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
+        element.dispatchEvent(createEvent('pointerdown', 2, 140, 100));
+        slowMove(1, 100);
+        element.dispatchEvent(createEvent('pointerup', 2, 140, 100));
+        element.dispatchEvent(createEvent('pointerup', 1, 100, 130));
+
+        expect(callbacks.onScroll).toHaveBeenCalled();
+        expect(callbacks.onClick).not.toHaveBeenCalled();
+    });
+
+    it('should report positions across the touchpad in tablet mode', () => {
+        callbacks.onPosition = vi.fn();
+        element.getBoundingClientRect = () => ({ left: 0, top: 50, width: 400, height: 200 } as DOMRect);
+        handler.setAbsolute(true);
+
+        element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
+        element.dispatchEvent(createEvent('pointermove', 1, 300, 250));
+        element.dispatchEvent(createEvent('pointerup', 1, 300, 250));
+
+        expect(callbacks.onPosition.mock.calls).toEqual([[0.25, 0.25], [0.75, 1]]);
+        expect(callbacks.onMove).not.toHaveBeenCalled();
+    });
+
     it('should trigger Right Click (2) on two finger tap', () => {
         // Finger 1 down
         element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
@@ -87,20 +147,36 @@ describe('TouchpadHandler', () => {
         expect(callbacks.onMove).not.toHaveBeenCalled();
     });
 
-    it('should respect scroll sensitivity and accumulation', () => {
+    it('should scale scroll by sensitivity without truncating', () => {
         handler.setScrollSensitivity(0.5);
 
         // Finger 1 & 2 down
         element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
         element.dispatchEvent(createEvent('pointerdown', 2, 120, 100));
 
-        // Move 1px (dy=1 * 0.5 = 0.5) -> No scroll event yet
+        // Move 1px (dy=1 * 0.5 = 0.5) -> sub-step scroll is sent as is
         element.dispatchEvent(createEvent('pointermove', 1, 100, 101));
-        expect(callbacks.onScroll).not.toHaveBeenCalled();
+        expect(callbacks.onScroll).toHaveBeenCalledWith(0, 0.5);
+    });
+
+    it('should send a pinch gesture instead of scrolling when fingers spread', () => {
+        // The handler reads callbacks lazily, so the optional one can be added afterwards
+        callbacks.onGesture = vi.fn();
+
+        element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
+        element.dispatchEvent(createEvent('pointerdown', 2, 200, 100));
 
-        // Move another 1px (total dy=2 * 0.5 = 1.0) -> Scroll event (0, 1)
-        element.dispatchEvent(createEvent('pointermove', 1, 100, 102));
-        expect(callbacks.onScroll).toHaveBeenCalledWith(0, 1);
+        // Spread from 100px to 150px apart
+        element.dispatchEvent(createEvent('pointermove', 2, 250, 100));
+        element.dispatchEvent(createEvent('pointerup', 2, 250, 100));
+
+        expect(callbacks.onGesture.mock.calls).toEqual([
+            [GestureKind.Pinch, GesturePhase.Begin, 2, 1000],
+            [GestureKind.Pinch, GesturePhase.Update, 2, 1500],
+            [GestureKind.Pinch, GesturePhase.End, 2, 1500]
+        ]);
+        expect(callbacks.onScroll).not.toHaveBeenCalled();
+        expect(callbacks.onClick).not.toHaveBeenCalled();
     });
 
     it('should trigger Drag start/end on three fingers', () => {
@@ -110,6 +186,7 @@ describe('TouchpadHandler', () => {
         expect(callbacks.onDrag).not.toHaveBeenCalled();
 
         element.dispatchEvent(createEvent('pointerdown', 3, 120, 100));
+        element.dispatchEvent(createEvent('pointermove', 1, 105, 100));
 
         expect(callbacks.onDrag).toHaveBeenCalledWith(true);
 
@@ -119,6 +196,57 @@ describe('TouchpadHandler', () => {
         expect(callbacks.onDrag).toHaveBeenCalledWith(false);
     });
 
+    it('should start a drag when three fingers rest without moving', () => {
+        vi.useFakeTimers();
+        try {
+            element.dispatchEvent(createEvent('pointerdown', 1, 100, 100));
+            element.dispatchEvent(createEvent('pointerdown', 2, 110, 100));
+            element.dispatchEvent(createEvent('pointerdown', 3, 120, 100));
+            expect(callbacks.onDrag).not.toHaveBeenCalled();
+
+            vi.advanceTimersByTime(200);
+            expect(callbacks.onDrag).toHaveBeenCalledWith(true);
+        } finally {
+            vi.useRealTimers();
+        }
+    });
+
+    it('should send a four finger swipe without dragging or clicking', () => {
+        vi.useFakeTimers();
+        try {
+            callbacks.onGesture = vi.fn();
+            const fingers = [1, 2, 3, 4];
+            fingers.forEach(id => element.dispatchEvent(createEvent('pointerdown', id, 100 + id * 20, 300)));
+            // Fingers travel left together, 30px per step
+            for (let step = 1; step <= 3; step++) {
+                fingers.forEach(id => element.dispatchEvent(
+                    createEvent('pointermove', id, 100 + id * 20 - step * 30, 300)
+                ));
+            }
+            fingers.forEach(id => element.dispatchEvent(createEvent('pointerup', id, 100 + id * 20 - 90, 300)));
+            vi.advanceTimersByTime(500);
+
+            const calls = callbacks.onGesture.mock.calls;
+            expect(calls[0]).toEqual([GestureKind.SwipeLeft, GesturePhase.Begin, 4, 0]);
+            expect(calls.at(-1)).toEqual([GestureKind.SwipeLeft, GesturePhase.End, 4, 90]);
+            expect(calls.filter((call: number[]) => call[1] === GesturePhase.End)).toHaveLength(1);
+            expect(callbacks.onDrag).not.toHaveBeenCalled();
+            expect(callbacks.onClick).not.toHaveBeenCalled();
+            expect(callbacks.onMove).not.toHaveBeenCalled();
+        } finally {
+            vi.useRealTimers();
+        }
+    });
+
+    it('should not swipe when four fingers barely move', () => {
+        callbacks.onGesture = vi.fn();
+        [1, 2, 3, 4].forEach(id => element.dispatchEvent(createEvent('pointerdown', id, 100 + id * 20, 300)));
+        element.dispatchEvent(createEvent('pointermove', 1, 110, 300));
+        [1, 2, 3, 4].forEach(id => element.dispatchEvent(createEvent('pointerup', id, 100 + id * 20, 300)));
+
+        expect(callbacks.onGesture).not.toHaveBeenCalled();
+    });
+
     it('should prevent default on touch and contextmenu events', () => {
         const events = ['touchstart', 'touchmove', 'touchend', 'touchcancel', 'contextmenu'];
 
@@ -1,6 +1,8 @@
 import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
 import { Transport } from '../src/core/transport';
-import { ConnectionStatus } from '../src/core/protocol';
+import { ConnectionStatus, OP_PING } from '../src/core/protocol';
+import { WS_CLOSE_UNAUTHORIZED } from '../src/core/pairing';
+import { hmacSha256, fromHex, toHex } from '../src/core/hmac';
 
 // Mock WebSocket
 class MockWebSocket {
@@ -11,8 +13,9 @@ class MockWebSocket {
 
     static instances: MockWebSocket[] = [];
     onopen: (() => void) | null = null;
-    onclose: (() => void) | null = null;
+    onclose: ((event: { code: number }) => void) | null = null;
     onerror: ((err: any) => void) | null = null;
+    onmessage: ((event: any) => void) | null = null;
     readyState: number = MockWebSocket.CONNECTING;
     binaryType = 'blob';
 
@@ -23,7 +26,7 @@ class MockWebSocket {
     send = vi.fn();
     close = vi.fn(() => {
         this.readyState = MockWebSocket.CLOSED;
-        if (this.onclose) this.onclose();
+        if (this.onclose) this.onclose({ code: 1000 });
     });
 
     // Helper to simulate connection open
@@ -32,10 +35,15 @@ class MockWebSocket {
         if (this.onopen) this.onopen();
     }
 
+    // Helper to simulate a server message
+    receive(data: any) {
+        if (this.onmessage) this.onmessage({ data });
+    }
+
     // Helper to simulate connection close
-    terminate() {
+    terminate(code = 1006) {
         this.readyState = MockWebSocket.CLOSED;
-        if (this.onclose) this.onclose();
+        if (this.onclose) this.onclose({ code });
     }
 }
 
@@ -69,7 +77,7 @@ describe('Transport', () => {
         expect(onStateChange).toHaveBeenCalledWith(ConnectionStatus.Connected, 'status.connected');
     });
 
-    it('should attempt reconnect after 3 seconds on close', () => {
+    it('should attempt reconnect quickly on close', () => {
         transport.connect('ws://localhost/ws');
         const ws = MockWebSocket.instances[0];
         ws.open();
@@ -81,14 +89,101 @@ describe('Transport', () => {
         // Should not have reconnected yet
         expect(MockWebSocket.instances.length).toBe(1);
 
-        // Fast forward 3 seconds
-        vi.advanceTimersByTime(3000);
+        // First retry happens after the base backoff delay
+        vi.advanceTimersByTime(100);
 
         // Should have created a new connection
         expect(MockWebSocket.instances.length).toBe(2);
         expect(onStateChange).toHaveBeenLastCalledWith(ConnectionStatus.Connecting, 'status.connecting');
     });
 
+    it('should back off exponentially while the server is unreachable', () => {
+        transport.connect('ws://localhost/ws');
+
+        MockWebSocket.instances[0].terminate();
+        vi.advanceTimersByTime(100);
+        expect(MockWebSocket.instances.length).toBe(2);
+
+        MockWebSocket.instances[1].terminate();
+        vi.advanceTimersByTime(100);
+        expect(MockWebSocket.instances.length).toBe(2);
+        vi.advanceTimersByTime(100);
+        expect(MockWebSocket.instances.length).toBe(3);
+
+        // A successful connection resets the backoff
+        MockWebSocket.instances[2].open();
+        MockWebSocket.instances[2].terminate();
+        vi.advanceTimersByTime(100);
+        expect(MockWebSocket.instances.length).toBe(4);
+    });
+
+    it('should resume the session token on reconnect', () => {
+        transport.connect('ws://localhost/ws');
+        const ws = MockWebSocket.instances[0];
+        ws.open();
+        ws.receive(JSON.stringify({ type: 'session', token: 'abc', resumed: false }));
+
+        ws.terminate();
+        vi.advanceTimersByTime(100);
+
+        expect(MockWebSocket.instances[1].url).toBe('ws://localhost/ws?session=abc');
+    });
+
+    it('should detect a dead peer within a second via heartbeat', () => {
+        transport.connect('ws://localhost/ws');
+        const ws = MockWebSocket.instances[0];
+        ws.open();
+
+        // Pings go out, but no pong ever comes back
+        vi.advanceTimersByTime(250);
+        expect(ws.send).toHaveBeenCalled();
+
+        vi.advanceTimersByTime(750);
+        expect(ws.close).toHaveBeenCalled();
+        expect(onStateChange).toHaveBeenCalledWith(ConnectionStatus.Disconnected, 'status.disconnected');
+    });
+
+    it('should stay connected while pongs arrive', () => {
+        transport.connect('ws://localhost/ws');
+        const ws = MockWebSocket.instances[0];
+        ws.open();
+
+        for (let i = 0; i < 8; i++) {
+            vi.advanceTimersByTime(250);
+            ws.receive(new Uint8Array([OP_PING]).buffer);
+        }
+
+        expect(ws.close).not.toHaveBeenCalled();
+    });
+
+    it('should answer the pairing challenge with an HMAC of the nonce', () => {
+        const key = '00'.repeat(32);
+        localStorage.setItem('remote-mouse-devices', JSON.stringify({ localhost: { device: 'phone', key } }));
+
+        transport.connect('ws://localhost/ws');
+        const ws = MockWebSocket.instances[0];
+        ws.open();
+        ws.receive(JSON.stringify({ type: 'challenge', nonce: 'abcd' }));
+
+        const reply = JSON.parse(ws.send.mock.calls[0][0]);
+        expect(reply.device).toBe('phone');
+        expect(reply.mac).toBe(toHex(hmacSha256(fromHex(key), new TextEncoder().encode('abcd'))));
+        localStorage.removeItem('remote-mouse-devices');
+    });
+
+    it('should stop reconnecting when the device is not paired', () => {
+        const onUnauthorized = vi.fn();
+        transport = new Transport({ onStateChange, onUnauthorized });
+        transport.connect('ws://localhost/ws');
+        const ws = MockWebSocket.instances[0];
+        ws.open();
+        ws.terminate(WS_CLOSE_UNAUTHORIZED);
+
+        vi.advanceTimersByTime(5000);
+        expect(onUnauthorized).toHaveBeenCalledOnce();
+        expect(MockWebSocket.instances.length).toBe(1);
+    });
+
     it('should send data only when connected', () => {
         transport.connect('ws://localhost/ws');
         const ws = MockWebSocket.instances[0];
@@ -103,5 +198,6 @@ describe('Transport', () => {
         ws.open();
         transport.send(data);
         expect(ws.send).toHaveBeenCalledWith(data);
+        expect(transport.getMetrics().packetsSent).toBe(1);
     });
 });
@@ -0,0 +1,150 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { uploadFile, crc32OfPrefix } from '../src/core/upload';
+import { crc32 } from '../src/core/clipboard';
+
+// In-memory stand-in for the /api/inbox/uploads endpoints
+class FakeInbox {
+    data = new Uint8Array(0);
+    size = 0;
+    crc = 0;
+    exists = false;
+    patches = 0;
+    failNextPatch = false;
+
+    fetch = vi.fn(async (url: string, init?: RequestInit) => {
+        const method = init?.method ?? 'GET';
+        if (method === 'POST') {
+            const params = new URL(url, 'http://localhost').searchParams;
+            this.size = Number(params.get('size'));
+            this.data = new Uint8Array(0);
+            this.crc = 0;
+            this.exists = true;
+            return this.json(this.state());
+        }
+        if (!this.exists) return this.json({}, 404);
+        if (method === 'GET') return this.json(this.state());
+
+        this.patches++;
+        if (this.failNextPatch) {
+            this.failNextPatch = false;
+            throw new TypeError('Failed to fetch');
+        }
+        const headers = new Headers(init!.headers);
+        if (Number(headers.get('Upload-Offset')) !== this.data.length) return this.json({}, 409);
+
+        const body = init!.body as Uint8Array;
+        const crc = crc32(body, this.crc);
+        if (crc !== Number(headers.get('Upload-CRC32'))) return this.json({}, 409);
+
+        const grown = new Uint8Array(this.data.length + body.length);
+        grown.set(this.data);
+        grown.set(body, this.data.length);
+        this.data = grown;
+        this.crc = crc;
+        return this.json({ ...this.state(), complete: this.data.length === this.size });
+    });
+
+    state() {
+        return { id: 'abc', name: 'f.bin', size: this.size, offset: this.data.length, crc32: this.crc };
+    }
+
+    json(body: object, status = 200) {
+        return { ok: status < 400, status, json: async () => body } as Response;
+    }
+}
+
+const makeFile = (length: number) => {
+    const bytes = new Uint8Array(length);
+    for (let i = 0; i < length; i++) bytes[i] = (i * 31) & 0xFF;
+    return { file: new File([bytes], 'f.bin'), bytes };
+};
+
+describe('uploadFile', () => {
+    let inbox: FakeInbox;
+
+    beforeEach(() => {
+        inbox = new FakeInbox();
+        vi.stubGlobal('fetch', inbox.fetch);
+    });
+
+    afterEach(() => {
+        vi.unstubAllGlobals();
+        vi.useRealTimers();
+    });
+
+    it('sends the file in slices and reports progress', async () => {
+        const { file, bytes } = makeFile(9 * 1024 * 1024);
+        const progress: number[] = [];
+        const onCreated = vi.fn();
+
+        await uploadFile(file, { onCreated, onProgress: (sent) => progress.push(sent) });
+
+        expect(onCreated).toHaveBeenCalledWith('abc');
+        expect(inbox.patches).toBe(3);
+        expect(inbox.data).toEqual(bytes);
+        expect(progress[progress.length - 1]).toBe(bytes.length);
+    });
+
+    it('completes an empty file with one request', async () => {
+        await uploadFile(new File([], 'empty.txt'));
+        expect(inbox.patches).toBe(1);
+    });
+
+    it('resumes from the server offset when the prefix matches', async () => {
+        const { file, bytes } = makeFile(6 * 1024 * 1024);
+        inbox.exists = true;
+        inbox.size = bytes.length;
+        inbox.data = bytes.slice(0, 1000);
+        inbox.crc = crc32(inbox.data);
+        const onCreated = vi.fn();
+
+        await uploadFile(file, { resumeId: 'abc', onCreated });
+
+        expect(onCreated).not.toHaveBeenCalled();
+        expect(inbox.data).toEqual(bytes);
+    });
+
+    it('starts over when the server has different bytes', async () => {
+        const { file, bytes } = makeFile(4096);
+        inbox.exists = true;
+        inbox.size = bytes.length;
+        inbox.data = new Uint8Array(100);
+        inbox.crc = crc32(inbox.data);
+        const onCreated = vi.fn();
+
+        await uploadFile(file, { resumeId: 'abc', onCreated });
+
+        expect(onCreated).toHaveBeenCalled();
+        expect(inbox.data).toEqual(bytes);
+    });
+
+    it('retries after a dropped connection', async () => {
+        vi.useFakeTimers();
+        const { file, bytes } = makeFile(4096);
+        inbox.failNextPatch = true;
+
+        const done = uploadFile(file);
+        await vi.runAllTimersAsync();
+        await done;
+
+        expect(inbox.patches).toBe(2);
+        expect(inbox.data).toEqual(bytes);
+    });
+
+    it('sends the session token with every request', async () => {
+        const { file } = makeFile(5 * 1024 * 1024);
+
+        await uploadFile(file, { sessionToken: 'token-1' });
+
+        for (const [, init] of inbox.fetch.mock.calls) {
+            expect(new Headers(init?.headers).get('X-Session-Token')).toBe('token-1');
+        }
+    });
+});
+
+describe('crc32OfPrefix', () => {
+    it('matches a one-shot checksum', async () => {
+        const { file, bytes } = makeFile(5 * 1024 * 1024);
+        expect(await crc32OfPrefix(file, 4_500_000)).toBe(crc32(bytes.subarray(0, 4_500_000)));
+    });
+});
@@ -0,0 +1,148 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { SocketWorker, type WorkerTransport } from '../src/core/worker-transport';
+import { InputRing, SLAB_SAMPLES } from '../src/core/input-ring';
+import { ConnectionStatus, OP_CLICK, OP_MOVE } from '../src/core/protocol';
+
+class MockWebSocket {
+    static OPEN = 1;
+    static instances: MockWebSocket[] = [];
+    onopen: (() => void) | null = null;
+    onclose: ((event: { code: number }) => void) | null = null;
+    onerror: ((err: any) => void) | null = null;
+    onmessage: ((event: any) => void) | null = null;
+    readyState = 0;
+    binaryType = 'blob';
+    // Copies, as the transport reuses its move buffer
+    sent: number[][] = [];
+
+    constructor(public url: string) {
+        MockWebSocket.instances.push(this);
+    }
+
+    send(data: ArrayBuffer | Uint8Array) {
+        this.sent.push(Array.from(data instanceof Uint8Array ? data : new Uint8Array(data)));
+    }
+
+    close() {}
+
+    open() {
+        this.readyState = MockWebSocket.OPEN;
+        this.onopen?.();
+    }
+}
+
+vi.stubGlobal('WebSocket', MockWebSocket);
+
+const move = (dx: number, dy: number) => {
+    const view = new DataView(new ArrayBuffer(5));
+    view.setUint8(0, OP_MOVE);
+    view.setInt16(1, dx, false);
+    view.setInt16(3, dy, false);
+    return Array.from(new Uint8Array(view.buffer));
+};
+
+describe('WorkerTransport', () => {
+    let callbacks: (() => void)[];
+    let onStateChange: any;
+    let transport: WorkerTransport;
+    let ws: MockWebSocket;
+
+    // Runs the callbacks scheduled for the next animation frame
+    const nextFrame = () => {
+        const due = callbacks;
+        callbacks = [];
+        due.forEach(callback => callback());
+    };
+
+    beforeEach(() => {
+        vi.useFakeTimers();
+        MockWebSocket.instances = [];
+        callbacks = [];
+        onStateChange = vi.fn();
+        // jsdom has no Worker, so the worker's side runs in-process
+        const sockets = new SocketWorker();
+        transport = sockets.create({ onStateChange }, (callback) => callbacks.push(callback));
+        transport.connect('ws://localhost/ws');
+        ws = MockWebSocket.instances[0];
+        ws.open();
+    });
+
+    afterEach(() => {
+        vi.useRealTimers();
+    });
+
+    it('reports the state of the socket in the worker', () => {
+        expect(onStateChange).toHaveBeenCalledWith(ConnectionStatus.Connected, 'status.connected');
+        expect(transport.getState()).toEqual([ConnectionStatus.Connected, 'status.connected']);
+    });
+
+    it('sends one move per animation frame', () => {
+        // Coalesced samples of one display frame
+        transport.move(1.5, 0);
+        transport.move(1.5, -1);
+        transport.move(2.25, -1);
+        expect(ws.sent).toHaveLength(0);
+
+        nextFrame();
+        expect(ws.sent).toEqual([move(5, -2)]);
+    });
+
+    it('carries sub-pixel motion into the next frame', () => {
+        for (let i = 0; i < 4; i++) {
+            transport.move(0.4, 0);
+            nextFrame();
+        }
+        // 0.4, 0.8, 1.2 -> 1 (0.2 left), 0.6
+        expect(ws.sent).toEqual([move(1, 0)]);
+    });
+
+    it('flushes pending motion before any other frame', () => {
+        transport.move(3, 4);
+        transport.send(new Uint8Array([OP_CLICK, 1, 0]));
+
+        expect(ws.sent).toEqual([move(3, 4), [OP_CLICK, 1, 0]]);
+        nextFrame();
+        expect(ws.sent).toHaveLength(2);
+    });
+
+    it('hands a full slab over without waiting for the frame', () => {
+        for (let i = 0; i < SLAB_SAMPLES; i++) {
+            transport.move(1, 0);
+        }
+        expect(ws.sent).toEqual([move(SLAB_SAMPLES, 0)]);
+    });
+
+    it('keeps the session token the server issues', () => {
+        ws.onmessage?.({ data: JSON.stringify({ type: 'session', token: 'abc' }) });
+        expect(transport.getSessionToken()).toBe('abc');
+    });
+});
+
+describe('InputRing', () => {
+    it('reuses the slabs handed back instead of allocating per frame', () => {
+        const slabs: ArrayBuffer[] = [];
+        const ring = new InputRing((slab) => {
+            slabs.push(slab);
+            ring.recycle(slab);
+        }, () => {});
+
+        for (let i = 0; i < 10; i++) {
+            ring.push(1, 1);
+            ring.flush();
+        }
+        expect(slabs).toHaveLength(10);
+        expect(new Set(slabs).size).toBe(1);
+    });
+
+    it('starts a new slab while the last one is still away', () => {
+        const slabs: ArrayBuffer[] = [];
+        const ring = new InputRing((slab) => slabs.push(slab), () => {});
+
+        ring.push(1, 1);
+        ring.flush();
+        ring.push(2, 2);
+        ring.flush();
+        expect(slabs[0]).not.toBe(slabs[1]);
+        expect(Array.from(new Float64Array(slabs[1], 0, 2))).toEqual([2, 2]);
+    });
+});